@@ -0,0 +1,49 @@
+"""
+Synthetic presentation transcripts for benchmarks
+Deterministic WebVTT generated from a seed, scaled by duration (cue count) and words per cue.
+"""
+import random
+from typing import List
+
+WORDS = (
+    "today we will walk through the quarterly results and what they mean for our customers "
+    "the team delivered strong growth in every region while keeping costs under control "
+    "next I want to highlight three lessons we learned from the launch and how we will apply them "
+    "our data shows that engagement doubled after we simplified the onboarding experience "
+    "this matters because customers who finish onboarding stay with us twice as long"
+).split()
+
+FILLERS = ["um", "uh", "like", "you know", "so", "basically", "actually", "I mean"]
+
+POSITIVE = ["great", "excellent", "amazing", "love", "clear"]
+NEGATIVE = ["problem", "confusing", "difficult", "poor"]
+
+def format_timestamp(seconds: float) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+def generate_cue_texts(cue_count: int, words_per_cue: int = 10, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(cue_count):
+        words = [rng.choice(WORDS) for _ in range(words_per_cue)]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(FILLERS))
+        if rng.random() < 0.1:
+            words.append(rng.choice(POSITIVE if rng.random() < 0.7 else NEGATIVE))
+        texts.append(" ".join(words).capitalize() + rng.choice([".", ".", ".", "?", "!"]))
+    return texts
+
+def generate_vtt(minutes: float, words_per_cue: int = 10, cue_seconds: float = 4.0, seed: int = 0) -> str:
+    """WebVTT transcript of the given length with speech-like pauses between cues"""
+    rng = random.Random(seed)
+    cue_count = max(1, int(minutes * 60 / cue_seconds))
+    lines = ["WEBVTT", ""]
+    start = 0.0
+    for text in generate_cue_texts(cue_count, words_per_cue, seed):
+        end = start + cue_seconds * rng.uniform(0.7, 0.95)
+        lines.extend([f"{format_timestamp(start)} --> {format_timestamp(end)}", text, ""])
+        # Mostly short gaps, occasionally a long pause
+        start = end + (rng.uniform(1.5, 4.0) if rng.random() < 0.05 else rng.uniform(0.1, 0.6))
+    return "\n".join(lines)
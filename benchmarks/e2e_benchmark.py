@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput/latency benchmark for the partB and partC function apps
+Drives the HTTP-triggered functions in-process against the local Azure emulator with synthetic
+workloads (transcripts from 1 minute to 3 hours, videos of varied length). Reports requests/sec,
+p50/p95/p99 latency and peak RSS per scenario; each scenario runs in a fresh subprocess so the
+two apps' `utils` modules never collide and peak memory is per scenario.
+
+Absolute throughput depends on the host, so --compare works on ratios: REFERENCE_SCENARIO is
+measured right before every scenario, and the scenario's p95 latency and requests/sec are
+expressed in units of the reference's p50 latency before being compared with the same ratios in
+the baseline. A baseline saved on one machine therefore stays usable on another, and drift in
+host speed during a run cancels out. Peak RSS does not depend on CPU speed and is compared as is.
+Flagged scenarios are re-measured up to --retries times and only reported if they stay slow.
+
+Usage:
+  python benchmarks/e2e_benchmark.py                              # run and print
+  python benchmarks/e2e_benchmark.py --save-baseline              # store results as the baseline
+  python benchmarks/e2e_benchmark.py --compare --threshold 0.25   # fail on >25% regressions
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import platform
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+APP_DIRS = {
+    "partB": os.path.join(REPO_ROOT, "partB_func_coach"),
+    "partC": os.path.join(REPO_ROOT, "partC_facial_analysis")
+}
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baselines", "e2e_baseline.json")
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "local_emulator"))
+sys.path.insert(0, BENCHMARK_DIR)
+
+# (name, app, function, workload size) - minutes of transcript or video
+SCENARIOS = [
+    ("analyze_combined_1min", "partB", "analyze_combined", 1),
+    ("analyze_combined_30min", "partB", "analyze_combined", 30),
+    ("analyze_combined_180min", "partB", "analyze_combined", 180),
+    ("full_presentation_analysis_1min", "partB", "full_presentation_analysis", 1),
+    ("full_presentation_analysis_30min", "partB", "full_presentation_analysis", 30),
+    ("full_presentation_analysis_180min", "partB", "full_presentation_analysis", 180),
+    ("analyze_video_1min", "partC", "analyze_video_content", 1),
+    ("analyze_video_20min", "partC", "analyze_video_content", 20),
+    ("analyze_video_120min", "partC", "analyze_video_content", 120),
+    ("analysis_status", "partC", "get_analysis_status", 1)
+]
+
+# Measured in every run as the yardstick for host speed; not itself checked for regressions
+REFERENCE_SCENARIO = "analyze_combined_1min"
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def build_requests(function_name: str, minutes: float, count: int, endpoint: str) -> List[Any]:
+    import azure.functions as func
+    import requests
+    from corpus import generate_vtt
+
+    if function_name in ("analyze_combined", "full_presentation_analysis"):
+        body = json.dumps({"transcript": generate_vtt(minutes)}).encode()
+        return [func.HttpRequest(method="POST", url=f"/api/{function_name}", body=body) for _ in range(count)]
+
+    if function_name == "analyze_video_content":
+        # Unique URLs so every request does the full submit/poll/insights path
+        return [
+            func.HttpRequest(
+                method="POST", url="/api/analyze_video",
+                body=json.dumps({"video_url": f"{endpoint}/videos/talk-{i}.mp4?duration={int(minutes * 60)}"}).encode()
+            )
+            for i in range(count)
+        ]
+
+    # Status polls against jobs submitted up front
+    job_ids = []
+    for i in range(count):
+        response = requests.post(
+            f"{endpoint}/documentintelligence/documentAnalyzers/prebuilt-videoAnalyzer:analyze",
+            headers={"Ocp-Apim-Subscription-Key": "local"},
+            json={"urlSource": f"{endpoint}/videos/status-{i}.mp4?duration={int(minutes * 60)}"}
+        )
+        job_ids.append(response.headers["Operation-Location"].split("/analyzeResults/")[1].split("?")[0])
+    return [
+        func.HttpRequest(method="GET", url=f"/api/analysis_status/{job_id}", body=b"", route_params={"job_id": job_id})
+        for job_id in job_ids
+    ]
+
+def run_worker(app: str, function_name: str, minutes: float, request_count: int, concurrency: int) -> Dict[str, Any]:
+    """Run one scenario inside this process (called in a subprocess)"""
+    sys.path.insert(0, APP_DIRS[app])
+    import function_app
+
+    handler = getattr(function_app, function_name).build().get_user_function()
+    endpoint = os.environ["CONTENT_UNDERSTANDING_ENDPOINT"]
+    warmup, *requests_to_send = build_requests(function_name, minutes, request_count + 1, endpoint)
+    handler(warmup)
+
+    def timed_call(request):
+        start = time.perf_counter()
+        response = handler(request)
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed_call, requests_to_send))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, status in results if status >= 400),
+        "rps": round(len(results) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+def run_scenario(scenario: tuple, args: argparse.Namespace, env: Dict[str, str]) -> Dict[str, Any]:
+    name, app, function_name, minutes = scenario
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", app, function_name, str(minutes),
+         str(args.requests), str(args.concurrency)],
+        capture_output=True, text=True, env=env, cwd=APP_DIRS[app]
+    )
+    if output.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{output.stderr[-2000:]}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def measure_scenario(scenario: tuple, args: argparse.Namespace, env: Dict[str, str]) -> Dict[str, Any]:
+    """Run a scenario and record the reference p50 latency measured just before it"""
+    reference = next(s for s in SCENARIOS if s[0] == REFERENCE_SCENARIO)
+    result = run_scenario(scenario, args, env)
+    yardstick = result if scenario == reference else run_scenario(reference, args, env)
+    return {**result, "reference_p50_ms": yardstick["p50_ms"]}
+
+def relative_to_reference(scenario: Dict[str, Any]) -> Dict[str, float]:
+    """p95 latency and throughput of a scenario in units of the reference scenario's p50 latency"""
+    reference_ms = max(scenario["reference_p50_ms"], 1e-9)
+    return {"p95": scenario["p95_ms"] / reference_ms, "rps": scenario["rps"] * reference_ms / 1000}
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Scenarios whose p95 latency, throughput or peak memory regressed by more than threshold
+    Latency and throughput are compared relative to REFERENCE_SCENARIO, so the baseline may
+    come from another host.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or name == REFERENCE_SCENARIO:
+            continue
+        if "reference_p50_ms" not in previous:
+            raise ValueError("Baseline predates reference-relative comparison; save it again")
+        now, before = relative_to_reference(current), relative_to_reference(previous)
+        if now["p95"] > before["p95"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95']:.2f}x -> {now['p95']:.2f}x reference "
+                               f"({previous['p95_ms']} -> {current['p95_ms']} ms)")
+        if now["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {before['rps']:.3f} -> {now['rps']:.3f} per reference latency "
+                               f"({previous['rps']} -> {current['rps']})")
+        if current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{name}: peak RSS {previous['peak_rss_mb']} -> {current['peak_rss_mb']} MB")
+    return regressions
+
+def recheck(results: Dict[str, Dict], baseline: Dict[str, Any], args: argparse.Namespace,
+            env: Dict[str, str]) -> List[str]:
+    """Re-measure flagged scenarios, keeping the better run, so one noisy sample is not a regression"""
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    for _ in range(args.retries):
+        if not regressions:
+            break
+        for name in dict.fromkeys(line.split(":")[0] for line in regressions):
+            again = measure_scenario(next(s for s in SCENARIOS if s[0] == name), args, env)
+            if relative_to_reference(again)["p95"] < relative_to_reference(results[name])["p95"]:
+                results[name] = again
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+    return regressions
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the function apps against the local emulator")
+    parser.add_argument("--requests", type=int, default=20, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="emulated service latency")
+    parser.add_argument("--only", default="", help="comma-separated scenario name prefixes")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--retries", type=int, default=2, help="re-measurements of a flagged scenario")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    if len(sys.argv) == 7 and sys.argv[1] == "--worker":
+        _, _, app, function_name, minutes, request_count, concurrency = sys.argv
+        print(json.dumps(run_worker(app, function_name, float(minutes), int(request_count), int(concurrency))))
+        sys.exit(0)
+
+    from azure_emulator import AzureEmulator, EmulatorConfig
+
+    args = parse_args(sys.argv[1:])
+    prefixes = [p for p in args.only.split(",") if p]
+    scenarios = [s for s in SCENARIOS if not prefixes or any(s[0].startswith(p) for p in prefixes)]
+
+    print("🏁 End-to-End Function Benchmark")
+    print("=" * 50)
+    print(f"⚙️  {args.requests} requests/scenario, concurrency {args.concurrency}, emulated latency {args.latency_ms} ms")
+
+    results = {}
+    with AzureEmulator(EmulatorConfig(latency_ms=args.latency_ms, job_duration_sec=0, seed=0)) as emulator, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(
+            os.environ,
+            COG_ENDPOINT=emulator.endpoint, COG_KEY="local",
+            CONTENT_UNDERSTANDING_ENDPOINT=emulator.endpoint, CONTENT_UNDERSTANDING_KEY="local",
+            VIDEO_CACHE_DIR=cache_dir
+        )
+        for scenario in scenarios:
+            result = measure_scenario(scenario, args, env)
+            results[scenario[0]] = result
+            print(f"📊 {scenario[0]:36s} {result['rps']:8.2f} req/s | p50 {result['p50_ms']:8.1f} ms | "
+                  f"p95 {result['p95_ms']:8.1f} ms | p99 {result['p99_ms']:8.1f} ms | "
+                  f"peak {result['peak_rss_mb']:6.1f} MB | errors {result['errors']}")
+
+        regressions = []
+        if args.compare:
+            with open(args.baseline) as f:
+                regressions = recheck(results, json.load(f), args, env)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+                "settings": {"requests": args.requests, "concurrency": args.concurrency, "latency_ms": args.latency_ms},
+                "reference": REFERENCE_SCENARIO,
+                "scenarios": results
+            }, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    if args.compare:
+        if regressions:
+            print(f"❌ Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the pure-Python transcript scoring in partB_func_coach/utils.py
+Times strip_vtt, analyze_pauses_from_vtt, enhanced_transcript_metrics, analyze_clarity,
+calculate_sentence_variety and generate_detailed_recommendations on generated transcripts
+scaled by cue count and words per cue.
+
+Each timing is normalized by a fixed pure-Python calibration loop measured right before it, so
+a baseline recorded on one machine stays comparable on another and drift in CPU speed during a
+run (shared or throttled hosts) cancels out. --compare exits non-zero when any case slows down by
+more than --threshold relative to the saved baseline; flagged cases are re-measured up to
+--retries times and only reported if they stay slow.
+
+Usage:
+  python benchmarks/partb_microbench.py --save-baseline
+  python benchmarks/partb_microbench.py --compare --threshold 0.5
+"""
+import os
+import re
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+from typing import Any, Callable, Dict, List, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baselines", "partb_microbench_baseline.json")
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "partB_func_coach"))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import utils
+from corpus import generate_vtt
+
+# (cue count, words per cue)
+CORPUS_SIZES = [(50, 8), (50, 32), (500, 8), (500, 32), (5000, 8), (5000, 32)]
+
+CUE_SECONDS = 4.0
+REPEATS = 5
+
+def calibrate() -> float:
+    """Seconds for a fixed pure-Python workload; used to normalize timings across machines"""
+    def workload():
+        total = 0
+        for i in range(200000):
+            total += i % 7
+        return total
+    return min(timeit.repeat(workload, number=1, repeat=REPEATS))
+
+def build_cases(cue_count: int, words_per_cue: int) -> List[Tuple[str, Callable[[], Any]]]:
+    """Benchmark callables for one corpus size, with inputs prepared outside the timed region"""
+    vtt = generate_vtt(cue_count * CUE_SECONDS / 60, words_per_cue=words_per_cue, cue_seconds=CUE_SECONDS)
+    plain, duration = utils.strip_vtt(vtt)
+    words = plain.split()
+    sentence_lengths = [len(s.split()) for s in re.split(r'[.!?]+', plain) if s.strip()]
+    metrics = utils.enhanced_transcript_metrics(plain, duration, vtt)
+
+    return [
+        ("strip_vtt", lambda: utils.strip_vtt(vtt)),
+        ("analyze_pauses_from_vtt", lambda: utils.analyze_pauses_from_vtt(vtt)),
+        ("enhanced_transcript_metrics", lambda: utils.enhanced_transcript_metrics(plain, duration, vtt)),
+        ("analyze_clarity", lambda: utils.analyze_clarity(plain, words)),
+        ("calculate_sentence_variety", lambda: utils.calculate_sentence_variety(sentence_lengths)),
+        ("generate_detailed_recommendations", lambda: utils.generate_detailed_recommendations(metrics))
+    ]
+
+def time_case(func: Callable[[], Any]) -> float:
+    """Best per-call time over REPEATS runs, each sized by timeit autorange (>= 0.2s)"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEATS, number=number)) / number
+
+def measure(func: Callable[[], Any]) -> Dict[str, float]:
+    calibration = calibrate()
+    seconds = time_case(func)
+    return {"seconds": seconds, "normalized": seconds / calibration, "calibration_sec": calibration}
+
+def build_all_cases() -> Dict[str, Callable[[], Any]]:
+    return {
+        f"{name}[cues={cue_count},words={words_per_cue}]": func
+        for cue_count, words_per_cue in CORPUS_SIZES
+        for name, func in build_cases(cue_count, words_per_cue)
+    }
+
+def run_benchmarks(cases: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    measured = {name: measure(func) for name, func in cases.items()}
+    return {
+        "calibration_sec": min(case.pop("calibration_sec") for case in measured.values()),
+        "cases": measured
+    }
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Cases whose normalized time grew by more than threshold"""
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if previous and current["normalized"] > previous["normalized"] * (1 + threshold):
+            change = current["normalized"] / previous["normalized"] - 1
+            regressions.append(f"{name}: +{change:.0%} ({previous['seconds'] * 1e6:.1f} -> {current['seconds'] * 1e6:.1f} µs)")
+    return regressions
+
+def recheck(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            cases: Dict[str, Callable[[], Any]], retries: int) -> List[str]:
+    """Re-measure flagged cases, keeping the fastest result, so one noisy sample is not a regression"""
+    regressions = compare_with_baseline(results, baseline, threshold)
+    for _ in range(retries):
+        if not regressions:
+            break
+        for line in regressions:
+            name = line.split(":")[0]
+            again = measure(cases[name])
+            if again["normalized"] < results["cases"][name]["normalized"]:
+                results["cases"][name] = {"seconds": again["seconds"], "normalized": again["normalized"]}
+        regressions = compare_with_baseline(results, baseline, threshold)
+    return regressions
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for partB transcript scoring")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed relative slowdown")
+    parser.add_argument("--retries", type=int, default=3, help="re-measurements of a flagged case")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    print("⏱️  partB Scoring Micro-Benchmarks")
+    print("=" * 50)
+    cases = build_all_cases()
+    results = run_benchmarks(cases)
+    print(f"🧮 Calibration loop: {results['calibration_sec'] * 1000:.1f} ms")
+    for name, case in results["cases"].items():
+        print(f"   {name:62s} {case['seconds'] * 1e6:12.1f} µs")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "machine": {"python": platform.python_version(), "platform": platform.platform()},
+                **results
+            }, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = recheck(results, baseline, args.threshold, cases, args.retries)
+        if regressions:
+            print(f"❌ Slower than baseline by more than {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark for the partB and partC function apps
+Imports each app's function_app in a fresh interpreter under `python -X importtime` and
+reports the total import time, the slowest top-level imports and whether heavy
+dependencies (numpy, cv2, the Text Analytics SDK) were loaded before any request ran.
+
+Usage:
+  python benchmarks/startup_benchmark.py                     # run and print
+  python benchmarks/startup_benchmark.py --save-baseline     # store results as the baseline
+  python benchmarks/startup_benchmark.py --compare           # fail on regressions beyond --threshold
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from typing import Any, Dict, List, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+APP_DIRS = {
+    "partB": os.path.join(REPO_ROOT, "partB_func_coach"),
+    "partC": os.path.join(REPO_ROOT, "partC_facial_analysis")
+}
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baselines", "startup_baseline.json")
+
+# Modules that should only load when a route actually needs them
+HEAVY_MODULES = ["numpy", "cv2", "azure.ai.textanalytics"]
+
+# Printed by the child after the import; lazily registered modules are not counted as loaded
+LOADED_PROBE = (
+    "import sys, json, importlib.util; "
+    "print(json.dumps([m for m in {modules} if m in sys.modules "
+    "and not isinstance(sys.modules[m], importlib.util._LazyModule)]))"
+)
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for each line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Drop the separator space; what remains is two spaces of indent per nesting level
+        rows.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def measure_import(app: str) -> Dict[str, Any]:
+    """Import function_app once in a fresh interpreter"""
+    probe = LOADED_PROBE.format(modules=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import function_app; {probe}"],
+        capture_output=True, text=True, cwd=APP_DIRS[app]
+    )
+    if output.returncode != 0:
+        raise RuntimeError(f"{app} import failed:\n{output.stderr[-2000:]}")
+    rows = parse_importtime(output.stderr)
+    end = next(i for i, (name, _, _) in enumerate(rows) if name == "function_app")
+    total_us = rows[end][2]
+    # importtime lists children before their parent, so function_app's imports are the
+    # indented rows directly above it; its direct imports have exactly one indent level
+    start = end
+    while start > 0 and rows[start - 1][0].startswith(" "):
+        start -= 1
+    top_level = sorted(
+        ((name.strip(), cumulative) for name, _, cumulative in rows[start:end]
+         if name.startswith("  ") and not name.startswith("   ")),
+        key=lambda item: item[1], reverse=True
+    )
+    return {
+        "total_ms": total_us / 1000,
+        "top_imports": [{"module": name, "ms": round(us / 1000, 1)} for name, us in top_level[:8]],
+        "heavy_loaded": json.loads(output.stdout.strip().splitlines()[-1])
+    }
+
+def run_app(app: str, runs: int) -> Dict[str, Any]:
+    """Median total over several cold imports; the breakdown comes from the median run"""
+    samples = sorted((measure_import(app) for _ in range(runs)), key=lambda sample: sample["total_ms"])
+    median = samples[len(samples) // 2]
+    return {
+        "import_ms": round(median["total_ms"], 1),
+        "import_ms_min": round(samples[0]["total_ms"], 1),
+        "top_imports": median["top_imports"],
+        "heavy_loaded": median["heavy_loaded"]
+    }
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Apps whose import time grew beyond threshold or that now load a heavy module at import"""
+    regressions = []
+    for app, current in results.items():
+        previous = baseline.get("apps", {}).get(app)
+        if not previous:
+            continue
+        if current["import_ms"] > previous["import_ms"] * (1 + threshold):
+            regressions.append(f"{app}: import {previous['import_ms']} -> {current['import_ms']} ms")
+        for module in sorted(set(current["heavy_loaded"]) - set(previous["heavy_loaded"])):
+            regressions.append(f"{app}: {module} is now loaded at import")
+    return regressions
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark for the function apps")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per app")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    print("🧊 Function App Cold-Start Imports")
+    print("=" * 50)
+    results = {}
+    for app in APP_DIRS:
+        result = run_app(app, args.runs)
+        results[app] = result
+        heavy = ", ".join(result["heavy_loaded"]) or "none"
+        print(f"📦 {app}: {result['import_ms']:.1f} ms median (min {result['import_ms_min']:.1f} ms) | heavy modules at import: {heavy}")
+        for item in result["top_imports"]:
+            print(f"   {item['module']:40s} {item['ms']:8.1f} ms")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "machine": {"python": platform.python_version(), "platform": platform.platform()},
+                "settings": {"runs": args.runs},
+                "apps": results
+            }, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline) as f:
+            regressions = compare_with_baseline(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"❌ Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
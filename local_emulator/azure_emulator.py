@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Azure APIs used by partB and partC, for load and perf testing
+Implements the request/response shapes our code relies on:
+  - Text Analytics sentiment (azure-ai-textanalytics: /language/:analyze-text and /text/analytics/v3.1/sentiment)
+  - Face API /face/v1.0/detect
+  - Content Understanding analyzer registration (GET/PUT), analyze submit (urlSource JSON or a raw
+    application/octet-stream upload) + Operation-Location polling
+Responses are deterministic for a given input. Latency, 5xx error rate and 429 throttling are configurable.
+
+Usage:
+  python local_emulator/azure_emulator.py --port 7250 --latency-ms 80 --error-rate 0.01 --throttle-rate 0.05
+  export COG_ENDPOINT=http://127.0.0.1:7250 COG_KEY=local
+  export CONTENT_UNDERSTANDING_ENDPOINT=http://127.0.0.1:7250 CONTENT_UNDERSTANDING_KEY=local
+"""
+import os
+import re
+import sys
+import json
+import uuid
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PORT = 7250
+
+POSITIVE_WORDS = {"love", "great", "good", "excellent", "clear", "happy", "enjoy", "amazing", "thanks", "welcome", "best"}
+NEGATIVE_WORDS = {"hate", "bad", "poor", "terrible", "confusing", "sad", "boring", "worst", "problem", "unclear", "angry"}
+
+TRANSCRIPT_LINES = (
+    "Welcome everyone, thanks for joining.",
+    "Today we will walk through the results.",
+    "Um, the first thing to notice is the growth in every region.",
+    "This is a great outcome for the whole team.",
+    "Next, let's look at what we learned from the launch."
+)
+
+CU_ANALYZER_PATH = re.compile(r"^/documentintelligence/documentAnalyzers/([^/:]+)$")
+CU_ANALYZE_PATH = re.compile(r"^/documentintelligence/documentAnalyzers/([^/:]+):analyze$")
+CU_RESULT_PATH = re.compile(r"^/documentintelligence/documentAnalyzers/([^/]+)/analyzeResults/([^/]+)$")
+
+class EmulatorConfig:
+    """Fault and latency injection settings (all rates are probabilities per request)"""
+
+    def __init__(self, latency_ms: float = 0.0, latency_jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after_sec: int = 1, job_duration_sec: float = 2.0,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after_sec = retry_after_sec
+        self.job_duration_sec = job_duration_sec
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "EmulatorConfig":
+        return cls(
+            latency_ms=float(os.environ.get("EMULATOR_LATENCY_MS", 0)),
+            latency_jitter_ms=float(os.environ.get("EMULATOR_LATENCY_JITTER_MS", 0)),
+            error_rate=float(os.environ.get("EMULATOR_ERROR_RATE", 0)),
+            throttle_rate=float(os.environ.get("EMULATOR_THROTTLE_RATE", 0)),
+            retry_after_sec=int(os.environ.get("EMULATOR_RETRY_AFTER_SEC", 1)),
+            job_duration_sec=float(os.environ.get("EMULATOR_JOB_DURATION_SEC", 2.0))
+        )
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """Pick this request's latency (seconds) and injected status code, if any"""
+        with self.lock:
+            latency = max(0.0, self.latency_ms + self.random.uniform(-1, 1) * self.latency_jitter_ms) / 1000
+            roll = self.random.random()
+        if roll < self.throttle_rate:
+            return latency, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return latency, 500
+        return latency, None
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+def _unit(digest: bytes, index: int) -> float:
+    """Deterministic value in [0, 1) from one byte of a digest"""
+    return digest[index % len(digest)] / 256
+
+def score_sentiment(text: str) -> Dict[str, Any]:
+    """Lexicon-based sentiment with Text Analytics confidence score shape"""
+    words = re.findall(r"[a-z']+", text.lower())
+    positive = sum(word in POSITIVE_WORDS for word in words)
+    negative = sum(word in NEGATIVE_WORDS for word in words)
+    total = positive + negative
+
+    if total == 0:
+        scores = {"positive": 0.1, "neutral": 0.8, "negative": 0.1}
+    else:
+        polar = min(0.95, 0.5 + 0.15 * total)
+        scores = {
+            "positive": round(polar * positive / total, 2),
+            "neutral": round(1 - polar, 2),
+            "negative": round(polar * negative / total, 2)
+        }
+
+    if positive and negative and abs(positive - negative) <= 1:
+        label = "mixed"
+    else:
+        label = max(scores, key=scores.get)
+    return {"sentiment": label, "confidenceScores": scores}
+
+def sentiment_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    text = document.get("text", "")
+    sentences = []
+    offset = 0
+    for sentence in re.split(r"(?<=[.!?])\s+", text.strip()) if text.strip() else []:
+        start = text.find(sentence, offset)
+        offset = start + len(sentence)
+        sentences.append({"text": sentence, "offset": start, "length": len(sentence), **score_sentiment(sentence)})
+    return {"id": document.get("id", "0"), **score_sentiment(text), "sentences": sentences, "warnings": []}
+
+def detect_faces(image_data: bytes) -> List[Dict[str, Any]]:
+    """Face API detect response derived from the image bytes (0-2 faces)"""
+    digest = _digest(image_data)
+    face_total = 0 if _unit(digest, 0) < 0.1 else 2 if _unit(digest, 0) > 0.9 else 1
+    faces = []
+    for i in range(face_total):
+        offset = i * 8
+        left = 100 + int(_unit(digest, offset + 1) * 400)
+        top = 60 + int(_unit(digest, offset + 2) * 200)
+        size = 120 + int(_unit(digest, offset + 3) * 120)
+        faces.append({
+            "faceId": str(uuid.UUID(bytes=digest[offset:offset + 16])),
+            "faceRectangle": {"left": left, "top": top, "width": size, "height": size},
+            "faceLandmarks": {
+                "pupilLeft": {"x": left + size * 0.3, "y": top + size * 0.4},
+                "pupilRight": {"x": left + size * 0.7, "y": top + size * 0.4},
+                "noseTip": {"x": left + size * 0.5, "y": top + size * 0.6},
+                "mouthLeft": {"x": left + size * 0.35, "y": top + size * 0.8},
+                "mouthRight": {"x": left + size * 0.65, "y": top + size * 0.8}
+            },
+            "faceAttributes": {
+                "age": round(25 + _unit(digest, offset + 4) * 30, 1),
+                "smile": round(_unit(digest, offset + 5), 3),
+                "headPose": {
+                    "yaw": round(_unit(digest, offset + 6) * 30 - 15, 1),
+                    "pitch": round(_unit(digest, offset + 7) * 20 - 10, 1),
+                    "roll": round(_unit(digest, offset + 8) * 10 - 5, 1)
+                },
+                "qualityForRecognition": ("low", "medium", "high")[int(_unit(digest, offset + 9) * 3)]
+            }
+        })
+    return faces
+
+def _vtt_time(seconds: float) -> str:
+    return f"{int(seconds // 3600):02d}:{int(seconds // 60 % 60):02d}:{seconds % 60:06.3f}"
+
+def video_duration_hint(source: str) -> float:
+    """Video length in seconds from a "duration" query parameter on the source URL (default 60)"""
+    try:
+        return max(1.0, float(parse_qs(urlparse(source).query).get("duration", ["60"])[0]))
+    except ValueError:
+        return 60.0
+
+def content_understanding_result(source: str) -> Dict[str, Any]:
+    """
+    analyzeResult shaped like a prebuilt-videoAnalyzer response for the given source
+    Key frames, face instances and transcript cues scale with the source's duration hint.
+    """
+    digest = _digest(source.encode("utf-8"))
+    level = ("Low", "Medium", "High")[int(_unit(digest, 0) * 3)]
+    engagement = ("poor", "average", "good", "excellent")[int(_unit(digest, 1) * 4)]
+    duration = video_duration_hint(source)
+    cue_starts = range(0, int(duration), 4)
+    transcript = "WEBVTT\n\n" + "".join(
+        f"{_vtt_time(start)} --> {_vtt_time(start + 3.5)}\n"
+        f"{TRANSCRIPT_LINES[i % len(TRANSCRIPT_LINES)]}\n\n"
+        for i, start in enumerate(cue_starts)
+    )
+    return {
+        "documents": [{
+            "fields": {
+                "emotionDescription": {"valueString": "Presenter appears composed with occasional smiles", "confidence": 0.85},
+                "confidenceLevel": {"valueString": level, "confidence": 0.9},
+                "engagementScore": {"valueString": f"{engagement} visual engagement", "confidence": 0.8},
+                "presentationQuality": {"valueString": f"{engagement} delivery with steady pacing", "confidence": 0.8}
+            }
+        }],
+        "contentExtraction": {
+            "faceGroupings": {"groups": [{"id": "face-1", "instances": [{}] * int(duration // 5), "representativeFace": {}}]},
+            "transcript": transcript,
+            "keyFrames": [
+                {"timestamp": f"{seconds}s", "description": "Presenter facing camera", "confidence": 0.9}
+                for seconds in range(0, int(duration), 10)
+            ]
+        }
+    }
+
+class AzureEmulator:
+    """
+    Threaded local server for the emulated APIs
+    Use as a context manager in tests and benchmarks; `endpoint` is the base URL to put in
+    COG_ENDPOINT / CONTENT_UNDERSTANDING_ENDPOINT.
+    """
+
+    def __init__(self, config: Optional[EmulatorConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or EmulatorConfig()
+        self.jobs = {}
+        self.analyzers = {}
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "AzureEmulator":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="azure-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def analyzer_known(self, analyzer_id: str) -> bool:
+        """Prebuilt analyzers always exist; custom ones only after a PUT"""
+        with self.lock:
+            return analyzer_id.startswith("prebuilt-") or analyzer_id in self.analyzers
+
+    def create_analyzer(self, analyzer_id: str, definition: Dict[str, Any]) -> bool:
+        """False when an analyzer with this id already exists"""
+        with self.lock:
+            if analyzer_id in self.analyzers:
+                return False
+            self.analyzers[analyzer_id] = definition
+            return True
+
+    def submit_job(self, analyzer_id: str, source: str) -> str:
+        job_id = str(uuid.uuid4())
+        with self.lock:
+            self.jobs[job_id] = {"analyzer_id": analyzer_id, "source": source, "created_at": time.time()}
+        return job_id
+
+    def job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        elapsed = time.time() - job["created_at"]
+        if elapsed < self.config.job_duration_sec:
+            status = "notStarted" if elapsed < self.config.job_duration_sec / 4 else "running"
+            return {"id": job_id, "status": status}
+        return {"id": job_id, "status": "succeeded", "analyzeResult": content_understanding_result(job["source"])}
+
+    def _handler_class(self):
+        emulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; with Nagle on, a keep-alive client's
+            # delayed ACK stalls every response by ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length", 0))
+                return self.rfile.read(length) if length else b""
+
+            def _hash_body(self, chunk_size: int = 1024 * 1024) -> Tuple[str, int]:
+                """Consume an uploaded body in chunks; returns (sha256 hex, size) without holding it"""
+                remaining = int(self.headers.get("Content-Length", 0))
+                digest = hashlib.sha256()
+                while remaining:
+                    chunk = self.rfile.read(min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    remaining -= len(chunk)
+                return digest.hexdigest(), int(self.headers.get("Content-Length", 0)) - remaining
+
+            def _inject_faults(self, route: str) -> bool:
+                """Apply latency and maybe answer with an injected error; True if the request was answered"""
+                emulator.count(route)
+                latency, status = emulator.config.draw()
+                if latency:
+                    time.sleep(latency)
+                if status == 429:
+                    emulator.count("throttled")
+                    self._send_json(429, {"error": {"code": "429", "message": "Rate limit exceeded (emulated)"}},
+                                    {"Retry-After": str(emulator.config.retry_after_sec)})
+                    return True
+                if status == 500:
+                    emulator.count("errors")
+                    self._send_json(500, {"error": {"code": "InternalServerError", "message": "Emulated failure"}})
+                    return True
+                return False
+
+            def _authorized(self) -> bool:
+                if self.headers.get("Ocp-Apim-Subscription-Key"):
+                    return True
+                self._send_json(401, {"error": {"code": "401", "message": "Missing subscription key"}})
+                return False
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/emulator/stats":
+                    with emulator.lock:
+                        self._send_json(200, dict(emulator.stats))
+                    return
+
+                match = CU_ANALYZER_PATH.match(url.path)
+                if match:
+                    if self._inject_faults("content_understanding_analyzer") or not self._authorized():
+                        return
+                    if emulator.analyzer_known(match.group(1)):
+                        self._send_json(200, {"analyzerId": match.group(1), "status": "ready"})
+                    else:
+                        self._send_json(404, {"error": {"code": "ModelNotFound", "message": match.group(1)}})
+                    return
+
+                match = CU_RESULT_PATH.match(url.path)
+                if not match:
+                    self._send_json(404, {"error": {"code": "NotFound", "message": url.path}})
+                    return
+                if self._inject_faults("content_understanding_status") or not self._authorized():
+                    return
+                status = emulator.job_status(match.group(2))
+                if status is None:
+                    self._send_json(404, {"error": {"code": "NotFound", "message": "Unknown operation"}})
+                else:
+                    self._send_json(200, status)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                upload = None
+                if CU_ANALYZE_PATH.match(url.path) and self.headers.get("Content-Type", "").startswith("application/octet-stream"):
+                    upload = self._hash_body()
+                    emulator.count("content_understanding_upload_bytes", upload[1])
+                body = b"" if upload else self._read_body()
+
+                if url.path in ("/language/:analyze-text", "/text/analytics/v3.1/sentiment"):
+                    if self._inject_faults("sentiment") or not self._authorized():
+                        return
+                    request = json.loads(body or b"{}")
+                    if url.path == "/language/:analyze-text":
+                        documents = request.get("analysisInput", {}).get("documents", [])
+                        self._send_json(200, {
+                            "kind": "SentimentAnalysisResults",
+                            "results": {
+                                "documents": [sentiment_document(d) for d in documents],
+                                "errors": [],
+                                "modelVersion": "emulator"
+                            }
+                        })
+                    else:
+                        documents = request.get("documents", [])
+                        self._send_json(200, {
+                            "documents": [sentiment_document(d) for d in documents],
+                            "errors": [],
+                            "modelVersion": "emulator"
+                        })
+                    return
+
+                if url.path == "/face/v1.0/detect":
+                    if self._inject_faults("face_detect") or not self._authorized():
+                        return
+                    if not body:
+                        self._send_json(400, {"error": {"code": "InvalidImage", "message": "Image is empty"}})
+                        return
+                    self._send_json(200, detect_faces(body))
+                    return
+
+                match = CU_ANALYZE_PATH.match(url.path)
+                if match:
+                    if self._inject_faults("content_understanding_submit") or not self._authorized():
+                        return
+                    if not emulator.analyzer_known(match.group(1)):
+                        self._send_json(404, {"error": {"code": "ModelNotFound", "message": match.group(1)}})
+                        return
+                    if upload:
+                        source = f"upload:{upload[0]}"
+                    else:
+                        request = json.loads(body or b"{}")
+                        source = request.get("urlSource") or request.get("url") or ""
+                    job_id = emulator.submit_job(match.group(1), source)
+                    api_version = query.get("api-version", ["2024-07-31-preview"])[0]
+                    host = self.headers.get("Host") or "{}:{}".format(*emulator.server.server_address[:2])
+                    operation = (f"http://{host}/documentintelligence/documentAnalyzers/{match.group(1)}"
+                                 f"/analyzeResults/{job_id}?api-version={api_version}")
+                    self._send_json(202, {"id": job_id, "status": "notStarted"}, {"Operation-Location": operation})
+                    return
+
+                self._send_json(404, {"error": {"code": "NotFound", "message": url.path}})
+
+            def do_PUT(self):
+                url = urlparse(self.path)
+                body = self._read_body()
+                match = CU_ANALYZER_PATH.match(url.path)
+                if not match:
+                    self._send_json(404, {"error": {"code": "NotFound", "message": url.path}})
+                    return
+                if self._inject_faults("content_understanding_analyzer") or not self._authorized():
+                    return
+                analyzer_id = match.group(1)
+                if not emulator.create_analyzer(analyzer_id, json.loads(body or b"{}")):
+                    self._send_json(409, {"error": {"code": "Conflict", "message": f"Analyzer {analyzer_id} already exists"}})
+                    return
+                emulator.count("analyzers_created")
+                host = self.headers.get("Host") or "{}:{}".format(*emulator.server.server_address[:2])
+                # Creation completes immediately; the analyzer resource doubles as the operation
+                self._send_json(201, {"analyzerId": analyzer_id, "status": "ready"},
+                                {"Operation-Location": f"http://{host}{self.path}"})
+
+        return Handler
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    defaults = EmulatorConfig.from_env()
+    parser = argparse.ArgumentParser(description="Local emulator for Text Analytics, Face and Content Understanding")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("EMULATOR_PORT", DEFAULT_PORT)))
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--latency-jitter-ms", type=float, default=defaults.latency_jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate)
+    parser.add_argument("--retry-after-sec", type=int, default=defaults.retry_after_sec)
+    parser.add_argument("--job-duration-sec", type=float, default=defaults.job_duration_sec)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    config = EmulatorConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after_sec=args.retry_after_sec,
+        job_duration_sec=args.job_duration_sec,
+        seed=args.seed
+    )
+
+    with AzureEmulator(config, host=args.host, port=args.port) as emulator:
+        print(f"🧪 Azure emulator listening on {emulator.endpoint}")
+        print(f"   COG_ENDPOINT={emulator.endpoint}")
+        print(f"   CONTENT_UNDERSTANDING_ENDPOINT={emulator.endpoint}")
+        print(f"⏱️  latency {args.latency_ms}±{args.latency_jitter_ms} ms | errors {args.error_rate:.0%} | 429s {args.throttle_rate:.0%}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print("👋 Stopping emulator")
@@ -0,0 +1,137 @@
+import pytest
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+
+import requests
+from azure.ai.textanalytics import TextAnalyticsClient
+from azure.core.credentials import AzureKeyCredential
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from azure_emulator import AzureEmulator, EmulatorConfig
+
+PART_C = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "partC_facial_analysis")
+
+class TestAzureEmulator:
+
+    def test_text_analytics_sdk_round_trip(self):
+        with AzureEmulator() as emulator:
+            client = TextAnalyticsClient(emulator.endpoint, AzureKeyCredential("local"))
+            result = client.analyze_sentiment(["I absolutely love how clear this explanation is!"])[0]
+
+        assert result.sentiment == "positive"
+        assert result.confidence_scores.positive > result.confidence_scores.negative
+        assert len(result.sentences) == 1
+
+    def test_face_detect_is_deterministic(self):
+        with AzureEmulator() as emulator:
+            url = f"{emulator.endpoint}/face/v1.0/detect"
+            headers = {"Ocp-Apim-Subscription-Key": "local", "Content-Type": "application/octet-stream"}
+            first = requests.post(url, headers=headers, data=b"frame-1").json()
+            second = requests.post(url, headers=headers, data=b"frame-1").json()
+            unauthorized = requests.post(url, data=b"frame-1")
+
+        assert first == second
+        assert all("smile" in face["faceAttributes"] for face in first)
+        assert unauthorized.status_code == 401
+
+    def test_content_understanding_submit_and_poll(self):
+        sys.path.insert(0, PART_C)
+        import utils
+
+        with AzureEmulator(EmulatorConfig(job_duration_sec=0.2)) as emulator:
+            with patch.dict(os.environ, {"CONTENT_UNDERSTANDING_ENDPOINT": emulator.endpoint,
+                                         "CONTENT_UNDERSTANDING_KEY": "local"}):
+                submit = requests.post(
+                    f"{emulator.endpoint}/documentintelligence/documentAnalyzers/prebuilt-videoAnalyzer:analyze",
+                    params={"api-version": "2024-07-31-preview"},
+                    headers={"Ocp-Apim-Subscription-Key": "local"},
+                    json={"urlSource": "https://example.com/talk.mp4"}
+                )
+                running = utils.check_analysis_status(submit.headers["Operation-Location"])
+                # Shorten the 15s poll interval
+                real_sleep = time.sleep
+                with patch('utils.time.sleep', lambda seconds: real_sleep(0.1)):
+                    result = utils.analyze_video_with_content_understanding("https://example.com/talk.mp4")
+
+        assert submit.status_code == 202
+        assert running["status"] in ("notStarted", "running")
+        assert "documents" in result and "contentExtraction" in result
+        assert utils.generate_presentation_insights(result)["content_analysis"]["transcript"].startswith("WEBVTT")
+
+    def test_video_analyzer_registered_once_and_used_by_reference(self):
+        sys.path.insert(0, PART_C)
+        import utils
+
+        with AzureEmulator(EmulatorConfig(job_duration_sec=0)) as emulator:
+            with patch.dict(os.environ, {"CONTENT_UNDERSTANDING_ENDPOINT": emulator.endpoint,
+                                         "CONTENT_UNDERSTANDING_KEY": "local"}):
+                client_config = utils.get_content_understanding_client()
+                with patch.object(client_config['session'], 'post', wraps=client_config['session'].post) as post:
+                    for i in range(3):
+                        utils.analyze_video_with_content_understanding(f"https://example.com/talk-{i}.mp4")
+                # A fresh process finds the analyzer already registered and does not recreate it
+                utils._registered_analyzers.clear()
+                assert utils.ensure_video_analyzer(client_config) == utils.video_analyzer_id()
+            stats = requests.get(f"{emulator.endpoint}/emulator/stats").json()
+
+        analyzer_id = utils.video_analyzer_id()
+        assert analyzer_id in emulator.analyzers
+        assert stats["analyzers_created"] == 1
+        # lookup, create, readiness poll, then one lookup after the cache reset
+        assert stats["content_understanding_analyzer"] == 4
+        assert all(f"/documentAnalyzers/{analyzer_id}:analyze" in call.args[0] for call in post.call_args_list)
+        assert all(call.kwargs["json"] == {"urlSource": f"https://example.com/talk-{i}.mp4"}
+                   for i, call in enumerate(post.call_args_list))
+
+    def test_local_file_upload_streams_with_flat_memory(self):
+        sys.path.insert(0, PART_C)
+        import utils
+
+        size = 256 * 1024 * 1024
+        handle, path = tempfile.mkstemp(suffix=".mp4")
+        os.close(handle)
+        os.truncate(path, size)  # sparse, so the synthetic file costs no disk
+        try:
+            with AzureEmulator(EmulatorConfig(job_duration_sec=0)) as emulator:
+                with patch.dict(os.environ, {"CONTENT_UNDERSTANDING_ENDPOINT": emulator.endpoint,
+                                             "CONTENT_UNDERSTANDING_KEY": "local"}):
+                    utils.ensure_video_analyzer(utils.get_content_understanding_client())
+                    tracemalloc.start()
+                    try:
+                        result = utils.analyze_video_with_content_understanding(video_file=path)
+                        _, peak = tracemalloc.get_traced_memory()
+                    finally:
+                        tracemalloc.stop()
+                stats = requests.get(f"{emulator.endpoint}/emulator/stats").json()
+        finally:
+            os.remove(path)
+
+        assert "documents" in result
+        assert stats["content_understanding_upload_bytes"] == size
+        # Client and emulator both hold at most a few chunks at a time
+        assert peak < 16 * 1024 * 1024
+
+    def test_fault_injection(self):
+        config = EmulatorConfig(throttle_rate=0.5, error_rate=0.25, retry_after_sec=3, seed=7)
+        with AzureEmulator(config) as emulator:
+            url = f"{emulator.endpoint}/face/v1.0/detect"
+            responses = [
+                requests.post(url, headers={"Ocp-Apim-Subscription-Key": "local"}, data=b"x")
+                for _ in range(80)
+            ]
+            stats = requests.get(f"{emulator.endpoint}/emulator/stats").json()
+
+        statuses = [response.status_code for response in responses]
+        assert {200, 429, 500} == set(statuses)
+        assert all(r.headers["Retry-After"] == "3" for r in responses if r.status_code == 429)
+        assert stats["throttled"] == statuses.count(429)
+        assert stats["errors"] == statuses.count(500)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -3,6 +3,7 @@ import datetime
 import json
 import logging
 import utils
+from typing import Dict, List
 
 app = func.FunctionApp()
 
@@ -176,6 +177,15 @@ def analyze_combined(req: func.HttpRequest) -> func.HttpResponse:
         status_code=200
     )
 
+@app.function_name(name="warmup")
+@app.warm_up_trigger("warmup_context")
+def warmup(warmup_context) -> None:
+    """
+    Runs when the platform adds an instance (Premium and Dedicated plans only), so the
+    Text Analytics SDK and client are ready before the instance takes traffic
+    """
+    logging.info(f"Instance warmup: {utils.warmup()}")
+
 def generate_coaching_insights(metrics: Dict, pauses: Dict, sentiment: Dict) -> Dict:
     """Generate professional coaching insights."""
     insights = {
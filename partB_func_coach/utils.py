@@ -1,5 +1,6 @@
 import re
-from typing import Dict, Tuple, List
+import os
+from typing import Any, Dict, Tuple, List
 import statistics
 import math
 
@@ -14,6 +15,10 @@ INTENSIFIERS = re.compile(r'\b(very|really|totally|absolutely|completely|extreme
 PROFESSIONAL_TERMS = re.compile(r'\b(implement|analyze|optimize|strategy|solution|framework|methodology|approach|evaluate|assess|demonstrate|indicate|suggest|recommend|conclude)\b', re.I)
 WEAK_LANGUAGE = re.compile(r'\b(maybe|perhaps|kind of|sort of|i think|i guess|probably|might|could be)\b', re.I)
 
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+')
+HIGH_ENERGY_WORDS = re.compile(r'\b(excited|amazing|fantastic|incredible|outstanding|excellent|wonderful|great|awesome|brilliant)\b', re.I)
+ENGAGEMENT_WORDS = re.compile(r'\b(imagine|consider|think about|picture|visualize|let me show you|check this out)\b', re.I)
+
 def strip_vtt(vtt_text: str) -> Tuple[str, float]:
     """Return plain transcript text and total duration (in seconds)."""
     lines = []
@@ -91,7 +96,7 @@ def transcript_metrics(text: str, duration_sec: float) -> Dict:
     filler_rate = round((filler_count / duration_sec) * 60, 1)
     
     # Analyze sentence structure
-    sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+    sentences = [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
     avg_sentence_length = round(word_count / max(1, len(sentences)), 1)
     
     return {
@@ -130,14 +135,27 @@ def assess_speech_quality(wpm: float, filler_rate: float) -> str:
         return "needs_improvement"
 
 
-from azure.ai.textanalytics import TextAnalyticsClient
-from azure.core.credentials import AzureKeyCredential
-import os
+# One client per (endpoint, key); the SDK is imported on first use so routes that never
+# call Text Analytics do not pay for it at cold start
+_text_analytics_clients: Dict[Tuple[str, str], Any] = {}
+
+def get_text_analytics_client():
+    from azure.ai.textanalytics import TextAnalyticsClient
+    from azure.core.credentials import AzureKeyCredential
 
-def get_text_analytics_client() -> TextAnalyticsClient:
     endpoint = os.environ["COG_ENDPOINT"]
     key      = os.environ["COG_KEY"]
-    return TextAnalyticsClient(endpoint, AzureKeyCredential(key))
+    client = _text_analytics_clients.get((endpoint, key))
+    if client is None:
+        client = _text_analytics_clients[(endpoint, key)] = TextAnalyticsClient(endpoint, AzureKeyCredential(key))
+    return client
+
+def warmup() -> Dict[str, Any]:
+    """Import the SDK and build the Text Analytics client ahead of the first real request"""
+    if not (os.environ.get("COG_ENDPOINT") and os.environ.get("COG_KEY")):
+        return {"text_analytics": "not_configured"}
+    get_text_analytics_client()
+    return {"text_analytics": "ready"}
 
 def sentiment_scores(text: str) -> dict:
     """Return overall label and positive/negative percentages."""
@@ -173,7 +191,7 @@ def enhanced_transcript_metrics(text: str, duration_sec: float, vtt_text: str =
     intensifiers = INTENSIFIERS.findall(text)
     
     # Sentence structure analysis
-    sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+    sentences = [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
     sentence_lengths = [len(s.split()) for s in sentences]
     avg_sentence_length = round(statistics.mean(sentence_lengths) if sentence_lengths else 0, 1)
     sentence_variety = calculate_sentence_variety(sentence_lengths)
@@ -234,7 +252,7 @@ def enhanced_transcript_metrics(text: str, duration_sec: float, vtt_text: str =
         },
         "presentation_scores": {
             "confidence_score": confidence_score,
-            "overall_quality": assess_overall_quality(confidence_score, wpm, filler_rate),
+            "overall_quality": assess_overall_quality(confidence_score["score"], wpm, filler_rate),
             "professional_readiness": assess_professional_readiness(
                 professional_terms, weak_language, filler_rate
             )
@@ -303,10 +321,10 @@ def analyze_energy_levels(text: str) -> Dict:
     exclamations = text.count('!')
     
     # Energy words
-    high_energy_words = re.findall(r'\b(excited|amazing|fantastic|incredible|outstanding|excellent|wonderful|great|awesome|brilliant)\b', text, re.I)
+    high_energy_words = HIGH_ENERGY_WORDS.findall(text)
     
     # Engagement words
-    engagement_words = re.findall(r'\b(imagine|consider|think about|picture|visualize|let me show you|check this out)\b', text, re.I)
+    engagement_words = ENGAGEMENT_WORDS.findall(text)
     
     # Question marks (audience engagement)
     questions = text.count('?')
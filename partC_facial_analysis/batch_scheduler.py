@@ -0,0 +1,126 @@
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# Process-wide budgets for Content Understanding jobs started by batch analyses
+DEFAULT_MAX_CONCURRENT_JOBS = 4
+DEFAULT_SUBMITS_PER_MINUTE = 30
+# Face API requests per second across all batch jobs (the S0 tier allows 10)
+DEFAULT_FACE_API_CALLS_PER_SEC = 10
+
+class TokenBucket:
+    """Blocking rate limiter: rate_per_sec tokens per second, up to burst saved up"""
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_sec)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate_per_sec
+            time.sleep(delay)
+            waited += delay
+
+class FairScheduler:
+    """
+    Run units of work for many owners (batches) under one concurrency and rate budget
+    Each owner has its own FIFO queue and idle workers take the next unit round-robin across
+    owners, so a large batch cannot hold back batches queued after it.
+    rate_limiter is taken once per unit start (one Content Understanding submit); units that
+    call a service many times (Face API) take call_limiter before every request instead.
+    Workers are started on first use and live for the life of the process.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT_JOBS, rate_limiter: Optional[TokenBucket] = None,
+                 call_limiter: Optional[TokenBucket] = None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.rate_limiter = rate_limiter
+        self.call_limiter = call_limiter
+        self._queues: "OrderedDict[str, Deque[Tuple[Callable[[], Any], Future, bool]]]" = OrderedDict()
+        self._ready = threading.Condition()
+        self._workers = []
+        self._running = 0
+
+    def submit(self, owner: str, fn: Callable[[], Any], rate_limited: bool = True) -> Future:
+        """Queue fn under owner; rate_limited=False skips the per-unit rate budget"""
+        future = Future()
+        with self._ready:
+            self._queues.setdefault(owner, deque()).append((fn, future, rate_limited))
+            if not self._workers:
+                for i in range(self.max_concurrent):
+                    worker = threading.Thread(target=self._work, name=f"batch-worker-{i}", daemon=True)
+                    worker.start()
+                    self._workers.append(worker)
+            self._ready.notify()
+        return future
+
+    def _next(self) -> Tuple[Callable[[], Any], Future, bool]:
+        with self._ready:
+            while not self._queues:
+                self._ready.wait()
+            owner, queue = next(iter(self._queues.items()))
+            item = queue.popleft()
+            # Rotate so the next worker serves a different owner
+            if queue:
+                self._queues.move_to_end(owner)
+            else:
+                del self._queues[owner]
+            self._running += 1
+            return item
+
+    def _work(self):
+        while True:
+            fn, future, rate_limited = self._next()
+            try:
+                if future.set_running_or_notify_cancel():
+                    if rate_limited and self.rate_limiter is not None:
+                        self.rate_limiter.acquire()
+                    try:
+                        future.set_result(fn())
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._ready:
+                    self._running -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._ready:
+            return {
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "running": self._running,
+                "owners_waiting": len(self._queues),
+                "max_concurrent": self.max_concurrent
+            }
+
+_batch_scheduler: Optional[FairScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_batch_scheduler() -> FairScheduler:
+    """
+    Shared scheduler, so concurrent batches draw on the same budget
+    Configured from BATCH_MAX_CONCURRENT_JOBS / BATCH_SUBMITS_PER_MINUTE / BATCH_FACE_API_CALLS_PER_SEC
+    """
+    global _batch_scheduler
+    with _scheduler_lock:
+        if _batch_scheduler is None:
+            max_concurrent = int(os.environ.get("BATCH_MAX_CONCURRENT_JOBS", DEFAULT_MAX_CONCURRENT_JOBS))
+            submits_per_minute = float(os.environ.get("BATCH_SUBMITS_PER_MINUTE", DEFAULT_SUBMITS_PER_MINUTE))
+            face_calls_per_sec = float(os.environ.get("BATCH_FACE_API_CALLS_PER_SEC", DEFAULT_FACE_API_CALLS_PER_SEC))
+            _batch_scheduler = FairScheduler(max_concurrent, TokenBucket(submits_per_minute / 60, burst=max_concurrent),
+                                             TokenBucket(face_calls_per_sec, burst=max(1, int(face_calls_per_sec))))
+        return _batch_scheduler
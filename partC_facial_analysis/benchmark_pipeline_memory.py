@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Peak memory of list-based vs streaming (bounded-queue) video analysis against frame count
+Each run happens in a fresh subprocess so ru_maxrss reflects only that run.
+The Face API is replaced by a canned response with full landmarks - no Azure resources needed
+"""
+import os
+import sys
+import json
+import resource
+import subprocess
+import tempfile
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+FRAME_COUNTS = (50, 150, 450)
+
+LANDMARK_NAMES = [
+    "pupilLeft", "pupilRight", "noseTip", "mouthLeft", "mouthRight", "eyebrowLeftOuter", "eyebrowLeftInner",
+    "eyeLeftOuter", "eyeLeftTop", "eyeLeftBottom", "eyeLeftInner", "eyebrowRightInner", "eyebrowRightOuter",
+    "eyeRightInner", "eyeRightTop", "eyeRightBottom", "eyeRightOuter", "noseRootLeft", "noseRootRight",
+    "noseLeftAlarTop", "noseRightAlarTop", "noseLeftAlarOutTip", "noseRightAlarOutTip", "upperLipTop",
+    "upperLipBottom", "underLipTop", "underLipBottom"
+]
+
+def fake_detect(image_data: bytes) -> dict:
+    """Face API shaped response with one face and all 27 landmarks"""
+    face = {
+        "faceId": "00000000-0000-0000-0000-000000000000",
+        "faceRectangle": {"left": 100, "top": 80, "width": 120, "height": 120},
+        "faceLandmarks": {name: {"x": 100.0 + i, "y": 80.0 + i} for i, name in enumerate(LANDMARK_NAMES)},
+        "faceAttributes": {
+            "smile": 0.6, "age": 35.0, "qualityForRecognition": "high",
+            "headPose": {"yaw": 1.0, "pitch": 2.0, "roll": 0.5}
+        }
+    }
+    return {"success": True, "face_count": 1, "faces": [face]}
+
+def make_video(path: str, frame_total: int, size=(1280, 720)):
+    """Smooth colour fields plus sensor-like noise keep the JPEGs close to real 720p footage"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 30, size)
+    rng = np.random.default_rng(0)
+    for _ in range(frame_total):
+        frame = cv2.resize(rng.integers(0, 255, (9, 16, 3), dtype=np.uint8), size, interpolation=cv2.INTER_LINEAR)
+        writer.write(cv2.add(frame, rng.integers(0, 40, frame.shape, dtype=np.uint8)))
+    writer.release()
+
+def run_worker(mode: str, frame_count: int, video_path: str):
+    import utils_new
+
+    # Plain functions rather than Mocks - a Mock would keep every uploaded JPEG in call_args_list
+    with patch('utils_new.detect_faces_in_image', fake_detect), patch('utils_new.time.sleep', lambda seconds: None):
+        if mode == "stream":
+            result = utils_new.analyze_video_streaming(video_file=video_path, max_frames=frame_count,
+                                                       prefilter_faces=False)
+        else:
+            # Previous shape: every JPEG in a list, every face payload kept until the end
+            frames = utils_new.extract_frames_from_video(video_path, max_frames=frame_count, dedup_threshold=None)
+            frame_analyses = []
+            all_faces = []
+            for i, frame_data in enumerate(frames):
+                detection = utils_new.detect_faces_in_image(frame_data)
+                frame_analyses.append({"frame_number": i + 1, "timestamp": f"{i * 2:.1f}s",
+                                       "face_count": detection["face_count"], "faces": detection["faces"]})
+                all_faces.extend(detection["faces"])
+            result = {"success": True, "insights": utils_new.generate_video_insights(frame_analyses, all_faces)}
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"success": result["success"], "peak_rss_mb": round(peak_kb / 1024, 1)}))
+
+def measure(mode: str, frame_count: int, video_path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", mode, str(frame_count), video_path],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        run_worker(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        sys.exit(0)
+
+    print("🧠 Pipeline Peak Memory Benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = os.path.join(temp_dir, "noise.mp4")
+        print(f"🎬 Generating {max(FRAME_COUNTS)}-frame synthetic video...")
+        make_video(video_path, max(FRAME_COUNTS))
+
+        for frame_count in FRAME_COUNTS:
+            batch = measure("list", frame_count, video_path)
+            stream = measure("stream", frame_count, video_path)
+            print(f"📸 {frame_count:4d} frames | list: {batch['peak_rss_mb']:7.1f} MB | "
+                  f"streaming: {stream['peak_rss_mb']:7.1f} MB")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare staged download-then-decode against the streaming download/decode pipeline
+Serves a synthetic video from a local throttled HTTP server - no Azure resources needed
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from utils_new import download_video, extract_frames_from_video
+from video_fetch import StreamingVideoDownload
+
+def make_video(path: str, frame_total: int, size=(640, 360)) -> bytes:
+    """Write a noisy MJPEG AVI so the file is large enough to matter"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, size)
+    rng = np.random.default_rng(0)
+    for i in range(frame_total):
+        frame = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+        cv2.putText(frame, str(i), (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+    with open(path, 'rb') as f:
+        return f.read()
+
+def start_server(body: bytes, bytes_per_sec: int):
+    """Serve body at a fixed bandwidth to mimic a remote blob store"""
+    slice_size = 64 * 1024
+    delay = slice_size / bytes_per_sec
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                for offset in range(0, len(body), slice_size):
+                    self.wfile.write(body[offset:offset + slice_size])
+                    time.sleep(delay)
+            except ConnectionError:
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/video.avi"
+
+def run_staged(url: str, max_frames: int) -> float:
+    start = time.time()
+    video_path = download_video(url)
+    try:
+        extract_frames_from_video(video_path, max_frames=max_frames)
+    finally:
+        os.unlink(video_path)
+    return time.time() - start
+
+def run_streaming(url: str, max_frames: int) -> float:
+    start = time.time()
+    with StreamingVideoDownload(url) as download:
+        extract_frames_from_video(download.path, max_frames=max_frames, download=download)
+    return time.time() - start
+
+if __name__ == "__main__":
+    frame_total = int(sys.argv[1]) if len(sys.argv) > 1 else 900
+    bandwidth_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print("⏱️  Streaming Download Benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        body = make_video(os.path.join(work_dir, "source.avi"), frame_total)
+        server, url = start_server(body, int(bandwidth_mb * 1024 * 1024))
+        print(f"📹 {frame_total} frames, {len(body) / 1024 / 1024:.1f} MB at {bandwidth_mb} MB/s")
+
+        try:
+            staged = run_staged(url, max_frames=10)
+            streaming = run_streaming(url, max_frames=10)
+        finally:
+            server.shutdown()
+
+    print(f"📥 Staged download + decode: {staged:.2f}s")
+    print(f"🌊 Streaming download/decode: {streaming:.2f}s")
+    print(f"✅ Time saved: {staged - streaming:.2f}s ({(1 - streaming / staged) * 100:.0f}%)")
@@ -0,0 +1,180 @@
+import os
+import hmac
+import json
+import time
+import socket
+import hashlib
+import logging
+import ipaddress
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.connection import create_connection
+
+CALLBACK_SECRET_ENV = "CALLBACK_SIGNING_SECRET"
+# Comma-separated receiver hosts; when set, only these hosts are accepted
+CALLBACK_ALLOWED_HOSTS_ENV = "CALLBACK_ALLOWED_HOSTS"
+SIGNATURE_HEADER = "X-Signature-256"
+TIMESTAMP_HEADER = "X-Signature-Timestamp"
+
+CALLBACK_RETRIES = 5
+CALLBACK_BACKOFF_SEC = 2.0
+CALLBACK_MAX_BACKOFF_SEC = 60.0
+CALLBACK_TIMEOUT_SEC = 10
+
+def get_signing_secret() -> Optional[str]:
+    return os.environ.get(CALLBACK_SECRET_ENV) or None
+
+def get_allowed_hosts() -> Set[str]:
+    hosts = os.environ.get(CALLBACK_ALLOWED_HOSTS_ENV, "")
+    return {host.strip().lower() for host in hosts.split(",") if host.strip()}
+
+def is_public_address(address: str) -> bool:
+    """True for globally routable unicast addresses (not loopback, link-local, private or reserved)"""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    return ip.is_global and not ip.is_multicast
+
+def resolve_public_addresses(host: str, port: int) -> List[str]:
+    """Addresses host resolves to; ValueError if it does not resolve or any of them is not public"""
+    try:
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, ValueError):
+        raise ValueError("callback_url host does not resolve")
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    if not all(is_public_address(address) for address in addresses):
+        raise ValueError("callback_url must not point at a private, loopback or link-local address")
+    return addresses
+
+class _PublicAddressHTTPSConnection(HTTPSConnection):
+    """
+    HTTPS connection that resolves its host, checks the addresses and connects to one of them
+    The check and the connection use the same DNS answer, so the host cannot be rebound to an
+    internal address in between. TLS (SNI and certificate) and the Host header keep the hostname.
+    """
+
+    def _new_conn(self):
+        last_error = None
+        for address in resolve_public_addresses(self.host, self.port):
+            try:
+                return create_connection((address, self.port), self.timeout, source_address=self.source_address,
+                                         socket_options=self.socket_options)
+            except OSError as e:
+                last_error = e
+        raise NewConnectionError(self, f"Failed to establish a new connection: {last_error}")
+
+class _PublicAddressHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PublicAddressHTTPSConnection
+
+class PublicAddressAdapter(HTTPAdapter):
+    """Transport adapter whose https connections only reach public addresses, checked at connect time"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            **self.poolmanager.pool_classes_by_scheme,
+            "https": _PublicAddressHTTPSConnectionPool
+        }
+
+def validate_callback_url(callback_url: Any) -> str:
+    """
+    Raise ValueError unless callback_url is safe to POST results to
+    The function must not be usable to reach its own network, so the URL must be https and every
+    address its host resolves to must be public. Hosts listed in CALLBACK_ALLOWED_HOSTS are
+    operator-trusted receivers (e.g. on a private network) and skip those checks; when the
+    setting is present, no other host is accepted.
+    """
+    parsed = urlparse(callback_url) if isinstance(callback_url, str) else None
+    if parsed is None or parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callback_url must be an absolute http(s) URL")
+
+    allowed_hosts = get_allowed_hosts()
+    if allowed_hosts:
+        if parsed.hostname.lower() not in allowed_hosts:
+            raise ValueError(f"callback_url host is not in {CALLBACK_ALLOWED_HOSTS_ENV}")
+        return callback_url
+
+    if parsed.scheme != "https":
+        raise ValueError("callback_url must use https")
+    resolve_public_addresses(parsed.hostname, parsed.port or 443)
+    return callback_url
+
+def sign_payload(body: bytes, timestamp: str, secret: str) -> str:
+    """HMAC-SHA256 over "<timestamp>.<body>", formatted as sha256=<hex>"""
+    digest = hmac.new(secret.encode('utf-8'), timestamp.encode('utf-8') + b"." + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+def verify_signature(body: bytes, timestamp: str, signature: str, secret: str, tolerance_sec: float = 300) -> bool:
+    """Receiver-side check: valid signature and a timestamp within tolerance (replay protection)"""
+    try:
+        if abs(time.time() - int(timestamp)) > tolerance_sec:
+            return False
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(sign_payload(body, timestamp, secret), signature or "")
+
+def deliver_callback(callback_url: str, payload: Dict[str, Any], secret: str,
+                     retries: int = CALLBACK_RETRIES, backoff_sec: float = CALLBACK_BACKOFF_SEC) -> bool:
+    """
+    POST payload to callback_url once it is accepted, signing every attempt afresh
+    Connection errors, 429 and 5xx are retried with exponential backoff (429 honours
+    Retry-After); other 4xx responses mean the receiver rejected it and are not retried.
+    Redirects are not followed, so a receiver cannot bounce the POST to an unchecked host.
+    Unless the host is allowlisted, every connection re-checks the addresses and connects to
+    the checked one (PublicAddressAdapter), so a DNS answer that changes after validation is
+    refused rather than followed.
+    """
+    # Checked again at delivery: the host may resolve elsewhere by the time the analysis is done
+    try:
+        validate_callback_url(callback_url)
+    except ValueError as e:
+        logging.error(f"Not delivering callback to {callback_url}: {str(e)}")
+        return False
+
+    session = requests.Session()
+    if not get_allowed_hosts():
+        # No proxy either: it would resolve the host itself, past the check
+        session.trust_env = False
+        session.mount("https://", PublicAddressAdapter())
+
+    with session:
+        return _post_with_retries(session, callback_url, payload, secret, retries, backoff_sec)
+
+def _post_with_retries(session: requests.Session, callback_url: str, payload: Dict[str, Any], secret: str,
+                       retries: int, backoff_sec: float) -> bool:
+    body = json.dumps(payload).encode('utf-8')
+    for attempt in range(retries + 1):
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign_payload(body, timestamp, secret),
+            TIMESTAMP_HEADER: timestamp
+        }
+        delay = min(backoff_sec * 2 ** attempt, CALLBACK_MAX_BACKOFF_SEC)
+        try:
+            response = session.post(callback_url, data=body, headers=headers, timeout=CALLBACK_TIMEOUT_SEC,
+                                    allow_redirects=False)
+        except requests.RequestException as e:
+            logging.warning(f"Callback delivery to {callback_url} failed (attempt {attempt + 1}): {str(e)}")
+        except ValueError as e:
+            # The host now resolves to an internal address
+            logging.error(f"Not delivering callback to {callback_url}: {str(e)}")
+            return False
+        else:
+            if response.status_code < 300:
+                return True
+            if response.status_code != 429 and response.status_code < 500:
+                logging.error(f"Callback rejected by {callback_url}: {response.status_code}")
+                return False
+            logging.warning(f"Callback delivery to {callback_url} got {response.status_code} (attempt {attempt + 1})")
+            retry_after = response.headers.get('Retry-After', '')
+            if response.status_code == 429 and retry_after.isdigit():
+                delay = min(float(retry_after), CALLBACK_MAX_BACKOFF_SEC)
+        if attempt < retries:
+            time.sleep(delay)
+
+    logging.error(f"Giving up on callback to {callback_url} after {retries + 1} attempts")
+    return False
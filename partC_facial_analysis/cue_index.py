@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+VTT_TIME = re.compile(r'(?:(\d+):)?(\d{2}):(\d{2})\.(\d{3})')
+
+def _clock_seconds(match) -> float:
+    hours, minutes, seconds, millis = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis) / 1000
+
+def parse_vtt_cues(vtt_text: str) -> List[Dict[str, Any]]:
+    """WebVTT cues as {"start", "end", "text"} (seconds), in file order"""
+    cues = []
+    current = None
+    for line in vtt_text.splitlines():
+        line = line.strip()
+        if "-->" in line:
+            times = list(VTT_TIME.finditer(line))
+            if len(times) >= 2:
+                current = {"start": _clock_seconds(times[0]), "end": _clock_seconds(times[1]), "lines": []}
+                cues.append(current)
+                continue
+        if not line:
+            current = None
+        elif current is not None:
+            current["lines"].append(line)
+    return [{"start": cue["start"], "end": cue["end"], "text": " ".join(cue["lines"])} for cue in cues]
+
+def timestamp_seconds(value: Any) -> float:
+    """Seconds from 12.5, "12.5s", "00:02:30" or "00:02:30.500"; NaN when unparseable"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = str(value).strip()
+    try:
+        if text.endswith('s'):
+            return float(text[:-1])
+        parts = text.split(':')
+        if len(parts) > 3:
+            return math.nan
+        return sum(float(part) * 60 ** i for i, part in enumerate(reversed(parts)))
+    except ValueError:
+        return math.nan
+
+class CueIndex:
+    """
+    Sorted interval index over transcript cues for time joins
+    Cue starts are kept sorted so a time is matched to its cue with one binary search
+    (np.searchsorted), O(log n) per lookup and vectorized for whole timelines. A time maps
+    to the latest cue that started at or before it, if that cue has not ended yet.
+    """
+
+    def __init__(self, cues: Sequence[Dict[str, Any]]):
+        order = sorted(range(len(cues)), key=lambda i: cues[i]["start"])
+        self.cues = [cues[i] for i in order]
+        self.starts = np.array([cue["start"] for cue in self.cues], dtype=np.float64)
+        self.ends = np.array([cue["end"] for cue in self.cues], dtype=np.float64)
+
+    @classmethod
+    def from_vtt(cls, vtt_text: str) -> "CueIndex":
+        return cls(parse_vtt_cues(vtt_text))
+
+    def __len__(self) -> int:
+        return len(self.cues)
+
+    def lookup_many(self, times: Sequence[float]) -> np.ndarray:
+        """Cue position for each time (-1 where no cue is being spoken or the time is NaN)"""
+        times = np.asarray(times, dtype=np.float64)
+        positions = np.searchsorted(self.starts, times, side='right') - 1
+        if not len(self.cues):
+            return np.full(times.shape, -1, dtype=np.int64)
+        inside = (positions >= 0) & (times < self.ends[np.clip(positions, 0, None)])
+        return np.where(inside, positions, -1)
+
+    def lookup(self, time_sec: float) -> Optional[Dict[str, Any]]:
+        position = int(self.lookup_many([time_sec])[0])
+        return self.cues[position] if position >= 0 else None
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from typing import Dict, Any, List
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+QUALITY_CODES = {"low": 1, "medium": 2, "high": 3}
+QUALITY_LABELS = {1: "low", 2: "medium", 3: "high"}
+
+HEAD_POSE_AXES = ("yaw", "pitch", "roll")
+
+# Mean frame-to-frame head movement (degrees) above which the presenter reads as restless
+HEAD_POSE_JITTER_THRESHOLD = 8.0
+
+def pose_summary(means: List[float], stds: List[float], jitters: List[float]) -> Dict[str, Any]:
+    stability = {
+        axis: {"mean": round(mean, 2), "std": round(std, 2), "jitter": round(jitter, 2)}
+        for axis, mean, std, jitter in zip(HEAD_POSE_AXES, means, stds, jitters)
+    }
+    stability["stable"] = all(stability[axis]["jitter"] <= HEAD_POSE_JITTER_THRESHOLD for axis in HEAD_POSE_AXES)
+    return stability
+
+def parse_timestamp(timestamp: Any) -> float:
+    """Seconds from a frame timestamp such as "4.0s" (NaN when missing)"""
+    try:
+        return float(str(timestamp).rstrip('s'))
+    except ValueError:
+        return float('nan')
+
+class FaceAttributeColumns:
+    """
+    Face API results decoded once into one NumPy array per attribute
+    Face rows carry the index of their frame, so per-frame timelines are grouped reductions.
+    Missing numeric attributes are NaN and a missing quality is 0.
+    """
+
+    def __init__(self, frame_analyses: List[Dict]):
+        self.frame_numbers = np.array([f.get("frame_number", i + 1) for i, f in enumerate(frame_analyses)], dtype=np.int64)
+        self.timestamps = np.array([parse_timestamp(f.get("timestamp")) for f in frame_analyses], dtype=np.float64)
+        self.face_counts = np.array([f.get("face_count", 0) for f in frame_analyses], dtype=np.int64)
+
+        frame_index = []
+        smile = []
+        age = []
+        pose = []
+        quality = []
+        nan = float('nan')
+        for i, frame in enumerate(frame_analyses):
+            for face in frame.get("faces", []):
+                attrs = face.get("faceAttributes", {})
+                head_pose = attrs.get("headPose") or {}
+                frame_index.append(i)
+                smile.append(attrs.get("smile", nan))
+                age.append(attrs.get("age", nan))
+                pose.append([head_pose.get(axis, nan) for axis in HEAD_POSE_AXES])
+                quality.append(QUALITY_CODES.get(attrs.get("qualityForRecognition"), 1 if "qualityForRecognition" in attrs else 0))
+
+        self.frame_index = np.array(frame_index, dtype=np.int64)
+        self.smile = np.array(smile, dtype=np.float64)
+        self.age = np.array(age, dtype=np.float64)
+        self.head_pose = np.array(pose, dtype=np.float64).reshape(-1, len(HEAD_POSE_AXES))
+        self.quality = np.array(quality, dtype=np.int64)
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frame_numbers)
+
+    @property
+    def face_count(self) -> int:
+        return len(self.frame_index)
+
+    def mean(self, column: np.ndarray) -> float:
+        values = column[~np.isnan(column)]
+        return float(values.mean()) if values.size else 0.0
+
+    def variance(self, column: np.ndarray) -> float:
+        values = column[~np.isnan(column)]
+        return float(values.var()) if values.size else 0.0
+
+    def quality_distribution(self) -> Dict[str, int]:
+        counts = np.bincount(self.quality, minlength=4)
+        return {QUALITY_LABELS[code]: int(counts[code]) for code in (3, 2, 1)}
+
+    def average_quality(self) -> float:
+        rated = self.quality[self.quality > 0]
+        return float(rated.mean()) if rated.size else 0.0
+
+    def per_frame_mean(self, column: np.ndarray) -> np.ndarray:
+        """Mean of a face column per frame (NaN for frames without a value)"""
+        valid = ~np.isnan(column)
+        totals = np.bincount(self.frame_index[valid], weights=column[valid], minlength=self.frame_count)
+        counts = np.bincount(self.frame_index[valid], minlength=self.frame_count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / counts
+
+    def head_pose_stability(self) -> Dict[str, Any]:
+        """
+        Head pose spread and jitter per axis
+        Jitter is the mean absolute change between consecutive frames (in time order) of the
+        per-frame mean pose, so it ignores how many faces share a frame.
+        """
+        means, stds, jitters = [], [], []
+        order = np.argsort(self.timestamps, kind='stable')
+        for axis_index in range(len(HEAD_POSE_AXES)):
+            column = self.head_pose[:, axis_index]
+            per_frame = self.per_frame_mean(column)[order]
+            per_frame = per_frame[~np.isnan(per_frame)]
+            means.append(self.mean(column))
+            stds.append(float(np.sqrt(self.variance(column))))
+            jitters.append(float(np.abs(np.diff(per_frame)).mean()) if per_frame.size > 1 else 0.0)
+        return pose_summary(means, stds, jitters)
+
+    def timeline(self) -> List[Dict[str, Any]]:
+        """Per-frame face count and mean smile, ordered by timestamp"""
+        smile = self.per_frame_mean(self.smile)
+        order = np.argsort(self.timestamps, kind='stable')
+        return [
+            {
+                "frame_number": int(self.frame_numbers[i]),
+                "timestamp": None if np.isnan(self.timestamps[i]) else float(self.timestamps[i]),
+                "face_count": int(self.face_counts[i]),
+                "avg_smile": None if np.isnan(smile[i]) else round(float(smile[i]), 3)
+            }
+            for i in order
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregates consumed by the video insights report"""
+        return {
+            "faces": self.face_count,
+            "frames": self.frame_count,
+            "frames_with_faces": int((self.face_counts > 0).sum()),
+            "avg_smile": self.mean(self.smile),
+            "smile_variance": self.variance(self.smile),
+            "avg_age": self.mean(self.age),
+            "avg_quality": self.average_quality(),
+            "quality_distribution": self.quality_distribution(),
+            "head_pose_stability": self.head_pose_stability(),
+            "timeline": self.timeline()
+        }
+
+class RunningStats:
+    """Count, mean and variance updated batch by batch (Chan et al. parallel update)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean_value = 0.0
+        self.m2 = 0.0
+
+    def add(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + values.size
+        delta = batch_mean - self.mean_value
+        self.mean_value += delta * values.size / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * values.size / total
+        self.count = total
+
+    @property
+    def mean(self) -> float:
+        return self.mean_value if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+class FaceAttributeAccumulator:
+    """
+    Incremental counterpart of FaceAttributeColumns for streamed frames
+    Keeps running aggregates and one small timeline row per frame; per-face payloads
+    (landmarks, rectangles) are dropped as soon as each frame is added.
+    Frames must arrive in time order for head-pose jitter to be meaningful.
+    """
+
+    def __init__(self):
+        self.face_count = 0
+        self.frame_count = 0
+        self.frames_with_faces = 0
+        self.smile = RunningStats()
+        self.age = RunningStats()
+        self.pose = [RunningStats() for _ in HEAD_POSE_AXES]
+        self.quality_counts = np.zeros(4, dtype=np.int64)
+        self.jitter_total = np.zeros(len(HEAD_POSE_AXES))
+        self.jitter_steps = np.zeros(len(HEAD_POSE_AXES), dtype=np.int64)
+        self.previous_pose = np.full(len(HEAD_POSE_AXES), np.nan)
+        self.timeline_rows = []
+
+    def add_frame(self, frame_analysis: Dict[str, Any]):
+        columns = FaceAttributeColumns([frame_analysis])
+        self.frame_count += 1
+        self.face_count += columns.face_count
+        self.frames_with_faces += int(columns.face_counts[0] > 0)
+        self.smile.add(columns.smile)
+        self.age.add(columns.age)
+        self.quality_counts += np.bincount(columns.quality, minlength=4)
+
+        for axis_index, stats in enumerate(self.pose):
+            stats.add(columns.head_pose[:, axis_index])
+        # NaN for frames without a pose, which then do not break the jitter chain
+        frame_pose = np.array([columns.per_frame_mean(columns.head_pose[:, axis])[0] for axis in range(len(HEAD_POSE_AXES))])
+        step = np.abs(frame_pose - self.previous_pose)
+        counted = ~np.isnan(step)
+        self.jitter_total[counted] += step[counted]
+        self.jitter_steps += counted
+        self.previous_pose = np.where(np.isnan(frame_pose), self.previous_pose, frame_pose)
+
+        self.timeline_rows.extend(columns.timeline())
+
+    def average_quality(self) -> float:
+        rated = self.quality_counts[1:]
+        return float((rated * np.arange(1, 4)).sum() / rated.sum()) if rated.sum() else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Running totals so far, cheap enough to take after every frame (no timeline or pose)"""
+        return {
+            "faces": self.face_count,
+            "frames": self.frame_count,
+            "frames_with_faces": self.frames_with_faces,
+            "avg_smile": self.smile.mean,
+            "avg_quality": self.average_quality()
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            jitters = np.where(self.jitter_steps > 0, self.jitter_total / self.jitter_steps, 0.0)
+        return {
+            "faces": self.face_count,
+            "frames": self.frame_count,
+            "frames_with_faces": self.frames_with_faces,
+            "avg_smile": self.smile.mean,
+            "smile_variance": self.smile.variance,
+            "avg_age": self.age.mean,
+            "avg_quality": self.average_quality(),
+            "quality_distribution": {QUALITY_LABELS[code]: int(self.quality_counts[code]) for code in (3, 2, 1)},
+            "head_pose_stability": pose_summary(
+                [stats.mean for stats in self.pose],
+                [float(np.sqrt(stats.variance)) for stats in self.pose],
+                [float(jitter) for jitter in jitters]
+            ),
+            "timeline": self.timeline_rows
+        }
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from lazy_imports import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# Sampled frames between forced Face API re-detections while tracking still holds
+TRACK_KEYFRAME_INTERVAL = 16
+
+# Optical flow needs consecutive frames: faces are tracked through short windows decoded at
+# TRACK_FPS, spread evenly over the video (32 frames per window: a start and one keyframe)
+TRACK_FPS = 8
+TRACK_WINDOW_SEC = 4
+TRACK_WINDOWS = 5
+
+# Face API calls per video, track losses included: no more than frame sampling makes (max_frames=10)
+TRACK_MAX_DETECTIONS = 10
+
+# Corner features seeded inside each face box
+TRACK_MAX_POINTS = 60
+TRACK_MIN_POINTS = 8
+# A face is lost when fewer than this share of its points survive a step
+TRACK_MIN_SURVIVAL = 0.5
+# Forward-backward flow disagreement (px) above which a point is dropped
+TRACK_MAX_FB_ERROR = 1.0
+# Largest per-step zoom a face box may plausibly undergo
+TRACK_MAX_SCALE_STEP = 1.3
+
+# A re-detected face keeps the id of the track it overlaps at least this much
+TRACK_MATCH_IOU = 0.3
+
+def box_iou(a: Sequence[float], b: Sequence[float]) -> float:
+    """Intersection over union of two (left, top, width, height) boxes"""
+    overlap_w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    overlap_h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if overlap_w <= 0 or overlap_h <= 0:
+        return 0.0
+    overlap = overlap_w * overlap_h
+    return overlap / (a[2] * a[3] + b[2] * b[3] - overlap)
+
+def tracking_windows(total_frames: int, fps: float, windows: int = TRACK_WINDOWS,
+                     window_sec: float = TRACK_WINDOW_SEC, track_fps: float = TRACK_FPS) -> List[Tuple[int, int, int]]:
+    """
+    (first_frame, end_frame, step) of evenly spread windows of consecutive frames at about track_fps
+    A video too short for separate windows is tracked from start to end as one window.
+    """
+    if fps <= 0:
+        return [(0, max(total_frames, 1), 1)]
+    step = max(1, int(round(fps / track_fps)))
+    span = max(step, int(round(window_sec * fps)))
+    if total_frames <= 0 or span * windows >= total_frames:
+        return [(0, total_frames if total_frames > 0 else span * windows, step)]
+    starts = np.linspace(0, total_frames - span, windows).astype(int)
+    return [(int(start), int(start) + span, step) for start in starts]
+
+def face_box(face: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    rect = face.get("faceRectangle", {})
+    return (float(rect.get("left", 0)), float(rect.get("top", 0)),
+            float(rect.get("width", 0)), float(rect.get("height", 0)))
+
+class _Track:
+    """One face followed between detections; box and landmarks are kept in float pixels"""
+
+    def __init__(self, track_id: int, face: Dict[str, Any]):
+        self.track_id = track_id
+        self.face = face
+        self.box = face_box(face)
+        self.landmarks = {name: (point["x"], point["y"]) for name, point in face.get("faceLandmarks", {}).items()}
+        self.roll = 0.0
+        self.points = None
+
+    def seed_points(self, gray: np.ndarray):
+        """Corner features inside the inner part of the box, clear of background at the edges"""
+        left, top, width, height = self.box
+        mask = np.zeros(gray.shape, dtype=np.uint8)
+        x0, y0 = max(0, int(left + width * 0.1)), max(0, int(top + height * 0.1))
+        x1, y1 = int(left + width * 0.9), int(top + height * 0.9)
+        mask[y0:max(y0, y1), x0:max(x0, x1)] = 255
+        self.points = cv2.goodFeaturesToTrack(gray, TRACK_MAX_POINTS, 0.01, 3, mask=mask)
+
+    def apply(self, matrix: np.ndarray):
+        """Move the box and landmarks by a similarity transform and accumulate its rotation as roll"""
+        scale = math.hypot(matrix[0, 0], matrix[1, 0])
+        left, top, width, height = self.box
+        centre = matrix @ np.array([left + width / 2, top + height / 2, 1.0])
+        width, height = width * scale, height * scale
+        self.box = (centre[0] - width / 2, centre[1] - height / 2, width, height)
+        self.landmarks = {
+            name: tuple(matrix @ np.array([x, y, 1.0])) for name, (x, y) in self.landmarks.items()
+        }
+        # Image y points down, so a positive angle is a clockwise tilt, like Face API roll
+        self.roll += math.degrees(math.atan2(matrix[1, 0], matrix[0, 0]))
+
+    def tracked_face(self) -> Dict[str, Any]:
+        """
+        The face at its tracked position
+        Only what the flow measures is reported: rectangle, landmarks and head roll. Smile, age,
+        yaw, pitch and the other attributes exist on detected frames only, so aggregates never
+        count one detection several times.
+        """
+        left, top, width, height = self.box
+        face = {
+            "faceRectangle": {
+                "left": int(round(left)), "top": int(round(top)),
+                "width": int(round(width)), "height": int(round(height))
+            },
+            "faceAttributes": {},
+            "trackId": self.track_id,
+            "tracked": True
+        }
+        if self.landmarks:
+            face["faceLandmarks"] = {name: {"x": float(x), "y": float(y)} for name, (x, y) in self.landmarks.items()}
+        roll = self.face.get("faceAttributes", {}).get("headPose", {}).get("roll")
+        if roll is not None:
+            face["faceAttributes"]["headPose"] = {"roll": round(roll + self.roll, 1)}
+        return face
+
+class FaceTracker:
+    """
+    Follow Face API detections across frames with local optical flow
+    detect(frame) is only called on the first frame, on every keyframe_interval-th frame and
+    whenever a face is lost; in between, corner features inside each face box are tracked with
+    pyramidal Lucas-Kanade (forward-backward checked) and a RANSAC similarity transform moves
+    the box, landmarks and head roll. Frames without faces stay empty until the next keyframe.
+    Once max_detections calls have been made, keyframes are tracked through and frames that
+    need a detection are returned as "skipped".
+    Frames must be consecutive frames of one shot, decoded at a dense fixed rate (see
+    tracking_windows); call reset() before a jump in time.
+    """
+
+    def __init__(self, detect: Callable[[np.ndarray], Dict[str, Any]],
+                 keyframe_interval: int = TRACK_KEYFRAME_INTERVAL, max_detections: Optional[int] = None):
+        self.detect = detect
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.max_detections = max_detections
+        self.tracks: List[_Track] = []
+        self.previous_gray = None
+        self.frames_since_detection = 0
+        self.retry_detection = True
+        self.next_track_id = 1
+        self.stats = {"frames": 0, "detections": 0, "tracked_frames": 0, "keyframes": 0, "track_losses": 0,
+                      "skipped_frames": 0}
+
+    def reset(self):
+        """Forget the current tracks so the next frame is detected again (stats are kept)"""
+        self.tracks = []
+        self.previous_gray = None
+        self.frames_since_detection = 0
+        self.retry_detection = True
+
+    def process(self, frame: np.ndarray) -> Dict[str, Any]:
+        """Faces in this frame with the source of the result ("detected" or "tracked")"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        self.stats["frames"] += 1
+
+        if self.retry_detection or self.previous_gray is None:
+            reason = "start"
+        elif self.frames_since_detection >= self.keyframe_interval:
+            reason = "keyframe"
+        elif not self._follow(gray):
+            reason = "track_lost"
+        else:
+            reason = None
+
+        if reason and self.max_detections is not None and self.stats["detections"] >= self.max_detections:
+            if reason == "keyframe" and self._follow(gray):
+                reason = None
+            else:
+                # Out of Face API calls and nothing left to follow
+                self.tracks = []
+                self.retry_detection = True
+                self.previous_gray = gray
+                self.stats["skipped_frames"] += 1
+                return {"success": False, "error": "Face API call budget spent", "faces": [], "face_count": 0,
+                        "source": "skipped"}
+
+        if reason:
+            result = self._redetect(frame, gray, reason)
+        else:
+            faces = [track.tracked_face() for track in self.tracks]
+            result = {"success": True, "faces": faces, "face_count": len(faces), "source": "tracked"}
+            self.stats["tracked_frames"] += 1
+            self.frames_since_detection += 1
+
+        self.previous_gray = gray
+        return result
+
+    def _follow(self, gray: np.ndarray) -> bool:
+        """Advance every track by one frame; False as soon as one of them is lost"""
+        lk_params = {
+            "winSize": (21, 21),
+            "maxLevel": 3,
+            "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01)
+        }
+        for track in self.tracks:
+            points = track.points
+            if points is None or len(points) < TRACK_MIN_POINTS:
+                # Too little texture in the box to follow it
+                self.stats["track_losses"] += 1
+                return False
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(self.previous_gray, gray, points, None, **lk_params)
+            back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.previous_gray, moved, None, **lk_params)
+            fb_error = np.linalg.norm((points - back).reshape(-1, 2), axis=1)
+            good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < TRACK_MAX_FB_ERROR)
+            if good.sum() < max(TRACK_MIN_POINTS, TRACK_MIN_SURVIVAL * len(points)):
+                self.stats["track_losses"] += 1
+                return False
+
+            matrix, inliers = cv2.estimateAffinePartial2D(points[good], moved[good], method=cv2.RANSAC,
+                                                          ransacReprojThreshold=3.0)
+            scale = math.hypot(matrix[0, 0], matrix[1, 0]) if matrix is not None else 0.0
+            if not 1 / TRACK_MAX_SCALE_STEP <= scale <= TRACK_MAX_SCALE_STEP:
+                self.stats["track_losses"] += 1
+                return False
+
+            track.apply(matrix)
+            left, top, width, height = track.box
+            centre_x, centre_y = left + width / 2, top + height / 2
+            if not (0 <= centre_x < gray.shape[1] and 0 <= centre_y < gray.shape[0]):
+                self.stats["track_losses"] += 1
+                return False
+
+            track.points = moved[good][inliers.ravel() == 1]
+            if len(track.points) < 2 * TRACK_MIN_POINTS:
+                track.seed_points(gray)
+        return True
+
+    def _redetect(self, frame: np.ndarray, gray: np.ndarray, reason: str) -> Dict[str, Any]:
+        result = self.detect(frame)
+        self.stats["detections"] += 1
+        if reason == "keyframe":
+            self.stats["keyframes"] += 1
+        self.frames_since_detection = 0
+        # A failed call leaves nothing to track, so the next frame asks the Face API again
+        self.retry_detection = not result.get("success")
+        if self.retry_detection:
+            self.tracks = []
+            return {**result, "source": "detected", "detect_reason": reason}
+
+        tracks = []
+        unmatched = list(self.tracks)
+        for face in result.get("faces", []):
+            box = face_box(face)
+            best = max(unmatched, key=lambda track: box_iou(track.box, box), default=None)
+            if best is not None and box_iou(best.box, box) >= TRACK_MATCH_IOU:
+                unmatched.remove(best)
+                track_id = best.track_id
+            else:
+                track_id = self.next_track_id
+                self.next_track_id += 1
+            track = _Track(track_id, face)
+            track.seed_points(gray)
+            tracks.append(track)
+        self.tracks = tracks
+
+        faces = [{**track.face, "trackId": track.track_id, "tracked": False} for track in tracks]
+        return {"success": True, "faces": faces, "face_count": len(faces),
+                "source": "detected", "detect_reason": reason}
@@ -0,0 +1,88 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List
+
+# Items allowed to wait between two stages; bounds memory regardless of video length
+PIPELINE_QUEUE_SIZE = 4
+
+# Stage functions return SKIP to drop an item without ending the stream
+SKIP = object()
+_END = object()
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+def _put(target: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(source: queue.Queue, stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+def _feed(items: Iterable[Any], target: queue.Queue, stop: threading.Event):
+    try:
+        for item in items:
+            if not _put(target, item, stop):
+                return
+    except BaseException as e:
+        _put(target, _StageError(e), stop)
+        return
+    _put(target, _END, stop)
+
+def _work(stage: Callable[[Any], Any], source: queue.Queue, target: queue.Queue, stop: threading.Event):
+    while True:
+        item = _get(source, stop)
+        if item is _END or isinstance(item, _StageError):
+            _put(target, item, stop)
+            return
+        try:
+            result = stage(item)
+        except BaseException as e:
+            _put(target, _StageError(e), stop)
+            return
+        if result is not SKIP and not _put(target, result, stop):
+            return
+
+def run_pipeline(items: Iterable[Any], stages: List[Callable[[Any], Any]],
+                 queue_size: int = PIPELINE_QUEUE_SIZE) -> Iterator[Any]:
+    """
+    Stream items through stages, each running on its own thread
+    Stages are connected by queues holding at most queue_size items, so a slow stage
+    applies back-pressure instead of letting earlier stages buffer the whole video.
+    The first exception raised by the source or a stage is re-raised to the consumer.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    threads = [threading.Thread(target=_feed, args=(items, queues[0], stop), name="pipeline-source", daemon=True)]
+    for i, stage in enumerate(stages):
+        threads.append(threading.Thread(
+            target=_work, args=(stage, queues[i], queues[i + 1], stop),
+            name=f"pipeline-stage-{i}", daemon=True
+        ))
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = _get(queues[-1], stop)
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
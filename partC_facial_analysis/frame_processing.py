@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from lazy_imports import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# Haar cascades shipped inside the opencv-python wheel (no extra downloads)
+FRONTAL_FACE_CASCADE = "haarcascade_frontalface_default.xml"
+PROFILE_FACE_CASCADE = "haarcascade_profileface.xml"
+
+# Prefilter works on a small grayscale copy - recall matters more than precision here
+PREFILTER_MAX_WIDTH = 320
+PREFILTER_MIN_FACE_RATIO = 0.06
+
+# Upload preprocessing: faces above this size add bytes but not accuracy to Face API attributes
+UPLOAD_TARGET_FACE_PX = 128
+UPLOAD_MAX_SIDE = 1920
+# Used when no local face is found to size against
+UPLOAD_FALLBACK_MAX_SIDE = 1280
+UPLOAD_BYTE_BUDGET = 250 * 1024
+# Face sizing runs on a larger copy than the prefilter so small faces in 4K frames are still found;
+# frames encoded for upload reuse these boxes as their prefilter decision
+UPLOAD_SIZING_MAX_WIDTH = 640
+JPEG_QUALITY_STEPS = (90, 80, 70, 60)
+
+# Face API accepts images up to 4096x4096; keep mosaics comfortably inside that
+MOSAIC_MAX_SIDE = 4096
+MOSAIC_JPEG_QUALITY = 90
+
+# Keyframe selection scans at most this many low-resolution frames per video
+KEYFRAME_SCAN_BUDGET = 600
+KEYFRAME_THUMB_SIZE = (32, 18)
+# 3 bits per BGR channel -> 512-bin colour histogram
+HISTOGRAM_BITS = 3
+
+# dHash settings: 8x8 gradient bits -> 64-bit hash, distances counted in bits
+DHASH_SIZE = 8
+DEFAULT_DEDUP_THRESHOLD = 6
+
+_cascades = {}
+
+def get_local_face_detector(cascade_name: str = FRONTAL_FACE_CASCADE) -> cv2.CascadeClassifier:
+    """Load an OpenCV Haar cascade once per process"""
+    if cascade_name not in _cascades:
+        cascade_path = os.path.join(cv2.data.haarcascades, cascade_name)
+        cascade = cv2.CascadeClassifier(cascade_path)
+        if cascade.empty():
+            raise Exception(f"Failed to load face cascade: {cascade_path}")
+        _cascades[cascade_name] = cascade
+    return _cascades[cascade_name]
+
+def prepare_prefilter_image(frame: np.ndarray, max_width: int = PREFILTER_MAX_WIDTH) -> np.ndarray:
+    """Downscale and equalize a frame for the local face detector"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    height, width = gray.shape[:2]
+    if width > max_width:
+        scale = max_width / width
+        gray = cv2.resize(gray, (max_width, max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+    return cv2.equalizeHist(gray)
+
+def local_face_boxes(frame: np.ndarray, max_width: int = PREFILTER_MAX_WIDTH) -> np.ndarray:
+    """
+    Find candidate faces with CPU-only Haar cascades, as (x, y, w, h) rows in frame coordinates
+    Frontal faces are checked first, profile faces only when nothing frontal is found
+    """
+    gray = prepare_prefilter_image(frame, max_width)
+    scale = frame.shape[1] / gray.shape[1]
+    min_side = max(20, int(min(gray.shape[:2]) * PREFILTER_MIN_FACE_RATIO))
+
+    for cascade_name in (FRONTAL_FACE_CASCADE, PROFILE_FACE_CASCADE):
+        faces = get_local_face_detector(cascade_name).detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=3,
+            minSize=(min_side, min_side)
+        )
+        if len(faces) > 0:
+            return (np.asarray(faces) * scale).astype(int)
+
+    return np.empty((0, 4), dtype=int)
+
+def count_local_face_candidates(frame: np.ndarray, max_width: int = PREFILTER_MAX_WIDTH) -> int:
+    """Count candidate faces in a frame using CPU-only Haar cascades"""
+    return len(local_face_boxes(frame, max_width))
+
+def upload_scale_for_frame(frame: np.ndarray, face_boxes: Optional[np.ndarray] = None,
+                           target_face_px: int = UPLOAD_TARGET_FACE_PX) -> float:
+    """
+    Downscale factor (<= 1) that keeps the smallest local face at about target_face_px
+    Frames are never upscaled and always fit within the Face API friendly size caps.
+    """
+    height, width = frame.shape[:2]
+    long_side = max(height, width)
+    if face_boxes is None:
+        face_boxes = local_face_boxes(frame, UPLOAD_SIZING_MAX_WIDTH)
+
+    if len(face_boxes) > 0:
+        smallest_face = int(face_boxes[:, 2:4].max(axis=1).min())
+        scale = min(1.0, target_face_px / max(smallest_face, 1), UPLOAD_MAX_SIDE / long_side)
+    else:
+        scale = min(1.0, UPLOAD_FALLBACK_MAX_SIDE / long_side)
+    return scale
+
+def encode_frame_for_upload(frame: np.ndarray, byte_budget: int = UPLOAD_BYTE_BUDGET,
+                            target_face_px: int = UPLOAD_TARGET_FACE_PX, scale: Optional[float] = None) -> bytes:
+    """
+    Resize a frame to its face-resolution budget and JPEG-encode it
+    Quality steps down until the image fits byte_budget (or the lowest step is reached).
+    Pass scale to skip the local face search when the caller already chose one.
+    """
+    if scale is None:
+        scale = upload_scale_for_frame(frame, target_face_px=target_face_px)
+    if scale < 1.0:
+        height, width = frame.shape[:2]
+        frame = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+
+    encoded = b''
+    for quality in JPEG_QUALITY_STEPS:
+        success, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not success:
+            continue
+        encoded = buffer.tobytes()
+        if len(encoded) <= byte_budget:
+            break
+    return encoded
+
+def decode_frame(frame_bytes: bytes, flags: Optional[int] = None) -> Optional[np.ndarray]:
+    """Decode encoded image bytes (JPEG/PNG) into an OpenCV image (colour unless flags say otherwise)"""
+    buffer = np.frombuffer(frame_bytes, dtype=np.uint8)
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR if flags is None else flags)
+
+def has_face_candidates(frame_bytes: bytes) -> bool:
+    """Return True if the local detector finds at least one face in an already encoded frame"""
+    # Reduced decode is much cheaper than a full-resolution one for large frames
+    image = decode_frame(frame_bytes, cv2.IMREAD_REDUCED_GRAYSCALE_2)
+    if image is None:
+        # Let the Face API decide on frames we cannot decode locally
+        return True
+    return count_local_face_candidates(image) > 0
+
+
+def compute_dhash(frame: np.ndarray, hash_size: int = DHASH_SIZE) -> int:
+    """
+    Compute a difference hash (dHash) of a frame
+    Each bit records whether a pixel is brighter than its right neighbour on a tiny grayscale copy
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Number of differing bits between two perceptual hashes"""
+    return bin(hash_a ^ hash_b).count("1")
+
+def is_near_duplicate(frame_hash: int, selected_hashes: Sequence[int], threshold: int = DEFAULT_DEDUP_THRESHOLD) -> bool:
+    """True if the hash is within threshold bits of any already-selected hash"""
+    return any(hamming_distance(frame_hash, other) <= threshold for other in selected_hashes)
+
+def select_distinctive_frames(frame_hashes: Sequence[int], slots: int,
+                              threshold: int = DEFAULT_DEDUP_THRESHOLD) -> List[int]:
+    """
+    Pick up to one candidate per time slot, skipping near-duplicates of frames already picked
+    Candidates are split into consecutive slots of near-equal size covering every candidate;
+    within a slot the one closest to the slot centre is preferred, and its neighbours are tried
+    as replacements when it is a duplicate
+    """
+    if not frame_hashes or slots <= 0:
+        return []
+
+    selected = []
+    selected_hashes = []
+
+    for slot in np.array_split(np.arange(len(frame_hashes)), min(slots, len(frame_hashes))):
+        centre = slot[0] + (len(slot) - 1) / 2
+        for index in sorted(slot.tolist(), key=lambda i: abs(i - centre)):
+            if not is_near_duplicate(frame_hashes[index], selected_hashes, threshold):
+                selected.append(index)
+                selected_hashes.append(frame_hashes[index])
+                break
+
+    return sorted(selected)
+
+def build_mosaic(frames: Sequence[np.ndarray], grid: Tuple[int, int],
+                 max_side: int = MOSAIC_MAX_SIDE) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """
+    Pack up to rows*cols frames into one image, row-major
+    Returns the mosaic and a layout entry per frame (tile origin, scale and scaled size)
+    so detections can be mapped back to source frame coordinates.
+    """
+    rows, cols = grid
+    if not frames or len(frames) > rows * cols:
+        raise ValueError(f"Mosaic {rows}x{cols} cannot hold {len(frames)} frames")
+
+    tile_height = max(frame.shape[0] for frame in frames)
+    tile_width = max(frame.shape[1] for frame in frames)
+    fit = min(1.0, max_side / (tile_width * cols), max_side / (tile_height * rows))
+    tile_width = int(tile_width * fit)
+    tile_height = int(tile_height * fit)
+
+    mosaic = np.zeros((tile_height * rows, tile_width * cols, 3), dtype=np.uint8)
+    layout = []
+    for position, frame in enumerate(frames):
+        row, col = divmod(position, cols)
+        height, width = frame.shape[:2]
+        scale = min(tile_width / width, tile_height / height)
+        scaled_width, scaled_height = max(1, int(width * scale)), max(1, int(height * scale))
+        tile = cv2.resize(frame, (scaled_width, scaled_height), interpolation=cv2.INTER_AREA) if scale != 1.0 else frame
+        if tile.ndim == 2:
+            tile = cv2.cvtColor(tile, cv2.COLOR_GRAY2BGR)
+        x, y = col * tile_width, row * tile_height
+        mosaic[y:y + scaled_height, x:x + scaled_width] = tile
+        layout.append({"x": x, "y": y, "scale": scale, "width": scaled_width, "height": scaled_height})
+
+    return mosaic, layout
+
+def _to_frame_point(point: Dict[str, float], tile: Dict[str, Any]) -> Dict[str, float]:
+    return {"x": (point["x"] - tile["x"]) / tile["scale"], "y": (point["y"] - tile["y"]) / tile["scale"]}
+
+def map_mosaic_faces(faces: Sequence[Dict[str, Any]], layout: Sequence[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Assign Face API detections on a mosaic back to their source frames
+    A face belongs to the tile containing its rectangle centre; rectangles and landmarks are
+    translated and rescaled into the source frame's pixel coordinates.
+    """
+    per_frame = [[] for _ in layout]
+    for face in faces:
+        rect = face.get("faceRectangle", {})
+        centre_x = rect.get("left", 0) + rect.get("width", 0) / 2
+        centre_y = rect.get("top", 0) + rect.get("height", 0) / 2
+
+        for position, tile in enumerate(layout):
+            if tile["x"] <= centre_x < tile["x"] + tile["width"] and tile["y"] <= centre_y < tile["y"] + tile["height"]:
+                mapped = dict(face)
+                mapped["faceRectangle"] = {
+                    "left": int(round((rect["left"] - tile["x"]) / tile["scale"])),
+                    "top": int(round((rect["top"] - tile["y"]) / tile["scale"])),
+                    "width": int(round(rect["width"] / tile["scale"])),
+                    "height": int(round(rect["height"] / tile["scale"]))
+                }
+                if "faceLandmarks" in face:
+                    mapped["faceLandmarks"] = {
+                        name: _to_frame_point(point, tile) for name, point in face["faceLandmarks"].items()
+                    }
+                per_frame[position].append(mapped)
+                break
+
+    return per_frame
+
+def thumbnail(frame: np.ndarray, size: Tuple[int, int] = KEYFRAME_THUMB_SIZE) -> np.ndarray:
+    """Tiny colour thumbnail used for scene-change scoring"""
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+def scene_change_scores(thumbnails: np.ndarray) -> np.ndarray:
+    """
+    Distinctiveness of each thumbnail versus the previous one, computed in one vectorized pass
+    Averages the colour-histogram L1 distance and the mean absolute pixel difference (both 0..1).
+    thumbnails is an (N, H, W, 3) uint8 stack; the first frame scores 1.0.
+    """
+    count = len(thumbnails)
+    if count == 0:
+        return np.empty(0)
+
+    shift = 8 - HISTOGRAM_BITS
+    quantized = (thumbnails >> shift).astype(np.int64)
+    codes = (quantized[..., 0] << (2 * HISTOGRAM_BITS)) | (quantized[..., 1] << HISTOGRAM_BITS) | quantized[..., 2]
+    bins = 1 << (3 * HISTOGRAM_BITS)
+    codes = codes.reshape(count, -1) + np.arange(count)[:, None] * bins
+    histograms = np.bincount(codes.ravel(), minlength=count * bins).reshape(count, bins).astype(np.float64)
+    histograms /= histograms.sum(axis=1, keepdims=True)
+
+    histogram_delta = np.abs(np.diff(histograms, axis=0)).sum(axis=1) / 2
+    pixels = thumbnails.reshape(count, -1).astype(np.float64)
+    pixel_delta = np.abs(np.diff(pixels, axis=0)).mean(axis=1) / 255
+
+    return np.concatenate(([1.0], (histogram_delta + pixel_delta) / 2))
+
+def select_keyframes(scores: np.ndarray, budget: int, min_gap: Optional[int] = None) -> List[int]:
+    """
+    Pick up to budget positions with the highest scene-change scores
+    Picks are kept at least min_gap apart; leftover budget is filled with evenly spaced
+    positions so static videos are still covered end to end.
+    """
+    count = len(scores)
+    if count == 0 or budget <= 0:
+        return []
+    if count <= budget:
+        return list(range(count))
+    if min_gap is None:
+        min_gap = max(1, count // (budget * 2))
+
+    selected = []
+    for position in np.argsort(-scores, kind='stable'):
+        if len(selected) >= budget or scores[position] <= 0:
+            break
+        if all(abs(int(position) - other) >= min_gap for other in selected):
+            selected.append(int(position))
+
+    for position in np.linspace(0, count - 1, budget).astype(int):
+        if len(selected) >= budget:
+            break
+        if all(abs(int(position) - other) >= min_gap for other in selected):
+            selected.append(int(position))
+
+    return sorted(selected)
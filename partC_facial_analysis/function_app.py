@@ -2,11 +2,34 @@ import azure.functions as func
 import json
 import logging
 import os
+import time
+import uuid
 import utils
-from typing import Dict, Any
+import utils_new
+import callbacks
+import job_store
+import fused_analysis
+import result_cache
+import batch_scheduler
+from concurrent.futures import ThreadPoolExecutor
+from single_flight import SingleFlight, normalize_url
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
 app = func.FunctionApp()
 
+_analysis_flights = SingleFlight()
+
+# Job worker for analyses whose result is delivered to a callback URL instead of the response
+CALLBACK_WORKERS = 4
+_callback_workers = ThreadPoolExecutor(max_workers=CALLBACK_WORKERS, thread_name_prefix="video-callback")
+
+# Batch videos are driven here; their Content Understanding jobs run under the shared batch budget
+BATCH_MAX_VIDEOS = 100
+BATCH_DRIVER_WORKERS = 16
+# Per-video "analyzer" in a batch; face_api jobs publish partial insights while they run
+BATCH_ANALYZERS = ("content_understanding", "face_api")
+_batch_drivers = ThreadPoolExecutor(max_workers=BATCH_DRIVER_WORKERS, thread_name_prefix="video-batch")
+
 @app.function_name(name="analyze_video_content")
 @app.route(route="analyze_video", auth_level=func.AuthLevel.ANONYMOUS)
 def analyze_video_content(req: func.HttpRequest) -> func.HttpResponse:
@@ -34,16 +57,39 @@ def analyze_video_content(req: func.HttpRequest) -> func.HttpResponse:
                 status_code=400
             )
         
-        # Analyze video content using Azure Content Understanding
-        insights = utils.analyze_video_with_content_understanding(video_url, video_file)
+        # With a callback URL the analysis runs in the background and the insights are POSTed on completion
+        callback_url = req_body.get('callback_url')
+        if callback_url:
+            callbacks.validate_callback_url(callback_url)
+            secret = callbacks.get_signing_secret()
+            if not secret:
+                return func.HttpResponse(
+                    f"Callbacks are not configured: set {callbacks.CALLBACK_SECRET_ENV}",
+                    status_code=501
+                )
+            job_id = str(uuid.uuid4())
+            _callback_workers.submit(run_callback_job, job_id, callback_url, secret, video_url, video_file)
+            return func.HttpResponse(
+                json.dumps({"job_id": job_id, "status": "accepted", "callback_url": callback_url}, indent=2),
+                mimetype="application/json",
+                status_code=202
+            )
         
-        # Generate structured insights for the chat model
-        structured_insights = utils.generate_presentation_insights(insights)
+        # Identical requests arriving together (UI retries, a shared recording) share one analysis
+        flight_key = analysis_flight_key(video_url, video_file)
+        (structured_insights, cache_status), shared = _analysis_flights.do(
+            flight_key, lambda: run_video_analysis(video_url, video_file)
+        )
+        headers = {"X-Cache": cache_status}
+        if shared:
+            logging.info(f"Joined in-flight video analysis {flight_key}")
+            headers["X-Coalesced"] = "true"
         
         return func.HttpResponse(
             json.dumps(structured_insights, indent=2),
             mimetype="application/json",
-            status_code=200
+            status_code=200,
+            headers=headers
         )
         
     except ValueError as ve:
@@ -56,6 +102,252 @@ def analyze_video_content(req: func.HttpRequest) -> func.HttpResponse:
             status_code=500
         )
 
+def analysis_flight_key(video_url: Optional[str], video_file: Optional[str]) -> str:
+    """Coalescing key from the request alone, so no network call is needed to compute it"""
+    source = f"url={normalize_url(video_url)}" if video_url else f"file={os.path.abspath(video_file)}"
+    return f"{source}|analyzer={utils.video_analyzer_id()}"
+
+def run_video_analysis(video_url: Optional[str], video_file: Optional[str],
+                       analyze: Optional[Callable[..., Dict[str, Any]]] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Cached or fresh structured insights for one video, with the X-Cache outcome
+    analyze(video_url, video_file) runs one Content Understanding job (default: immediately)
+    """
+    analyze = analyze or utils.analyze_video_with_content_understanding
+    # Serve repeat analyses of the same video version and analyzer config from cache
+    cache = result_cache.get_result_cache()
+    cache_key = result_cache.video_cache_key(video_url, video_file, utils.VIDEO_ANALYZER_CONFIG)
+    cached = cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        logging.info(f"Serving cached video analysis {cache_key}")
+        structured_insights = cached["value"]
+        structured_insights["cache"] = {
+            "cached": True,
+            "cached_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(cached["stored_at"]))
+        }
+        return structured_insights, "HIT"
+    
+    # Analyze video content using Azure Content Understanding
+    insights = analyze(video_url, video_file)
+    
+    # Generate structured insights for the chat model
+    structured_insights = utils.generate_presentation_insights(insights)
+    
+    if cache_key:
+        cache.put(cache_key, structured_insights)
+    structured_insights["cache"] = {"cached": False}
+    return structured_insights, "MISS" if cache_key else "BYPASS"
+
+def run_callback_job(job_id: str, callback_url: str, secret: str, video_url: Optional[str],
+                     video_file: Optional[str]) -> bool:
+    """Run one analysis and deliver its insights (or the failure) to the callback URL exactly once"""
+    try:
+        flight_key = analysis_flight_key(video_url, video_file)
+        (structured_insights, cache_status), _ = _analysis_flights.do(
+            flight_key, lambda: run_video_analysis(video_url, video_file)
+        )
+        payload = {"job_id": job_id, "status": "succeeded", "cache": cache_status, "insights": structured_insights}
+    except Exception as e:
+        logging.error(f"Callback job {job_id} failed: {str(e)}")
+        payload = {"job_id": job_id, "status": "failed", "error": str(e)}
+    
+    delivered = callbacks.deliver_callback(callback_url, payload, secret)
+    logging.info(f"Callback job {job_id} {payload['status']}, delivered={delivered}")
+    return delivered
+
+@app.function_name(name="analyze_audio_visual")
+@app.route(route="analyze_audio_visual", methods=["POST"], auth_level=func.AuthLevel.ANONYMOUS)
+def analyze_audio_visual(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Video insights and Part B transcript analysis as one report
+    Uses the request's 'transcript' (VTT or plain text) when given, else the transcript
+    Content Understanding extracts from the video
+    """
+    logging.info('Audio-visual analysis function triggered')
+    
+    try:
+        req_body = req.get_json()
+        if not isinstance(req_body, dict) or not (req_body.get('video_url') or req_body.get('video_file')):
+            return func.HttpResponse(
+                "Either 'video_url' or 'video_file' must be provided",
+                status_code=400
+            )
+        
+        video_url = req_body.get('video_url')
+        video_file = req_body.get('video_file')
+        vtt_text = req_body.get('transcript') or None
+        
+        def analyze_video() -> Tuple[Dict[str, Any], str]:
+            flight_key = analysis_flight_key(video_url, video_file)
+            result, _ = _analysis_flights.do(flight_key, lambda: run_video_analysis(video_url, video_file))
+            return result
+        
+        report = fused_analysis.run_fused_analysis(analyze_video, vtt_text)
+        
+        return func.HttpResponse(
+            json.dumps(report, indent=2),
+            mimetype="application/json",
+            status_code=200,
+            headers={"X-Cache": report["cache"]}
+        )
+        
+    except ValueError as ve:
+        logging.error(f"Validation error: {str(ve)}")
+        return func.HttpResponse(f"Invalid input: {str(ve)}", status_code=400)
+    except Exception as e:
+        logging.error(f"Error in audio-visual analysis: {str(e)}")
+        return func.HttpResponse(
+            f"Error processing video: {str(e)}", 
+            status_code=500
+        )
+
+@app.function_name(name="analyze_video_batch")
+@app.route(route="analyze_videos", methods=["POST"], auth_level=func.AuthLevel.ANONYMOUS)
+def analyze_video_batch(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Queue a batch of videos for analysis
+    Returns a job id per video; progress and results come from /analysis_batches/{batch_id}
+    """
+    logging.info('Video batch analysis function triggered')
+    
+    try:
+        req_body = req.get_json()
+        videos = parse_batch_videos(req_body.get('videos') if isinstance(req_body, dict) else None)
+        
+        store = job_store.get_job_store()
+        batch = store.create_batch(videos)
+        for job_id, video in zip(batch["job_ids"], videos):
+            _batch_drivers.submit(run_batch_job, job_id, video.get('video_url'), video.get('video_file'), video['analyzer'],
+                                  batch["batch_id"])
+        
+        status = store.batch_status(batch["batch_id"])
+        return func.HttpResponse(
+            json.dumps({
+                "batch_id": batch["batch_id"],
+                "jobs": [{"job_id": job["job_id"], **job["video"]} for job in status["jobs"]],
+                "progress": status["progress"]
+            }, indent=2),
+            mimetype="application/json",
+            status_code=202
+        )
+        
+    except ValueError as ve:
+        logging.error(f"Validation error: {str(ve)}")
+        return func.HttpResponse(f"Invalid input: {str(ve)}", status_code=400)
+    except Exception as e:
+        logging.error(f"Error queueing video batch: {str(e)}")
+        return func.HttpResponse(
+            f"Error queueing batch: {str(e)}", 
+            status_code=500
+        )
+
+@app.function_name(name="get_batch_status")
+@app.route(route="analysis_batches/{batch_id}", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
+def get_batch_status(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Per-video job status and aggregate progress of a batch
+    Add ?include_insights=true to get the insights of finished videos
+    """
+    batch_id = req.route_params.get('batch_id')
+    include_insights = req.params.get('include_insights', '').lower() == 'true'
+    status = job_store.get_job_store().batch_status(batch_id, include_insights)
+    if status is None:
+        return func.HttpResponse(f"Unknown batch: {batch_id}", status_code=404)
+    
+    status["scheduler"] = batch_scheduler.get_batch_scheduler().stats()
+    return func.HttpResponse(
+        json.dumps(status, indent=2),
+        mimetype="application/json",
+        status_code=200
+    )
+
+@app.function_name(name="get_job_status")
+@app.route(route="analysis_jobs/{job_id}", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
+def get_job_status(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    One background job: status, progress and the latest partial insights while it runs
+    """
+    job_id = req.route_params.get('job_id')
+    job = job_store.get_job_store().get_job(job_id)
+    if job is None:
+        return func.HttpResponse(f"Unknown job: {job_id}", status_code=404)
+    
+    return func.HttpResponse(
+        json.dumps(job, indent=2),
+        mimetype="application/json",
+        status_code=200
+    )
+
+def parse_batch_videos(videos: Any) -> List[Dict[str, Any]]:
+    """Validate a batch request's videos (URL strings or objects like a single analyze request)"""
+    if not isinstance(videos, list) or not videos:
+        raise ValueError("'videos' must be a non-empty list")
+    if len(videos) > BATCH_MAX_VIDEOS:
+        raise ValueError(f"At most {BATCH_MAX_VIDEOS} videos per batch")
+    
+    parsed = []
+    for i, video in enumerate(videos):
+        if isinstance(video, str):
+            video = {"video_url": video}
+        if not isinstance(video, dict) or not (video.get('video_url') or video.get('video_file')):
+            raise ValueError(f"videos[{i}] needs a 'video_url' or 'video_file'")
+        entry = {key: video[key] for key in ('video_url', 'video_file') if video.get(key)}
+        entry['analyzer'] = video.get('analyzer', BATCH_ANALYZERS[0])
+        if entry['analyzer'] not in BATCH_ANALYZERS:
+            raise ValueError(f"videos[{i}].analyzer must be one of {', '.join(BATCH_ANALYZERS)}")
+        parsed.append(entry)
+    return parsed
+
+def run_batch_job(job_id: str, video_url: Optional[str], video_file: Optional[str],
+                  analyzer: str = BATCH_ANALYZERS[0], batch_id: Optional[str] = None):
+    """
+    Analyze one batch video, recording progress in the job store
+    Its analysis is queued on the shared scheduler under its batch id, so batches take turns
+    for the budget. Face API jobs take a token from the scheduler's call budget before every
+    Face API request and publish partial insights after every analyzed frame.
+    """
+    store = job_store.get_job_store()
+    scheduler = batch_scheduler.get_batch_scheduler()
+    owner = batch_id or job_id
+    
+    def scheduled_analyze(source_url: Optional[str], source_file: Optional[str] = None) -> Dict[str, Any]:
+        def unit() -> Dict[str, Any]:
+            store.update_job(job_id, status="running")
+            return utils.analyze_video_with_content_understanding(source_url, source_file)
+        result = scheduler.submit(owner, unit).result()
+        store.advance(job_id)
+        return result
+    
+    def face_api_analyze() -> Dict[str, Any]:
+        store.update_job(job_id, status="running")
+        result = utils_new.analyze_video_streaming(
+            video_url, video_file, on_progress=lambda partial: store.publish_partial(job_id, partial),
+            rate_limiter=scheduler.call_limiter
+        )
+        if not result["success"]:
+            raise Exception(result["error"])
+        return result
+    
+    try:
+        store.update_job(job_id, units_total=1)
+        
+        if analyzer == "face_api":
+            # Not coalesced: each job reports its own partial insights
+            # No Content Understanding submit: the Face API calls are budgeted one by one
+            result = scheduler.submit(owner, face_api_analyze, rate_limited=False).result()
+            store.advance(job_id)
+            store.update_job(job_id, status="succeeded", cache="BYPASS", insights=result["insights"])
+            return
+        
+        flight_key = analysis_flight_key(video_url, video_file)
+        (structured_insights, cache_status), _ = _analysis_flights.do(
+            flight_key, lambda: run_video_analysis(video_url, video_file, scheduled_analyze)
+        )
+        store.update_job(job_id, status="succeeded", cache=cache_status, insights=structured_insights)
+    except Exception as e:
+        logging.error(f"Batch job {job_id} failed: {str(e)}")
+        store.update_job(job_id, status="failed", error=str(e))
+
 @app.function_name(name="get_analysis_status")
 @app.route(route="analysis_status/{job_id}", auth_level=func.AuthLevel.ANONYMOUS)
 def get_analysis_status(req: func.HttpRequest) -> func.HttpResponse:
@@ -83,3 +375,12 @@ def get_analysis_status(req: func.HttpRequest) -> func.HttpResponse:
             f"Error checking status: {str(e)}", 
             status_code=500
         )
+
+@app.function_name(name="warmup")
+@app.warm_up_trigger("warmup_context")
+def warmup(warmup_context) -> None:
+    """
+    Runs when the platform adds an instance (Premium and Dedicated plans only), so the
+    heavy imports and the HTTP session are ready before the instance takes traffic
+    """
+    logging.info(f"Instance warmup: {utils.warmup()}")
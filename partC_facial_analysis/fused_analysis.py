@@ -0,0 +1,130 @@
+import os
+import time
+import logging
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Used to estimate duration when a transcript comes without cue timings
+PLAIN_TEXT_WPM = 150
+
+def load_transcript_utils():
+    """
+    partB's transcript analysis, run in-process instead of called over HTTP
+    transcript_coach is partB's utils module copied into this app, so it deploys with it.
+    """
+    return importlib.import_module("transcript_coach")
+
+def is_vtt(transcript: str) -> bool:
+    return "WEBVTT" in transcript or "-->" in transcript
+
+def transcript_sentiment(coach, plain_text: str) -> Dict[str, Any]:
+    """Text Analytics sentiment, or why it is missing; never fails the report"""
+    if not (os.environ.get("COG_ENDPOINT") and os.environ.get("COG_KEY")):
+        return {"status": "not_configured"}
+    try:
+        return coach.sentiment_scores(plain_text)
+    except Exception as e:
+        logging.warning(f"Transcript sentiment failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+def analyze_transcript(transcript: str, source: str) -> Dict[str, Any]:
+    """
+    partB speech metrics, pauses, sentiment and recommendations for a VTT or plain transcript
+    The sentiment call is the only network hop, so it overlaps with the local metrics.
+    """
+    coach = load_transcript_utils()
+    if is_vtt(transcript):
+        # strip_vtt would count the WEBVTT header line as spoken words
+        body = transcript.split("\n", 1)[1] if transcript.lstrip().startswith("WEBVTT") and "\n" in transcript else transcript
+        plain_text, duration = coach.strip_vtt(body)
+        pause_analysis = coach.analyze_pauses_from_vtt(transcript)
+    else:
+        plain_text, duration = transcript, 0.0
+        pause_analysis = {"pauses": [], "avg_pause": 0, "pause_rate": 0, "total_pause_time": 0}
+
+    word_count = len(plain_text.split())
+    if not word_count:
+        return {"available": False, "source": source}
+    if duration <= 0:
+        duration = word_count / PLAIN_TEXT_WPM * 60
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        sentiment_future = pool.submit(transcript_sentiment, coach, plain_text)
+        metrics = coach.enhanced_transcript_metrics(plain_text, duration, transcript)
+        recommendations = coach.generate_detailed_recommendations(metrics)
+        executive_summary = coach.create_executive_summary(metrics)
+        sentiment = sentiment_future.result()
+
+    return {
+        "available": True,
+        "source": source,
+        "executive_summary": executive_summary,
+        "speech_metrics": metrics,
+        "pause_analysis": pause_analysis,
+        "sentiment_analysis": sentiment,
+        "recommendations": recommendations
+    }
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.time()
+    return fn(), time.time() - start
+
+def run_fused_analysis(analyze_video: Callable[[], Tuple[Dict[str, Any], str]],
+                       vtt_text: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Video insights and transcript analysis in one report
+    With a caller-supplied VTT both pipelines run side by side; otherwise the transcript
+    Content Understanding extracted (content_analysis.transcript) is analyzed as soon as the
+    video result arrives, so no second upload or HTTP call to the transcript service is needed.
+    analyze_video returns (structured insights, X-Cache outcome).
+    """
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        video_future = pool.submit(_timed, analyze_video)
+        transcript_future = pool.submit(_timed, lambda: analyze_transcript(vtt_text, "request")) if vtt_text else None
+
+        (video_insights, cache_status), video_sec = video_future.result()
+        if transcript_future is None:
+            extracted = video_insights.get("content_analysis", {}).get("transcript", "")
+            transcript_future = pool.submit(_timed, lambda: analyze_transcript(extracted, "content_understanding"))
+        try:
+            transcript, transcript_sec = transcript_future.result()
+        except Exception as e:
+            # Keep the video half of the report even if the transcript half breaks
+            logging.error(f"Transcript analysis failed: {str(e)}")
+            transcript, transcript_sec = {"available": False, "error": str(e)}, 0.0
+
+    return {
+        "summary": fused_summary(video_insights, transcript),
+        "video": video_insights,
+        "transcript": transcript,
+        "cache": cache_status,
+        "timings": {
+            "video_sec": round(video_sec, 3),
+            "transcript_sec": round(transcript_sec, 3),
+            "wall_sec": round(time.time() - start, 3),
+            "concurrent": bool(vtt_text)
+        }
+    }
+
+def fused_summary(video_insights: Dict[str, Any], transcript: Dict[str, Any]) -> Dict[str, Any]:
+    """Headline numbers from both halves, for the chat model's opening message"""
+    quality = video_insights.get("presentation_quality", {})
+    summary = {
+        "visual_engagement": quality.get("visual_engagement"),
+        "visual_tone": video_insights.get("visual_sentiment", {}).get("overall_tone"),
+        "smile_percentage": video_insights.get("facial_analysis", {}).get("facial_expressions", {}).get("smile_percentage"),
+        "transcript_source": transcript.get("source")
+    }
+    if transcript.get("available"):
+        metrics = transcript["speech_metrics"]
+        overall = metrics["presentation_scores"]["overall_quality"]
+        summary.update({
+            "speech_grade": overall["grade"],
+            "speech_score": overall["overall_score"],
+            "words_per_minute": metrics["basic_metrics"]["wpm"],
+            "filler_rate_per_minute": metrics["filler_analysis"]["filler_rate_per_minute"],
+            "speech_sentiment": transcript["sentiment_analysis"].get("overall")
+        })
+    return summary
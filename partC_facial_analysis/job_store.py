@@ -0,0 +1,128 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+FINISHED_JOB_STATUSES = ('succeeded', 'failed')
+
+# Oldest records are dropped beyond these sizes (in-memory, per instance)
+JOB_STORE_MAX_JOBS = 2000
+JOB_STORE_MAX_BATCHES = 200
+
+class JobStore:
+    """
+    In-memory record of background analysis jobs and the batches they belong to
+    Progress is counted in units of work (one analysis per video); running Face API jobs
+    also carry their latest partial insights. Readers always get copies.
+    """
+
+    def __init__(self, max_jobs: int = JOB_STORE_MAX_JOBS, max_batches: int = JOB_STORE_MAX_BATCHES):
+        self.max_jobs = max_jobs
+        self.max_batches = max_batches
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_job(self, video: Dict[str, Any], batch_id: Optional[str] = None) -> str:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "batch_id": batch_id,
+                "video": dict(video),
+                "status": "queued",
+                "units_total": None,
+                "units_done": 0,
+                "created_at": now,
+                "updated_at": now
+            }
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return job_id
+
+    def create_batch(self, videos: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """A batch with one queued job per video"""
+        batch_id = str(uuid.uuid4())
+        job_ids = [self.create_job(video, batch_id) for video in videos]
+        with self._lock:
+            self._batches[batch_id] = {"batch_id": batch_id, "job_ids": job_ids, "created_at": time.time()}
+            while len(self._batches) > self.max_batches:
+                self._batches.popitem(last=False)
+        return {"batch_id": batch_id, "job_ids": job_ids}
+
+    def update_job(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, updated_at=time.time())
+
+    def advance(self, job_id: str, units: int = 1):
+        """Record finished units of work"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["units_done"] += units
+                job["updated_at"] = time.time()
+
+    def publish_partial(self, job_id: str, partial: Dict[str, Any]):
+        """Latest partial insights of a running job (replaces the previous ones)"""
+        self.update_job(job_id, partial=dict(partial))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def batch_status(self, batch_id: str, include_insights: bool = False) -> Optional[Dict[str, Any]]:
+        """Per-video jobs plus aggregate progress, or None for an unknown batch"""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return None
+            jobs = [dict(self._jobs[job_id]) for job_id in batch["job_ids"] if job_id in self._jobs]
+
+        if not include_insights:
+            for job in jobs:
+                job.pop("insights", None)
+        return {
+            "batch_id": batch_id,
+            "created_at": batch["created_at"],
+            "progress": aggregate_progress(jobs),
+            "jobs": jobs
+        }
+
+def aggregate_progress(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Job counts by status and overall percent complete
+    A job whose size is not known yet counts as one unit; finished jobs count as complete.
+    """
+    counts = {status: 0 for status in JOB_STATUSES}
+    units_total = 0
+    units_done = 0
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+        total = job.get("units_total") or 1
+        units_total += total
+        units_done += total if job["status"] in FINISHED_JOB_STATUSES else min(job.get("units_done", 0), total)
+
+    return {
+        "videos": len(jobs),
+        **counts,
+        "units_total": units_total,
+        "units_done": units_done,
+        "percent_complete": round(100 * units_done / units_total, 1) if units_total else 100.0,
+        "done": counts["queued"] + counts["running"] == 0
+    }
+
+_job_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    global _job_store
+    with _store_lock:
+        if _job_store is None:
+            _job_store = JobStore()
+        return _job_store
@@ -0,0 +1,52 @@
+import sys
+import threading
+import importlib.util
+from types import ModuleType
+
+# One lock for every lazy module: loading cv2 touches numpy on the same thread
+_load_lock = threading.RLock()
+
+class _LoadingModule(ModuleType):
+    """A lazy module while its code runs: other threads wait until the load has finished"""
+
+    def __getattribute__(self, attr):
+        with _load_lock:
+            return ModuleType.__getattribute__(self, attr)
+
+class _LazyModule(ModuleType):
+    """
+    Module whose code runs on first attribute access, under a lock
+    importlib.util.LazyLoader is not used: before Python 3.12 it turns the module into a plain
+    one before running its code, so a second thread touching it mid-load sees an empty module.
+    The frame pipeline and batch scheduler workers can be the first to use cv2 and numpy.
+    """
+
+    def __getattribute__(self, attr):
+        with _load_lock:
+            if type(self) is _LazyModule:
+                self.__class__ = _LoadingModule
+                try:
+                    ModuleType.__getattribute__(self, "__spec__").loader.exec_module(self)
+                except BaseException:
+                    self.__class__ = _LazyModule
+                    raise
+                self.__class__ = ModuleType
+        return getattr(self, attr)
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Module object whose code runs on first attribute access
+    Lets cv2 and numpy be bound at module top without paying their import time on
+    cold starts that never touch them. Modules using this keep annotations lazy
+    (`from __future__ import annotations`) so signatures do not trigger the load.
+    The first access is thread-safe.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    module = importlib.util.module_from_spec(spec)
+    module.__class__ = _LazyModule
+    sys.modules[name] = module
+    return module
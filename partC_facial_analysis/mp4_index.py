@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import os
+import struct
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+# Extra samples fetched past each target to cover decoder reordering (B-frames)
+REORDER_MARGIN = 4
+
+# OpenCV's FFmpeg backend seeks to a keyframe up to 16 frames before the requested one
+SEEK_PREROLL_FRAMES = 16
+
+# Ranges closer than this are fetched as one request (also swallows interleaved audio)
+RANGE_MERGE_GAP = 64 * 1024
+
+def parse_box_header(data: bytes, offset: int = 0) -> Optional[Tuple[int, bytes, int]]:
+    """
+    Parse an ISO BMFF box header at offset
+    Returns (box_size, box_type, header_length); box_size 0 means "extends to end of file"
+    """
+    if len(data) - offset < 8:
+        return None
+    size, box_type = struct.unpack_from('>I4s', data, offset)
+    header_length = 8
+    if size == 1:
+        if len(data) - offset < 16:
+            return None
+        size = struct.unpack_from('>Q', data, offset + 8)[0]
+        header_length = 16
+    return size, box_type, header_length
+
+def iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (box_type, payload_start, box_end) for each child box in data[start:end]"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset < end:
+        header = parse_box_header(data, offset)
+        if header is None:
+            return
+        size, box_type, header_length = header
+        box_end = end if size == 0 else offset + size
+        if box_end <= offset or box_end > end:
+            return
+        yield box_type, offset + header_length, box_end
+        offset = box_end
+
+def find_child(data: bytes, start: int, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    """Return (payload_start, box_end) of the first child of the given type"""
+    for child_type, payload_start, box_end in iter_boxes(data, start, end):
+        if child_type == box_type:
+            return payload_start, box_end
+    return None
+
+def locate_top_level_box(read_range: Callable[[int, int], bytes], total_size: int,
+                         box_type: bytes = b'moov', prefix: bytes = b'') -> Optional[Tuple[int, int]]:
+    """
+    Find a top-level box by hopping from header to header
+    read_range(start, length) fetches bytes on demand; headers inside prefix are read from it.
+    Returns (box_start, box_end) or None when the file does not look like ISO BMFF.
+    """
+    offset = 0
+    while offset + 8 <= total_size:
+        if offset + 16 <= len(prefix):
+            header_bytes = prefix[offset:offset + 16]
+        else:
+            header_bytes = read_range(offset, min(16, total_size - offset))
+        header = parse_box_header(header_bytes)
+        if header is None:
+            return None
+        size, found_type, _ = header
+        if not all(32 <= c < 127 for c in found_type):
+            return None
+        box_end = total_size if size == 0 else offset + size
+        if found_type == box_type:
+            return offset, box_end
+        if box_end <= offset:
+            return None
+        offset = box_end
+    return None
+
+def _find_video_track(moov: bytes) -> Optional[Tuple[int, int]]:
+    for box_type, payload_start, box_end in iter_boxes(moov):
+        if box_type != b'trak':
+            continue
+        mdia = find_child(moov, payload_start, box_end, b'mdia')
+        if mdia is None:
+            continue
+        hdlr = find_child(moov, mdia[0], mdia[1], b'hdlr')
+        # hdlr payload: version/flags(4) pre_defined(4) handler_type(4)
+        if hdlr is not None and moov[hdlr[0] + 8:hdlr[0] + 12] == b'vide':
+            return mdia
+    return None
+
+def parse_video_sample_table(moov: bytes) -> Dict[str, Any]:
+    """
+    Decode the video track sample tables from a complete moov box payload
+    Returns per-sample byte offsets, sizes, decode times (seconds) and keyframe flags
+    """
+    mdia = _find_video_track(moov)
+    if mdia is None:
+        raise ValueError("No video track found in moov")
+
+    mdhd = find_child(moov, mdia[0], mdia[1], b'mdhd')
+    version = moov[mdhd[0]]
+    timescale = struct.unpack_from('>I', moov, mdhd[0] + (20 if version == 1 else 12))[0]
+
+    minf = find_child(moov, mdia[0], mdia[1], b'minf')
+    stbl = find_child(moov, minf[0], minf[1], b'stbl')
+    tables = {box_type: payload_start for box_type, payload_start, _ in iter_boxes(moov, stbl[0], stbl[1])}
+
+    # stsz: fixed sample size or one size per sample
+    stsz = tables[b'stsz']
+    fixed_size, sample_count = struct.unpack_from('>II', moov, stsz + 4)
+    if fixed_size:
+        sizes = np.full(sample_count, fixed_size, dtype=np.int64)
+    else:
+        sizes = np.frombuffer(moov, dtype='>u4', count=sample_count, offset=stsz + 12).astype(np.int64)
+
+    # stco / co64: file offset of each chunk
+    if b'co64' in tables:
+        chunk_count = struct.unpack_from('>I', moov, tables[b'co64'] + 4)[0]
+        chunk_offsets = np.frombuffer(moov, dtype='>u8', count=chunk_count, offset=tables[b'co64'] + 8).astype(np.int64)
+    else:
+        chunk_count = struct.unpack_from('>I', moov, tables[b'stco'] + 4)[0]
+        chunk_offsets = np.frombuffer(moov, dtype='>u4', count=chunk_count, offset=tables[b'stco'] + 8).astype(np.int64)
+
+    # stsc: runs of (first_chunk, samples_per_chunk, description_index), 1-based chunks
+    stsc_count = struct.unpack_from('>I', moov, tables[b'stsc'] + 4)[0]
+    stsc = np.frombuffer(moov, dtype='>u4', count=stsc_count * 3, offset=tables[b'stsc'] + 8).astype(np.int64).reshape(-1, 3)
+    run_starts = stsc[:, 0] - 1
+    run_lengths = np.diff(np.append(run_starts, chunk_count))
+    samples_per_chunk = np.repeat(stsc[:, 1], run_lengths)
+
+    # Byte offset of every sample = its chunk offset + sizes of earlier samples in the chunk
+    sample_chunk = np.repeat(np.arange(chunk_count), samples_per_chunk)[:sample_count]
+    size_cumsum = np.cumsum(sizes) - sizes
+    chunk_first_sample = np.cumsum(samples_per_chunk) - samples_per_chunk
+    offsets = chunk_offsets[sample_chunk] + size_cumsum - size_cumsum[chunk_first_sample[sample_chunk]]
+
+    # stts: runs of (sample_count, sample_delta) in track timescale units
+    stts_count = struct.unpack_from('>I', moov, tables[b'stts'] + 4)[0]
+    stts = np.frombuffer(moov, dtype='>u4', count=stts_count * 2, offset=tables[b'stts'] + 8).astype(np.int64).reshape(-1, 2)
+    deltas = np.repeat(stts[:, 1], stts[:, 0])[:sample_count]
+    decode_times = (np.cumsum(deltas) - deltas) / float(timescale)
+
+    # stss: 1-based sync sample numbers; absent means every sample is a keyframe
+    if b'stss' in tables:
+        sync_count = struct.unpack_from('>I', moov, tables[b'stss'] + 4)[0]
+        keyframes = np.frombuffer(moov, dtype='>u4', count=sync_count, offset=tables[b'stss'] + 8).astype(np.int64) - 1
+    else:
+        keyframes = np.arange(sample_count)
+
+    return {
+        "sample_count": int(sample_count),
+        "timescale": timescale,
+        "offsets": offsets,
+        "sizes": sizes,
+        "decode_times": decode_times,
+        "keyframes": keyframes
+    }
+
+def read_local_sample_table(path: str) -> Optional[Dict[str, Any]]:
+    """Video sample table of a local MP4, or None when the file is not one this parser can index"""
+    try:
+        with open(path, 'rb') as video_file:
+            def read_range(start: int, length: int) -> bytes:
+                video_file.seek(start)
+                return video_file.read(length)
+
+            moov = locate_top_level_box(read_range, os.path.getsize(path))
+            if moov is None:
+                return None
+            moov_bytes = read_range(moov[0], moov[1] - moov[0])
+        header_length = parse_box_header(moov_bytes)[2]
+        return parse_video_sample_table(moov_bytes[header_length:])
+    except (OSError, ValueError, TypeError, KeyError, IndexError, struct.error):
+        return None
+
+def seek_decode_count(sample_table: Dict[str, Any], sample_indices: Sequence[int],
+                      seek_preroll: int = SEEK_PREROLL_FRAMES) -> int:
+    """
+    Frames decoded to seek to each target in turn, from the keyframe preceding its seek point
+    An upper bound: the decoder may carry on from the previous target instead of seeking back.
+    """
+    targets = np.asarray(sample_indices, dtype=np.int64)
+    keyframes = sample_table["keyframes"]
+    if not len(targets):
+        return 0
+    if not len(keyframes):
+        return int(np.sum(targets + 1))
+    seek_points = np.maximum(0, targets - seek_preroll)
+    key_positions = np.maximum(0, np.searchsorted(keyframes, seek_points, side='right') - 1)
+    return int(np.sum(targets - keyframes[key_positions] + 1))
+
+def byte_ranges_for_samples(sample_table: Dict[str, Any], sample_indices: Sequence[int],
+                            seek_preroll: int = SEEK_PREROLL_FRAMES,
+                            reorder_margin: int = REORDER_MARGIN,
+                            merge_gap: int = RANGE_MERGE_GAP) -> List[Tuple[int, int]]:
+    """
+    Byte ranges (start inclusive, end exclusive) needed to decode each target sample
+    Each target pulls in every sample from the keyframe preceding its seek point.
+    The first sample is always included since some codecs carry stream headers in it.
+    """
+    keyframes = sample_table["keyframes"]
+    offsets = sample_table["offsets"]
+    sizes = sample_table["sizes"]
+    last_sample = sample_table["sample_count"] - 1
+
+    spans = [(int(offsets[0]), int(offsets[0] + sizes[0]))] if last_sample >= 0 else []
+    for index in sample_indices:
+        seek_point = max(0, int(index) - seek_preroll)
+        key_position = max(0, int(np.searchsorted(keyframes, seek_point, side='right')) - 1)
+        first = int(keyframes[key_position]) if len(keyframes) else 0
+        last = min(last_sample, int(index) + reorder_margin)
+        starts = offsets[first:last + 1]
+        ends = starts + sizes[first:last + 1]
+        spans.extend(zip(starts.tolist(), ends.tolist()))
+
+    return merge_byte_ranges(spans, merge_gap)
+
+def merge_byte_ranges(spans: Sequence[Tuple[int, int]], gap: int = 0) -> List[Tuple[int, int]]:
+    """Merge overlapping or nearly adjacent byte ranges"""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
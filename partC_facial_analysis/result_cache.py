@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+import requests
+from typing import Dict, Any, Optional
+
+# Bump when the cached response shape changes so stale entries are ignored
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "video_analysis_cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def config_fingerprint(config: Any) -> str:
+    """Stable hash of an analyzer configuration (key order independent)"""
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def file_content_hash(path: str) -> str:
+    """SHA-256 of a local file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def url_validator(video_url: str, timeout: int = 10) -> Optional[str]:
+    """
+    Identify the current version of a remote video from its HTTP validators
+    Returns None when the server sends neither ETag nor Last-Modified (response is not cacheable)
+    """
+    try:
+        response = requests.head(video_url, allow_redirects=True, timeout=timeout)
+    except requests.RequestException as e:
+        logging.warning(f"Cache validator lookup failed: {str(e)}")
+        return None
+    if response.status_code >= 400:
+        return None
+
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return None
+    return f"etag={etag or ''};last-modified={last_modified or ''};length={response.headers.get('Content-Length', '')}"
+
+def video_cache_key(video_url: Optional[str], video_file: Optional[str], analyzer_config: Any) -> Optional[str]:
+    """
+    Cache key for a video analysis: video identity + version + analyzer configuration
+    URLs are identified by ETag/Last-Modified, local files by content hash.
+    """
+    if video_url:
+        validator = url_validator(video_url)
+        if validator is None:
+            return None
+        source = f"url={video_url};{validator}"
+    elif video_file and os.path.isfile(video_file):
+        source = f"sha256={file_content_hash(video_file)}"
+    else:
+        return None
+
+    material = f"v{CACHE_FORMAT_VERSION}|{source}|analyzer={config_fingerprint(analyzer_config)}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+class VideoResultCache:
+    """
+    Bounded on-disk cache of analysis responses
+    Entries expire after ttl_seconds; when the store exceeds max_bytes the least recently
+    used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry ({"value", "stored_at"}) or None if missing or expired"""
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+            if time.time() - entry.get('stored_at', 0) > self.ttl_seconds:
+                self._remove(path)
+                return None
+
+            # Access time drives LRU eviction
+            os.utime(path, None)
+            return entry
+
+    def put(self, key: str, value: Dict[str, Any]):
+        entry = {"stored_at": time.time(), "value": value}
+        path = self._entry_path(key)
+        with self._lock:
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, path)
+            self._evict()
+
+    def _remove(self, path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        now = time.time()
+        entries = []
+        total_bytes = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_bytes += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+
+_default_cache = None
+
+def get_result_cache() -> VideoResultCache:
+    """Process-wide cache configured from VIDEO_CACHE_DIR / VIDEO_CACHE_MAX_BYTES / VIDEO_CACHE_TTL_SECONDS"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = VideoResultCache(
+            cache_dir=os.environ.get("VIDEO_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_bytes=int(os.environ.get("VIDEO_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            ttl_seconds=float(os.environ.get("VIDEO_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        )
+    return _default_cache
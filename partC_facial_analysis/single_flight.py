@@ -0,0 +1,79 @@
+import copy
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for request coalescing
+    Lower-cases scheme and host, drops default ports and sorts query parameters. The
+    fragment is dropped: it is never sent to the server, so it cannot change the video.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}@{host}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        # Deep copy of the result taken before followers are released; each gets its own copy
+        self.snapshot = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution
+    The first caller runs the function; callers arriving while it is in flight block and
+    receive a deep copy of its result (or the same exception), so handlers can adjust their
+    response without touching each other's. Nothing is kept once the call completes, so
+    later calls run again - pair with a cache for completed results.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return (result, shared); shared is True when the result came from another caller's run"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.snapshot), True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                waiters = call.waiters
+            if waiters and call.error is None:
+                # Taken before the leader returns, so its own changes never reach the followers
+                call.snapshot = copy.deepcopy(call.result)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
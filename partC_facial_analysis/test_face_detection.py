@@ -28,7 +28,11 @@ def test_face_detection_video():
     print()
     
     try:
-        result = analyze_video_with_face_detection(video_url=test_video)
+        def show_progress(partial):
+            smile = partial.get('average_smile_score', 'N/A')
+            print(f"   ⏳ {partial['progress']:.0%} - face coverage {partial['face_coverage']:.0%}, smile {smile}")
+        
+        result = analyze_video_with_face_detection(video_url=test_video, on_progress=show_progress)
         
         # Save results
         with open("face_detection_results.json", "w") as f:
@@ -0,0 +1,234 @@
+import pytest
+import json
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import azure.functions as func
+import numpy as np
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import function_app
+import job_store
+from batch_scheduler import FairScheduler, TokenBucket
+from test_face_columns import make_face
+from test_frame_processing import gradient_frame, write_test_video
+
+class CountingBucket(TokenBucket):
+    """Token bucket that never waits and counts acquisitions"""
+
+    def __init__(self):
+        super().__init__(rate_per_sec=1, burst=1)
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+class TestFairScheduler:
+
+    def test_owners_take_turns(self):
+        scheduler = FairScheduler(max_concurrent=1)
+        gate = threading.Event()
+        order = []
+
+        # Hold the only worker while the queues fill up
+        blocker = scheduler.submit("warmup", gate.wait)
+        futures = [scheduler.submit("big-batch", lambda i=i: order.append(f"big-{i}")) for i in range(4)]
+        futures += [scheduler.submit("small-batch", lambda: order.append("small"))]
+        gate.set()
+        blocker.result(5)
+        for future in futures:
+            future.result(5)
+
+        assert order == ["big-0", "small", "big-1", "big-2", "big-3"]
+
+    def test_concurrency_budget_is_respected(self):
+        scheduler = FairScheduler(max_concurrent=2)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def unit():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+        futures = [scheduler.submit(f"video-{i % 3}", unit) for i in range(8)]
+        for future in futures:
+            future.result(5)
+
+        assert peak[0] == 2
+        assert scheduler.stats()["queued"] == 0
+
+    def test_errors_reach_the_caller(self):
+        scheduler = FairScheduler(max_concurrent=1)
+        future = scheduler.submit("video", lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            future.result(5)
+
+    def test_unlimited_units_skip_the_rate_budget(self):
+        scheduler = FairScheduler(max_concurrent=1, rate_limiter=CountingBucket())
+        scheduler.submit("batch", lambda: None).result(5)
+        scheduler.submit("batch", lambda: None, rate_limited=False).result(5)
+        assert scheduler.rate_limiter.acquired == 1
+
+    def test_token_bucket_spaces_out_calls(self):
+        bucket = TokenBucket(rate_per_sec=20, burst=1)
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        assert time.monotonic() - start >= 0.09
+
+class TestBatchRoutes:
+
+    def post_batch(self, body):
+        handler = function_app.analyze_video_batch.build().get_user_function()
+        return handler(func.HttpRequest(method="POST", url="/api/analyze_videos", body=json.dumps(body).encode()))
+
+    def get_status(self, batch_id):
+        handler = function_app.get_batch_status.build().get_user_function()
+        return handler(func.HttpRequest(method="GET", url=f"/api/analysis_batches/{batch_id}", body=b"",
+                                        route_params={"batch_id": batch_id}, params={"include_insights": "true"}))
+
+    @patch('function_app.result_cache.video_cache_key', return_value=None)
+    @patch('function_app.utils.generate_presentation_insights', return_value={"recommendations": []})
+    @patch('function_app.utils.analyze_video_with_content_understanding', return_value={})
+    def test_batch_reports_jobs_and_aggregate_progress(self, mock_analyze, mock_generate, mock_key):
+        with patch('function_app.batch_scheduler.get_batch_scheduler', return_value=FairScheduler(max_concurrent=2)), \
+             patch('function_app.job_store.get_job_store', return_value=job_store.JobStore()):
+            response = self.post_batch({"videos": [
+                "https://example.com/a.mp4",
+                {"video_file": "/videos/b.mp4"},
+                {"video_url": "https://example.com/c.mp4"}
+            ]})
+            assert response.status_code == 202
+            batch = json.loads(response.get_body())
+            assert len({job["job_id"] for job in batch["jobs"]}) == 3
+
+            deadline = time.time() + 10
+            while True:
+                status = json.loads(self.get_status(batch["batch_id"]).get_body())
+                if status["progress"]["done"] or time.time() > deadline:
+                    break
+                time.sleep(0.05)
+
+        progress = status["progress"]
+        assert progress["succeeded"] == 3 and progress["failed"] == 0
+        assert progress["units_total"] == 3 and progress["percent_complete"] == 100.0
+        assert mock_analyze.call_count == 3
+        assert all(job["insights"]["recommendations"] == [] for job in status["jobs"])
+
+    @patch('function_app.result_cache.video_cache_key', return_value=None)
+    @patch('function_app.utils.generate_presentation_insights', return_value={"recommendations": []})
+    def test_batches_take_turns(self, mock_generate, mock_key):
+        scheduler = FairScheduler(max_concurrent=1)
+        gate = threading.Event()
+        order = []
+
+        def analyze(video_url, video_file=None):
+            order.append(video_url)
+            return {}
+
+        with patch('function_app.utils.analyze_video_with_content_understanding', side_effect=analyze), \
+             patch('function_app.batch_scheduler.get_batch_scheduler', return_value=scheduler), \
+             patch('function_app.job_store.get_job_store', return_value=job_store.JobStore()):
+            # Hold the only worker until both batches are queued
+            blocker = scheduler.submit("warmup", gate.wait)
+            big = json.loads(self.post_batch({"videos": [f"https://example.com/big-{i}.mp4" for i in range(4)]}).get_body())
+            deadline = time.time() + 10
+            while scheduler.stats()["queued"] < 4 and time.time() < deadline:
+                time.sleep(0.01)
+            small = json.loads(self.post_batch({"videos": ["https://example.com/small.mp4"]}).get_body())
+            while scheduler.stats()["queued"] < 5 and time.time() < deadline:
+                time.sleep(0.01)
+            gate.set()
+            blocker.result(5)
+            for batch in (big, small):
+                while not json.loads(self.get_status(batch["batch_id"]).get_body())["progress"]["done"]:
+                    assert time.time() < deadline
+                    time.sleep(0.02)
+
+        assert len(order) == 5
+        assert order.index("https://example.com/small.mp4") == 1
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.local_face_boxes', return_value=np.array([[0, 0, 64, 64]]))
+    def test_face_api_calls_take_the_call_budget(self, mock_boxes, mock_sleep, tmp_path):
+        video_path = write_test_video(str(tmp_path / "talk.mp4"), [gradient_frame(i) for i in range(20)])
+        scheduler = FairScheduler(max_concurrent=1, rate_limiter=CountingBucket(), call_limiter=CountingBucket())
+        face = {"success": True, "face_count": 1, "faces": [make_face(0.6, 0.0)]}
+
+        with patch('utils_new.detect_faces_in_image', return_value=face) as mock_detect, \
+             patch('function_app.batch_scheduler.get_batch_scheduler', return_value=scheduler), \
+             patch('function_app.job_store.get_job_store', return_value=job_store.JobStore()):
+            batch = json.loads(self.post_batch({"videos": [{"video_file": video_path, "analyzer": "face_api"}]}).get_body())
+            deadline = time.time() + 10
+            while not json.loads(self.get_status(batch["batch_id"]).get_body())["progress"]["done"]:
+                assert time.time() < deadline
+                time.sleep(0.02)
+
+        assert mock_detect.call_count > 1
+        assert scheduler.call_limiter.acquired == mock_detect.call_count
+        assert scheduler.rate_limiter.acquired == 0
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.local_face_boxes', return_value=np.array([[0, 0, 64, 64]]))
+    def test_face_api_job_publishes_partial_insights(self, mock_boxes, mock_sleep, tmp_path):
+        video_path = write_test_video(str(tmp_path / "talk.mp4"), [gradient_frame(i) for i in range(20)])
+        gate = threading.Event()
+        calls = []
+
+        def detect(image_data):
+            calls.append(1)
+            if len(calls) > 1:
+                # Hold the job mid-video until the test has seen a partial result
+                gate.wait(10)
+            return {"success": True, "face_count": 1, "faces": [make_face(0.6, 0.0)]}
+
+        get_job = function_app.get_job_status.build().get_user_function()
+        with patch('utils_new.detect_faces_in_image', side_effect=detect), \
+             patch('function_app.batch_scheduler.get_batch_scheduler', return_value=FairScheduler(max_concurrent=1)), \
+             patch('function_app.job_store.get_job_store', return_value=job_store.JobStore()):
+            batch = json.loads(self.post_batch({"videos": [{"video_file": video_path, "analyzer": "face_api"}]}).get_body())
+            job_id = batch["jobs"][0]["job_id"]
+
+            def poll():
+                return json.loads(get_job(func.HttpRequest(method="GET", url=f"/api/analysis_jobs/{job_id}", body=b"",
+                                                           route_params={"job_id": job_id})).get_body())
+
+            deadline = time.time() + 10
+            job = poll()
+            while "partial" not in job and time.time() < deadline:
+                threading.Event().wait(0.02)
+                job = poll()
+            gate.set()
+
+            assert job["status"] == "running"
+            assert 0 < job["partial"]["progress"] < 1
+            assert job["partial"]["average_smile_score"] == 0.6
+
+            while job["status"] == "running" and time.time() < deadline:
+                threading.Event().wait(0.02)
+                job = poll()
+
+        assert job["status"] == "succeeded"
+        assert job["insights"]["average_smile_score"] == 0.6
+
+    def test_invalid_batches_are_rejected(self):
+        assert self.post_batch({"videos": []}).status_code == 400
+        assert self.post_batch({"videos": [{"callback_url": "https://example.com/hook"}]}).status_code == 400
+        assert self.post_batch({"videos": ["https://example.com/v.mp4"] * 101}).status_code == 400
+        assert self.post_batch({"videos": [{"video_url": "https://example.com/v.mp4", "analyzer": "ocr"}]}).status_code == 400
+
+    def test_unknown_batch_is_404(self):
+        assert self.get_status("no-such-batch").status_code == 404
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,207 @@
+import pytest
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import azure.functions as func
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import callbacks
+import function_app
+
+SECRET = "test-secret"
+# The test receiver listens on loopback, which only an allowlist permits
+LOCAL_RECEIVER = {callbacks.CALLBACK_ALLOWED_HOSTS_ENV: "127.0.0.1"}
+
+def resolves_to(*addresses):
+    """getaddrinfo stand-in returning the given addresses for any host"""
+    return patch('callbacks.socket.getaddrinfo',
+                 return_value=[(2, 1, 6, '', (address, 443)) for address in addresses])
+
+class CallbackReceiver:
+    """Local webhook receiver that answers with the queued status codes, then 200"""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.deliveries = []
+        self.received = threading.Event()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status = receiver.statuses.pop(0) if receiver.statuses else 200
+                receiver.deliveries.append((status, dict(self.headers), body))
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                if status < 300:
+                    receiver.received.set()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hooks/video"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def receiver():
+    stubs = []
+    def make(statuses=()):
+        stubs.append(CallbackReceiver(statuses))
+        return stubs[-1]
+    yield make
+    for stub in stubs:
+        stub.close()
+
+@patch.dict(os.environ, LOCAL_RECEIVER)
+class TestDeliverCallback:
+
+    @patch('callbacks.time.sleep')
+    def test_retries_with_backoff_until_delivered(self, mock_sleep, receiver):
+        stub = receiver([503, 500])
+        assert callbacks.deliver_callback(stub.url, {"status": "succeeded"}, SECRET, backoff_sec=1)
+
+        assert [status for status, _, _ in stub.deliveries] == [503, 500, 200]
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2]
+
+        _, headers, body = stub.deliveries[-1]
+        assert json.loads(body) == {"status": "succeeded"}
+        assert callbacks.verify_signature(body, headers[callbacks.TIMESTAMP_HEADER], headers[callbacks.SIGNATURE_HEADER], SECRET)
+        assert not callbacks.verify_signature(body, headers[callbacks.TIMESTAMP_HEADER], headers[callbacks.SIGNATURE_HEADER], "other")
+
+    @patch('callbacks.time.sleep')
+    def test_client_error_is_not_retried(self, mock_sleep, receiver):
+        stub = receiver([410])
+        assert not callbacks.deliver_callback(stub.url, {}, SECRET)
+        assert len(stub.deliveries) == 1
+        mock_sleep.assert_not_called()
+
+    @patch('callbacks.time.sleep')
+    def test_gives_up_after_retries(self, mock_sleep, receiver):
+        stub = receiver([500] * 10)
+        assert not callbacks.deliver_callback(stub.url, {}, SECRET, retries=2)
+        assert len(stub.deliveries) == 3
+
+    @patch('callbacks.time.sleep')
+    def test_redirects_are_not_followed(self, mock_sleep, receiver):
+        stub = receiver([307])
+        assert not callbacks.deliver_callback(stub.url, {}, SECRET)
+        assert len(stub.deliveries) == 1
+
+@patch.dict(os.environ, {}, clear=True)
+class TestCallbackUrlValidation:
+
+    def test_rejects_non_http_urls(self):
+        for url in ("ftp://host/hook", "/relative/hook", None):
+            with pytest.raises(ValueError):
+                callbacks.validate_callback_url(url)
+
+    def test_requires_https(self):
+        with resolves_to("93.184.216.34"), pytest.raises(ValueError, match="https"):
+            callbacks.validate_callback_url("http://hooks.example.com/v")
+
+    def test_rejects_internal_addresses(self):
+        for address in ("127.0.0.1", "10.1.2.3", "169.254.169.254", "192.168.0.10", "::1", "fe80::1%eth0"):
+            with resolves_to(address), pytest.raises(ValueError, match="private"):
+                callbacks.validate_callback_url("https://hooks.example.com/v")
+        # One internal address among public ones is enough to refuse
+        with resolves_to("93.184.216.34", "10.0.0.5"), pytest.raises(ValueError):
+            callbacks.validate_callback_url("https://hooks.example.com/v")
+
+    def test_accepts_public_https_receiver(self):
+        with resolves_to("93.184.216.34", "2606:2800:220:1:248:1893:25c8:1946"):
+            assert callbacks.validate_callback_url("https://hooks.example.com/v") == "https://hooks.example.com/v"
+
+    def test_unresolvable_host_is_rejected(self):
+        with patch('callbacks.socket.getaddrinfo', side_effect=callbacks.socket.gaierror), \
+             pytest.raises(ValueError, match="resolve"):
+            callbacks.validate_callback_url("https://hooks.invalid/v")
+
+    def test_allowlist_replaces_the_address_checks(self):
+        with patch.dict(os.environ, {callbacks.CALLBACK_ALLOWED_HOSTS_ENV: "hooks.internal, 127.0.0.1"}):
+            assert callbacks.validate_callback_url("http://hooks.internal:8080/v")
+            with pytest.raises(ValueError, match=callbacks.CALLBACK_ALLOWED_HOSTS_ENV):
+                callbacks.validate_callback_url("https://hooks.example.com/v")
+
+    @patch('callbacks.create_connection')
+    def test_delivery_rechecks_the_host(self, mock_connect):
+        with resolves_to("10.0.0.5"):
+            assert not callbacks.deliver_callback("https://hooks.example.com/v", {}, SECRET)
+        mock_connect.assert_not_called()
+
+    @patch('callbacks.time.sleep')
+    @patch('callbacks.create_connection')
+    def test_rebinding_after_validation_is_refused(self, mock_connect, mock_sleep):
+        public = [(2, 1, 6, '', ("93.184.216.34", 443))]
+        internal = [(2, 1, 6, '', ("10.0.0.5", 443))]
+        with patch('callbacks.socket.getaddrinfo', side_effect=[public, internal]):
+            assert not callbacks.deliver_callback("https://hooks.example.com/v", {}, SECRET)
+        mock_connect.assert_not_called()
+        mock_sleep.assert_not_called()
+
+    @patch('callbacks.create_connection', side_effect=OSError("unreachable"))
+    def test_connection_goes_to_the_checked_address(self, mock_connect):
+        with resolves_to("93.184.216.34") as mock_resolve:
+            assert not callbacks.deliver_callback("https://hooks.example.com/v", {}, SECRET, retries=0)
+        # One lookup to validate, one at connect time; the socket is opened on the checked address
+        assert mock_resolve.call_count == 2
+        assert mock_connect.call_args[0][0] == ("93.184.216.34", 443)
+
+class TestAnalyzeVideoCallback:
+
+    def call(self, body):
+        handler = function_app.analyze_video_content.build().get_user_function()
+        return handler(func.HttpRequest(method="POST", url="/api/analyze_video", body=json.dumps(body).encode()))
+
+    @patch.dict(os.environ, {callbacks.CALLBACK_SECRET_ENV: SECRET, **LOCAL_RECEIVER})
+    @patch('callbacks.time.sleep')
+    @patch('function_app.run_video_analysis', return_value=({"recommendations": []}, "MISS"))
+    def test_insights_posted_once_on_completion(self, mock_run, mock_sleep, receiver):
+        stub = receiver([502])
+        response = self.call({"video_url": "https://example.com/talk.mp4", "callback_url": stub.url})
+
+        assert response.status_code == 202
+        job_id = json.loads(response.get_body())["job_id"]
+        assert stub.received.wait(5)
+
+        assert mock_run.call_count == 1
+        assert [status for status, _, _ in stub.deliveries] == [502, 200]
+        payload = json.loads(stub.deliveries[-1][2])
+        assert payload == {"job_id": job_id, "status": "succeeded", "cache": "MISS", "insights": {"recommendations": []}}
+
+    @patch.dict(os.environ, {callbacks.CALLBACK_SECRET_ENV: SECRET, **LOCAL_RECEIVER})
+    @patch('function_app.run_video_analysis', side_effect=Exception("analysis timed out"))
+    def test_failure_is_delivered(self, mock_run, receiver):
+        stub = receiver()
+        self.call({"video_url": "https://example.com/talk.mp4", "callback_url": stub.url})
+        assert stub.received.wait(5)
+        payload = json.loads(stub.deliveries[-1][2])
+        assert payload["status"] == "failed" and payload["error"] == "analysis timed out"
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_callback_requires_signing_secret(self):
+        with resolves_to("93.184.216.34"):
+            response = self.call({"video_url": "https://example.com/talk.mp4", "callback_url": "https://hooks.example.com/v"})
+        assert response.status_code == 501
+
+    @patch.dict(os.environ, {callbacks.CALLBACK_SECRET_ENV: SECRET}, clear=True)
+    @patch('function_app.run_video_analysis')
+    def test_internal_callback_url_is_rejected(self, mock_run):
+        response = self.call({"video_url": "https://example.com/talk.mp4",
+                              "callback_url": "https://169.254.169.254/metadata/instance"})
+        assert response.status_code == 400
+        mock_run.assert_not_called()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,103 @@
+import pytest
+import math
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils
+from cue_index import CueIndex, parse_vtt_cues, timestamp_seconds
+
+TRANSCRIPT = (
+    "WEBVTT\n\n"
+    "1\n00:00:00.000 --> 00:00:04.000\nWelcome everyone.\n\n"
+    "00:00:05.000 --> 00:00:09.000 align:start\nThis launch was a huge success!\n\n"
+    "00:00:10.000 --> 00:00:14.000\nNow the quarterly numbers,\nregion by region.\n\n"
+    "00:00:14.000 --> 00:00:18.000\nMargins were flat.\n"
+)
+
+def vtt_clock(seconds: float) -> str:
+    return f"{int(seconds // 3600):02d}:{int(seconds // 60 % 60):02d}:{seconds % 60:06.3f}"
+
+class TestCueIndex:
+
+    def test_parse_vtt_cues(self):
+        cues = parse_vtt_cues(TRANSCRIPT)
+        assert [(cue["start"], cue["end"]) for cue in cues] == [(0, 4), (5, 9), (10, 14), (14, 18)]
+        assert cues[2]["text"] == "Now the quarterly numbers, region by region."
+
+    def test_lookup_respects_cue_bounds_and_gaps(self):
+        index = CueIndex.from_vtt(TRANSCRIPT)
+        assert index.lookup(0)["text"] == "Welcome everyone."
+        assert index.lookup(4.5) is None  # between cues
+        assert index.lookup(14)["text"] == "Margins were flat."  # end is exclusive
+        assert list(index.lookup_many([-1, 6, 13.9, 18, math.nan])) == [-1, 1, 2, -1, -1]
+        assert list(CueIndex([]).lookup_many([1.0])) == [-1]
+
+    def test_timestamp_formats(self):
+        assert timestamp_seconds("12.5s") == 12.5
+        assert timestamp_seconds("00:02:30.500") == 150.5
+        assert timestamp_seconds(7) == 7.0
+        assert math.isnan(timestamp_seconds("moment_3"))
+
+class TestEmotionalContentMapping:
+
+    def test_mapping_fields_are_populated(self):
+        timeline = [
+            {"timestamp": "1s", "emotion": "neutral", "confidence": 0.6},
+            {"timestamp": "6s", "emotion": "joy", "confidence": 0.9},
+            {"timestamp": "7s", "emotion": "joy", "confidence": 0.8},
+            {"timestamp": "11s", "emotion": "neutral", "confidence": 0.7},
+            {"timestamp": "15s", "emotion": "sadness", "confidence": 0.5},
+            {"timestamp": "4.5s", "emotion": "fear", "confidence": 0.9}  # between cues - unmatched
+        ]
+        key_moments = [{"timestamp": "6s"}, {"timestamp": "30s"}]
+
+        mapping = utils.map_emotions_to_transcript(TRANSCRIPT, timeline, key_moments)
+
+        assert [topic["text"] for topic in mapping["high_energy_topics"]] == ["This launch was a huge success!"]
+        assert mapping["high_energy_topics"][0]["energy_intensity"] == 0.85
+        assert [(s["start_sec"], s["end_sec"], s["cues"]) for s in mapping["low_engagement_sections"]] == [(0, 4, 1), (10, 18, 2)]
+        assert mapping["low_engagement_sections"][1]["dominant_emotion"] == "neutral"
+        assert [entry["samples"] for entry in mapping["emotional_relevance"]] == [1, 2, 1, 1]
+        assert key_moments[0]["spoken_text"] == "This launch was a huge success!"
+        assert "spoken_text" not in key_moments[1]
+
+    def test_no_transcript_leaves_mapping_empty(self):
+        mapping = utils.map_emotions_to_transcript("", [{"timestamp": "1s", "emotion": "joy", "confidence": 0.9}])
+        assert mapping == {"high_energy_topics": [], "low_engagement_sections": [], "emotional_relevance": []}
+
+    def test_generate_presentation_insights_fills_mapping(self):
+        insights = utils.generate_presentation_insights({
+            "contentExtraction": {
+                "transcript": TRANSCRIPT,
+                "keyFrames": [{"timestamp": "11s", "description": "Slide", "confidence": 0.9}],
+                "emotionTimeline": [{"timestamp": "00:00:06", "emotion": "confidence", "confidence": 0.95}]
+            }
+        })
+        content = insights["content_analysis"]
+        assert content["emotional_content_mapping"]["high_energy_topics"][0]["start_sec"] == 5
+        assert content["key_moments"][0]["spoken_text"] == "Now the quarterly numbers, region by region."
+
+    def test_join_scales_to_thousands_of_cues(self):
+        cues = 5000
+        transcript = "WEBVTT\n\n" + "".join(
+            f"{vtt_clock(i * 4)} --> {vtt_clock(i * 4 + 3.5)}\nCue number {i}\n\n" for i in range(cues)
+        )
+        emotions = ("joy", "neutral", "confidence", "sadness")
+        timeline = [
+            {"timestamp": f"{i * 1.0:.1f}s", "emotion": emotions[i % 4], "confidence": 0.5 + (i % 5) / 10}
+            for i in range(cues * 4)
+        ]
+
+        start = time.perf_counter()
+        mapping = utils.map_emotions_to_transcript(transcript, timeline)
+        elapsed = time.perf_counter() - start
+
+        assert len(mapping["emotional_relevance"]) == utils.MAPPING_MAX_ITEMS
+        assert elapsed < 2.0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
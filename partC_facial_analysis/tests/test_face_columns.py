@@ -0,0 +1,91 @@
+import pytest
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_columns import FaceAttributeColumns
+from utils_new import generate_video_insights
+
+def make_face(smile, yaw, quality="high", age=30):
+    return {
+        "faceAttributes": {
+            "smile": smile,
+            "age": age,
+            "headPose": {"yaw": yaw, "pitch": 0.0, "roll": 0.0},
+            "qualityForRecognition": quality
+        }
+    }
+
+def make_frames(faces_per_frame):
+    return [
+        {"frame_number": i + 1, "timestamp": f"{i * 2:.1f}s", "face_count": len(faces), "faces": faces}
+        for i, faces in enumerate(faces_per_frame)
+    ]
+
+class TestFaceAttributeColumns:
+
+    def test_columns_and_aggregates(self):
+        frames = make_frames([
+            [make_face(0.2, 0.0), make_face(0.4, 10.0, "medium")],
+            [],
+            [make_face(0.9, 20.0, "low")]
+        ])
+        columns = FaceAttributeColumns(frames)
+
+        assert columns.face_count == 3
+        assert list(columns.frame_index) == [0, 0, 2]
+        assert columns.mean(columns.smile) == pytest.approx(0.5)
+        assert columns.quality_distribution() == {"high": 1, "medium": 1, "low": 1}
+        np.testing.assert_allclose(columns.per_frame_mean(columns.smile), [0.3, np.nan, 0.9])
+
+        timeline = columns.timeline()
+        assert [point["avg_smile"] for point in timeline] == [0.3, None, 0.9]
+        assert timeline[2]["timestamp"] == 4.0
+
+    def test_head_pose_jitter_uses_time_order(self):
+        frames = make_frames([[make_face(0.5, 0.0)], [make_face(0.5, 30.0)], [make_face(0.5, 0.0)]])
+        # Shuffle arrival order; jitter must follow timestamps, not list order
+        columns = FaceAttributeColumns([frames[2], frames[0], frames[1]])
+
+        stability = columns.head_pose_stability()
+
+        assert stability["yaw"]["jitter"] == 30.0
+        assert stability["pitch"]["jitter"] == 0.0
+        assert stability["stable"] is False
+
+    def test_missing_attributes_are_ignored(self):
+        frames = make_frames([[{"faceAttributes": {"smile": 0.6}}]])
+        columns = FaceAttributeColumns(frames)
+
+        assert columns.mean(columns.age) == 0.0
+        assert columns.average_quality() == 0.0
+        assert columns.head_pose_stability()["stable"] is True
+
+class TestVideoInsights:
+
+    def test_insights_report_pose_and_timeline(self):
+        frames = make_frames([[make_face(0.8, 0.0)], [make_face(0.8, 25.0)], [make_face(0.8, -25.0)]])
+        all_faces = [face for frame in frames for face in frame["faces"]]
+
+        insights = generate_video_insights(frames, all_faces)
+
+        assert insights["average_smile_score"] == 0.8
+        assert insights["engagement_level"] == "High"
+        assert insights["video_quality"] == "High"
+        assert len(insights["timeline"]) == 3
+        assert "Maintain consistent eye contact with camera" in insights["recommendations"]
+
+    def test_steady_presenter_gets_no_eye_contact_note(self):
+        frames = make_frames([[make_face(0.8, 2.0)], [make_face(0.8, 3.0)]])
+        all_faces = [face for frame in frames for face in frame["faces"]]
+
+        insights = generate_video_insights(frames, all_faces)
+
+        assert insights["recommendations"] == ["Great presentation! Keep up the good work."]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,203 @@
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils_new
+from face_tracking import FaceTracker, box_iou, tracking_windows
+from test_face_columns import make_face
+from test_frame_processing import write_test_video
+
+PATCH_SIZE = 60
+PATCH = cv2.resize(np.random.default_rng(7).integers(40, 255, (12, 12), dtype=np.uint8),
+                   (PATCH_SIZE, PATCH_SIZE), interpolation=cv2.INTER_NEAREST)
+
+def scene(left: int, top: int, angle: float = 0.0, size=(240, 320)) -> np.ndarray:
+    """Textured square (the 'face') on a black background"""
+    frame = np.zeros(size, dtype=np.uint8)
+    frame[top:top + PATCH_SIZE, left:left + PATCH_SIZE] = PATCH
+    if angle:
+        centre = (left + PATCH_SIZE / 2, top + PATCH_SIZE / 2)
+        frame = cv2.warpAffine(frame, cv2.getRotationMatrix2D(centre, -angle, 1.0), (size[1], size[0]))
+    return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+def fake_detect(frame):
+    """Face API stand-in: one face at the bounding box of the non-black pixels"""
+    points = cv2.findNonZero(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    if points is None:
+        return {"success": True, "face_count": 0, "faces": []}
+    left, top, width, height = cv2.boundingRect(points)
+    face = make_face(0.6, 5.0)
+    face["faceRectangle"] = {"left": left, "top": top, "width": width, "height": height}
+    face["faceLandmarks"] = {"noseTip": {"x": left + width / 2, "y": top + height / 2}}
+    return {"success": True, "face_count": 1, "faces": [face]}
+
+def rect(face):
+    r = face["faceRectangle"]
+    return (r["left"], r["top"], r["width"], r["height"])
+
+class TestFaceTracker:
+
+    def test_tracks_between_keyframes(self):
+        calls = []
+        tracker = FaceTracker(lambda frame: calls.append(1) or fake_detect(frame), keyframe_interval=5)
+
+        for i in range(12):
+            frame = scene(40 + 4 * i, 60 + 2 * i)
+            result = tracker.process(frame)
+            face = result["faces"][0]
+            assert box_iou(rect(face), rect(fake_detect(frame)["faces"][0])) > 0.9
+            assert face["trackId"] == 1
+            assert face["tracked"] == (result["source"] == "tracked")
+
+        # Frame 0, then keyframes at frames 6 and 12 of the run
+        assert len(calls) == 2
+        assert tracker.stats["tracked_frames"] == 10
+        assert tracker.stats["track_losses"] == 0
+        nose = face["faceLandmarks"]["noseTip"]
+        assert nose["x"] == pytest.approx(40 + 44 + PATCH_SIZE / 2, abs=2)
+        # Attributes are only reported where they were measured
+        assert "smile" not in face["faceAttributes"]
+
+    def test_lost_face_triggers_redetection(self):
+        tracker = FaceTracker(fake_detect, keyframe_interval=50)
+        tracker.process(scene(100, 80))
+        tracker.process(scene(104, 80))
+
+        result = tracker.process(np.zeros((240, 320, 3), dtype=np.uint8))
+
+        assert result["source"] == "detected"
+        assert result["detect_reason"] == "track_lost"
+        assert result["face_count"] == 0
+        assert tracker.stats["track_losses"] == 1
+        # Nothing to follow: the empty result is held until the next keyframe
+        assert tracker.process(np.zeros((240, 320, 3), dtype=np.uint8))["source"] == "tracked"
+
+    def test_rotation_updates_roll(self):
+        tracker = FaceTracker(fake_detect, keyframe_interval=50)
+        tracker.process(scene(120, 90))
+        for angle in (3, 6, 9):
+            result = tracker.process(scene(120, 90, angle))
+
+        assert result["source"] == "tracked"
+        assert result["faces"][0]["faceAttributes"]["headPose"]["roll"] == pytest.approx(9, abs=1.5)
+        assert set(result["faces"][0]["faceAttributes"]["headPose"]) == {"roll"}
+
+    def test_reset_forces_detection(self):
+        tracker = FaceTracker(fake_detect, keyframe_interval=50)
+        tracker.process(scene(50, 50))
+        tracker.reset()
+        assert tracker.process(scene(200, 150))["detect_reason"] == "start"
+        assert tracker.stats["detections"] == 2
+
+    def test_tracking_windows(self):
+        # 10 minutes at 25 fps, three 4 s windows at about 8 fps
+        assert tracking_windows(15000, 25.0, windows=3, window_sec=4, track_fps=8) == [
+            (0, 100, 3), (7450, 7550, 3), (14900, 15000, 3)
+        ]
+        # Too short for separate windows: one window over the whole video
+        assert tracking_windows(40, 10.0, windows=12, window_sec=5, track_fps=8) == [(0, 40, 1)]
+
+    def test_spent_budget_skips_instead_of_detecting(self):
+        calls = []
+        tracker = FaceTracker(lambda frame: calls.append(1) or fake_detect(frame), keyframe_interval=2, max_detections=1)
+
+        results = [tracker.process(scene(40 + 2 * i, 60)) for i in range(4)]
+        # The keyframe is tracked through; a lost face can no longer be re-detected
+        assert [result["source"] for result in results] == ["detected", "tracked", "tracked", "tracked"]
+        assert tracker.process(np.zeros((240, 320, 3), dtype=np.uint8))["source"] == "skipped"
+        assert tracker.process(scene(48, 60))["source"] == "skipped"
+        assert len(calls) == 1
+        assert tracker.stats["skipped_frames"] == 2
+
+    def test_failed_detection_is_retried(self):
+        responses = iter([{"success": False, "error": "throttled", "face_count": 0}, fake_detect(scene(50, 50))])
+        tracker = FaceTracker(lambda frame: next(responses), keyframe_interval=50)
+
+        assert tracker.process(scene(50, 50))["success"] is False
+        assert tracker.process(scene(50, 50))["face_count"] == 1
+        assert tracker.stats["detections"] == 2
+
+class TestTrackedVideoAnalysis:
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    def test_dense_timeline_with_few_api_calls(self, mock_detect, mock_sleep, tmp_path):
+        mock_detect.side_effect = lambda image_data: fake_detect(cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR))
+        frames = [scene(30 + 3 * i, 70 + i) for i in range(40)]
+        video_path = write_test_video(str(tmp_path / "talk.mp4"), frames)
+
+        result = utils_new.analyze_video_with_tracking(video_file=video_path, keyframe_interval=10)
+
+        assert result["success"] is True
+        assert result["frames_analyzed"] == 40
+        assert result["api_calls_made"] <= 8
+        assert result["tracking"]["api_calls_avoided"] == 40 - result["api_calls_made"]
+        timeline = result["tracking"]["timeline"]
+        assert len(timeline) == 40
+        assert all(point["face_present"] for point in timeline)
+        assert all(("yaw" in point["head_pose"]) == (point["source"] == "detected") for point in timeline)
+        # Smile is averaged over detections only, not repeated on tracked frames
+        assert result["insights"]["average_smile_score"] == 0.6
+        assert result["insights"]["quality_distribution"]["high"] == result["api_calls_made"]
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    def test_windows_are_decoded_densely(self, mock_detect, mock_sleep, tmp_path):
+        mock_detect.side_effect = lambda image_data: fake_detect(cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR))
+        frames = [scene(30 + i % 100, 70) for i in range(200)]
+        video_path = write_test_video(str(tmp_path / "long.mp4"), frames)
+
+        grabs = []
+        open_capture = cv2.VideoCapture
+
+        class CountingCapture:
+            def __init__(self, *args):
+                self.capture = open_capture(*args)
+
+            def grab(self):
+                grabs.append(1)
+                return self.capture.grab()
+
+            def __getattr__(self, name):
+                return getattr(self.capture, name)
+
+        with patch.object(cv2, 'VideoCapture', CountingCapture):
+            result = utils_new.analyze_video_with_tracking(video_file=video_path, windows=2, window_sec=3,
+                                                           track_fps=5, keyframe_interval=50)
+
+        timeline = result["tracking"]["timeline"]
+        assert [point["frame_number"] - 1 for point in timeline] == list(range(0, 30, 2)) + list(range(170, 200, 2))
+        # One detection to start each window; the rest is tracked
+        assert result["api_calls_made"] == 2
+        assert [point["source"] for point in timeline if point["window"] == 1][:2] == ["detected", "tracked"]
+        # The capture seeks to the second window rather than decoding the gap
+        assert len(grabs) == 60
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    def test_calls_never_exceed_frame_sampling(self, mock_detect, mock_sleep, tmp_path):
+        # Noise cannot be tracked, so every tracked frame would otherwise need a detection
+        mock_detect.side_effect = lambda image_data: fake_detect(cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR))
+        rng = np.random.default_rng(3)
+        frames = [rng.integers(0, 255, (120, 160, 3), dtype=np.uint8) for _ in range(600)]
+        video_path = write_test_video(str(tmp_path / "noise.mp4"), frames)
+
+        baseline = utils_new.analyze_video_with_face_detection(video_file=video_path, prefilter_faces=False)
+        baseline_calls = mock_detect.call_count
+        mock_detect.reset_mock()
+        result = utils_new.analyze_video_with_tracking(video_file=video_path)
+
+        assert baseline["api_calls_made"] == baseline_calls == 10
+        assert result["api_calls_made"] == mock_detect.call_count <= baseline_calls
+        # Every window still starts with a detection
+        assert {point["window"] for point in result["tracking"]["timeline"]} == set(range(5))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
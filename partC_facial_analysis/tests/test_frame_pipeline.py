@@ -0,0 +1,150 @@
+import pytest
+import sys
+import os
+import time
+import threading
+from unittest.mock import patch
+
+import numpy as np
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import frame_pipeline
+import job_store
+import utils_new
+from face_columns import FaceAttributeAccumulator, FaceAttributeColumns
+from test_face_columns import make_face, make_frames
+from test_frame_processing import encode_jpeg, gradient_frame, sampled_frames, write_test_video
+
+class TestRunPipeline:
+
+    def test_order_skip_and_transform(self):
+        stages = [
+            lambda x: frame_pipeline.SKIP if x % 3 == 0 else x,
+            lambda x: x * 10
+        ]
+        assert list(frame_pipeline.run_pipeline(range(10), stages)) == [10, 20, 40, 50, 70, 80]
+
+    def test_slow_consumer_applies_back_pressure(self):
+        produced = []
+        lock = threading.Lock()
+
+        def source():
+            for i in range(200):
+                with lock:
+                    produced.append(i)
+                yield i
+
+        max_ahead = 0
+        for consumed, item in enumerate(frame_pipeline.run_pipeline(source(), [lambda x: x], queue_size=2)):
+            time.sleep(0.002)
+            with lock:
+                max_ahead = max(max_ahead, len(produced) - consumed)
+
+        # Two queues of two items plus one item held by each of the two threads
+        assert max_ahead <= 7
+
+    def test_stage_error_reaches_consumer(self):
+        def explode(x):
+            if x == 5:
+                raise ValueError("bad frame")
+            return x
+
+        with pytest.raises(ValueError, match="bad frame"):
+            list(frame_pipeline.run_pipeline(range(100), [explode]))
+
+class TestStreamingAggregation:
+
+    def test_accumulator_matches_columns(self):
+        frames = make_frames([
+            [make_face(0.2, 0.0), make_face(0.4, 10.0, "medium")],
+            [],
+            [make_face(0.9, 20.0, "low", age=50)],
+            [make_face(0.6, -5.0)]
+        ])
+        accumulator = FaceAttributeAccumulator()
+        for frame in frames:
+            accumulator.add_frame(frame)
+
+        streamed = accumulator.stats()
+        batch = FaceAttributeColumns(frames).stats()
+
+        for key in ("faces", "frames", "frames_with_faces", "quality_distribution", "timeline", "head_pose_stability"):
+            assert streamed[key] == batch[key]
+        for key in ("avg_smile", "smile_variance", "avg_age", "avg_quality"):
+            assert streamed[key] == pytest.approx(batch[key])
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    def test_streaming_analysis_end_to_end(self, mock_detect, mock_sleep, tmp_path):
+        mock_detect.return_value = {"success": True, "face_count": 1, "faces": [make_face(0.8, 1.0)]}
+        video_path = write_test_video(str(tmp_path / "talk.mp4"), [gradient_frame(i) for i in range(30)])
+
+        result = utils_new.analyze_video_streaming(video_file=video_path, max_frames=6, prefilter_faces=False)
+
+        assert result["success"] is True
+        assert result["frames_analyzed"] == 6
+        assert result["api_calls_made"] == 6
+        assert result["insights"]["average_smile_score"] == 0.8
+        assert [point["timestamp"] for point in result["insights"]["timeline"]] == [0.0, 0.5, 1.0, 1.5, 2.0, 2.5]
+        assert "frame_analyses" not in result
+
+class TestProgressiveInsights:
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    @patch('utils_new.extract_frames_from_video')
+    def test_partial_insights_after_every_frame(self, mock_extract, mock_detect, mock_sleep):
+        mock_extract.return_value = sampled_frames(np.zeros((120, 160, 3), dtype=np.uint8), 4)
+        mock_detect.side_effect = [
+            {"success": True, "face_count": 1, "faces": [make_face(0.2, 0.0)]},
+            {"success": True, "face_count": 0, "faces": []},
+            {"success": True, "face_count": 1, "faces": [make_face(0.8, 0.0, "medium")]},
+            {"success": True, "face_count": 1, "faces": [make_face(0.5, 0.0)]}
+        ]
+        partials = []
+
+        result = utils_new.analyze_video_with_face_detection(
+            video_file="local.mp4", prefilter_faces=False, on_progress=partials.append
+        )
+
+        assert [partial["progress"] for partial in partials] == [0.0, 0.25, 0.5, 0.75, 1.0]
+        assert [partial["face_coverage"] for partial in partials] == [0.0, 1.0, 0.5, 0.667, 0.75]
+        assert partials[1]["average_smile_score"] == 0.2 and partials[1]["engagement_level"] == "Low"
+        assert partials[3]["average_smile_score"] == 0.5
+        assert "average_smile_score" not in partials[0]
+        assert partials[-1]["average_smile_score"] == result["insights"]["average_smile_score"]
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    def test_streaming_partials_published_to_job_store(self, mock_detect, mock_sleep, tmp_path):
+        mock_detect.return_value = {"success": True, "face_count": 1, "faces": [make_face(0.6, 1.0)]}
+        video_path = write_test_video(str(tmp_path / "talk.mp4"), [gradient_frame(i) for i in range(30)])
+        store = job_store.JobStore()
+        job_id = store.create_job({"video_file": video_path})
+        seen = []
+
+        def publish(partial):
+            store.publish_partial(job_id, partial)
+            seen.append(store.get_job(job_id)["partial"]["progress"])
+
+        utils_new.analyze_video_streaming(video_file=video_path, max_frames=4, prefilter_faces=False, on_progress=publish)
+
+        assert seen == [0.25, 0.5, 0.75, 1.0]
+        assert store.get_job(job_id)["partial"]["average_smile_score"] == 0.6
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image', return_value={"success": True, "face_count": 0, "faces": []})
+    @patch('utils_new.extract_frames_from_video')
+    def test_failing_listener_does_not_stop_analysis(self, mock_extract, mock_detect, mock_sleep):
+        mock_extract.return_value = sampled_frames(np.zeros((120, 160, 3), dtype=np.uint8), 2)
+
+        def listener(partial):
+            raise RuntimeError("UI went away")
+
+        result = utils_new.analyze_video_with_face_detection(video_file="local.mp4", prefilter_faces=False, on_progress=listener)
+        assert result["success"] is True
+
+if __name__ == "__main__":
+    pytest.main([__file__])
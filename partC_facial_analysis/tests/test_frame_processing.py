@@ -0,0 +1,279 @@
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import frame_processing
+import utils_new
+
+def encode_jpeg(frame: np.ndarray) -> bytes:
+    success, buffer = cv2.imencode('.jpg', frame)
+    assert success
+    return buffer.tobytes()
+
+def sampled_frames(frame: np.ndarray, count: int, fps: float = 10.0, stride: int = 20) -> list:
+    """Extracted frames as the frame samplers return them, stride frames apart"""
+    data = encode_jpeg(frame)
+    return [utils_new.EncodedFrame(data, i * stride, i * stride / fps) for i in range(count)]
+
+class TestFacePrefilter:
+
+    def test_blank_frame_has_no_face_candidates(self):
+        """A flat slide-like frame should never reach the Face API"""
+        frame = np.full((720, 1280, 3), 200, dtype=np.uint8)
+
+        assert frame_processing.count_local_face_candidates(frame) == 0
+        assert frame_processing.has_face_candidates(encode_jpeg(frame)) is False
+
+    def test_undecodable_frame_is_kept(self):
+        """Frames we cannot decode locally are passed through to the API"""
+        assert frame_processing.has_face_candidates(b"not-an-image") is True
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    @patch('utils_new.extract_frames_from_video')
+    def test_prefilter_reports_avoided_api_calls(self, mock_extract, mock_detect, mock_sleep):
+        """Frames without candidates are dropped and counted as avoided calls"""
+        mock_extract.return_value = sampled_frames(np.zeros((240, 320, 3), dtype=np.uint8), 4)
+
+        result = utils_new.analyze_video_with_face_detection(video_file="local.mp4")
+
+        assert result["success"]
+        mock_detect.assert_not_called()
+        assert result["api_calls_made"] == 0
+        assert result["prefilter"]["api_calls_avoided"] == 4
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    @patch('utils_new.extract_frames_from_video')
+    def test_prefilter_can_be_disabled(self, mock_extract, mock_detect, mock_sleep):
+        """Disabling the prefilter sends every frame to the Face API"""
+        mock_extract.return_value = sampled_frames(np.zeros((240, 320, 3), dtype=np.uint8), 3)
+        mock_detect.return_value = {"success": True, "faces": [], "face_count": 0}
+
+        result = utils_new.analyze_video_with_face_detection(video_file="local.mp4", prefilter_faces=False)
+
+        assert mock_detect.call_count == 3
+        assert result["prefilter"]["api_calls_avoided"] == 0
+
+    def test_prefilter_reuses_upload_sizing_boxes(self, tmp_path):
+        """The cascades run once per frame: the sizing pass also decides the prefilter"""
+        video_path = write_test_video(str(tmp_path / "slides.mp4"), [np.full((240, 320, 3), 200, np.uint8)] * 4)
+
+        with patch('frame_processing.get_local_face_detector', wraps=frame_processing.get_local_face_detector) as detector, \
+             patch('utils_new.has_face_candidates') as decode_and_detect:
+            frames = utils_new.extract_frames_from_video(video_path, max_frames=4, dedup_threshold=None)
+            kept = [frame for frame in frames if utils_new.frame_has_face_candidates(frame)]
+
+        assert [frame.face_candidates for frame in frames] == [0, 0, 0, 0]
+        assert kept == []
+        decode_and_detect.assert_not_called()
+        # Frontal then profile cascade, once per frame
+        assert detector.call_count == 2 * 4
+
+def write_test_video(path: str, frames: list, fps: float = 10.0) -> str:
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return path
+
+def gradient_frame(shift: int, size=(120, 160)) -> np.ndarray:
+    """Frame with a distinctive pattern per shift value"""
+    rng = np.random.default_rng(shift)
+    blocks = rng.integers(0, 255, (6, 8), dtype=np.uint8)
+    gray = cv2.resize(blocks, (size[1], size[0]), interpolation=cv2.INTER_NEAREST)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+class TestFrameDedup:
+
+    def test_identical_frames_have_identical_hashes(self):
+        frame = gradient_frame(1)
+        assert frame_processing.hamming_distance(
+            frame_processing.compute_dhash(frame),
+            frame_processing.compute_dhash(frame.copy())
+        ) == 0
+        assert frame_processing.hamming_distance(
+            frame_processing.compute_dhash(frame),
+            frame_processing.compute_dhash(gradient_frame(2))
+        ) > frame_processing.DEFAULT_DEDUP_THRESHOLD
+
+    def test_duplicate_in_slot_is_replaced_by_neighbour(self):
+        """A duplicate slot centre is swapped for a distinctive candidate in the same slot"""
+        a, b, c = 0b0, 0xFFFF, 0xFFFF0000FFFF
+        # slot 0 -> [a, a, a], slot 1 -> [b, a, a] (centre duplicates a)
+        hashes = [a, a, a, b, a, a]
+
+        assert frame_processing.select_distinctive_frames(hashes, slots=2) == [1, 3]
+        assert frame_processing.select_distinctive_frames([a, a, a, a], slots=2) == [0]
+        assert frame_processing.select_distinctive_frames([a, b, c], slots=3) == [0, 1, 2]
+
+    def test_slots_cover_every_candidate(self):
+        """A candidate count that is not a multiple of the slots still reaches the last candidates"""
+        hashes = [0] * 20 + [(1 << 64) - 1] * 9
+
+        selected = frame_processing.select_distinctive_frames(hashes, slots=10)
+
+        assert len(selected) == 2
+        assert selected[-1] >= 20
+        assert frame_processing.select_distinctive_frames(list(range(29)), slots=10, threshold=-1) == [
+            1, 4, 7, 10, 13, 16, 19, 22, 25, 27
+        ]
+
+    def test_extract_skips_static_stretches(self, tmp_path):
+        """Long static stretches collapse to one frame"""
+        static = [gradient_frame(0)] * 60
+        moving = [gradient_frame(i) for i in range(1, 31)]
+        video_path = write_test_video(str(tmp_path / "talk.mp4"), static + moving)
+
+        deduped = utils_new.extract_frames_from_video(video_path, max_frames=6)
+        uniform = utils_new.extract_frames_from_video(video_path, max_frames=6, dedup_threshold=None)
+
+        assert len(uniform) == 6
+        assert 0 < len(deduped) <= 6
+        hashes = [frame_processing.compute_dhash(frame_processing.decode_frame(f)) for f in deduped]
+        assert all(
+            frame_processing.hamming_distance(hashes[i], hashes[j]) > frame_processing.DEFAULT_DEDUP_THRESHOLD
+            for i in range(len(hashes)) for j in range(i + 1, len(hashes))
+        )
+
+class TestUploadPreprocessing:
+
+    def test_large_frame_without_faces_is_downscaled_to_fallback(self):
+        frame = np.random.default_rng(3).integers(0, 255, (2160, 3840, 3), dtype=np.uint8)
+
+        encoded = frame_processing.encode_frame_for_upload(frame)
+        decoded = frame_processing.decode_frame(encoded)
+
+        assert max(decoded.shape[:2]) == frame_processing.UPLOAD_FALLBACK_MAX_SIDE
+        assert len(encoded) < len(encode_jpeg(frame))
+
+    def test_scale_keeps_smallest_face_at_target(self):
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        faces = np.array([[100, 100, 400, 400], [900, 200, 256, 256]])
+
+        scale = frame_processing.upload_scale_for_frame(frame, faces)
+
+        assert scale == pytest.approx(frame_processing.UPLOAD_TARGET_FACE_PX / 256)
+        # Small faces are never upscaled
+        assert frame_processing.upload_scale_for_frame(frame, np.array([[0, 0, 60, 60]])) == 1.0
+
+    def test_quality_steps_down_to_fit_budget(self):
+        frame = np.random.default_rng(4).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+        generous = frame_processing.encode_frame_for_upload(frame, byte_budget=10 * 1024 * 1024)
+        tight = frame_processing.encode_frame_for_upload(frame, byte_budget=1)
+
+        assert len(tight) < len(generous)
+
+class TestMosaicMode:
+
+    def test_faces_map_back_to_source_frames(self):
+        frames = [np.zeros((720, 1280, 3), dtype=np.uint8), np.zeros((360, 640, 3), dtype=np.uint8),
+                  np.zeros((1080, 1920, 3), dtype=np.uint8)]
+        mosaic, layout = frame_processing.build_mosaic(frames, (2, 2))
+        assert mosaic.shape[0] <= frame_processing.MOSAIC_MAX_SIDE
+
+        # One face per frame, placed in frame coordinates then projected onto the mosaic
+        source_faces = [{"left": 400, "top": 200, "width": 200, "height": 200},
+                        {"left": 10, "top": 20, "width": 100, "height": 100},
+                        {"left": 900, "top": 500, "width": 300, "height": 300}]
+        mosaic_faces = []
+        for rect, tile in zip(source_faces, layout):
+            mosaic_faces.append({
+                "faceRectangle": {key: int(rect[key] * tile["scale"]) + (tile["x"] if key == "left" else tile["y"] if key == "top" else 0)
+                                  for key in rect},
+                "faceAttributes": {"smile": 0.5}
+            })
+
+        per_frame = frame_processing.map_mosaic_faces(mosaic_faces, layout)
+
+        assert [len(faces) for faces in per_frame] == [1, 1, 1]
+        for rect, faces in zip(source_faces, per_frame):
+            mapped = faces[0]["faceRectangle"]
+            assert all(abs(mapped[key] - rect[key]) <= 3 for key in rect)
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    @patch('utils_new.extract_frames_from_video')
+    def test_mosaic_mode_uses_one_call_per_grid(self, mock_extract, mock_detect, mock_sleep):
+        mock_extract.return_value = sampled_frames(np.zeros((240, 320, 3), dtype=np.uint8), 5)
+        mock_detect.return_value = {"success": True, "faces": [], "face_count": 0}
+
+        result = utils_new.analyze_video_with_face_detection(
+            video_file="local.mp4", prefilter_faces=False, mosaic_grid=(2, 2)
+        )
+
+        assert mock_detect.call_count == 2
+        assert result["api_calls_made"] == 2
+        assert len(result["frame_analyses"]) == 5
+
+class TestSceneKeyframes:
+
+    def test_scores_peak_at_cuts(self):
+        scenes = [np.full((18, 32, 3), value, dtype=np.uint8) for value in (20, 20, 200, 200, 90)]
+
+        scores = frame_processing.scene_change_scores(np.stack(scenes))
+
+        assert scores[0] == 1.0
+        assert scores[1] == 0.0 and scores[3] == 0.0
+        assert scores[2] > 0.5 and scores[4] > 0.5
+
+    def test_static_scores_fall_back_to_even_spacing(self):
+        assert frame_processing.select_keyframes(np.zeros(100), 4) == [0, 33, 66, 99]
+        assert frame_processing.select_keyframes(np.zeros(3), 5) == [0, 1, 2]
+
+    def test_extract_keyframes_lands_on_scene_starts(self, tmp_path):
+        scenes = [gradient_frame(1)] * 40 + [gradient_frame(2)] * 40 + [gradient_frame(3)] * 40
+        video_path = write_test_video(str(tmp_path / "cuts.mp4"), scenes)
+
+        frames, info = utils_new.extract_keyframes_from_video(video_path, max_frames=3, scan_budget=60)
+
+        assert len(frames) == 3
+        assert info["frames_scanned"] == 60
+        # Every other frame is scored, but a seek per scan point would decode more than reading through
+        assert info["scan_mode"] == "sequential"
+        assert info["frames_decoded"] == 120 and info["decode_fraction"] == 1.0
+        assert info["frame_indices"] == [0, 40, 80]
+        assert [(frame.frame_index, frame.timestamp) for frame in frames] == [(0, 0.0), (40, 4.0), (80, 8.0)]
+
+    def test_sparse_scan_seeks_past_the_gaps(self, tmp_path):
+        scenes = [gradient_frame(scene) for scene in range(5) for _ in range(120)]
+        video_path = write_test_video(str(tmp_path / "long.mp4"), scenes)
+
+        frames, info = utils_new.extract_keyframes_from_video(video_path, max_frames=5, scan_budget=10)
+
+        assert info["scan_mode"] == "seek"
+        assert info["frames_scanned"] == 10
+        assert info["frames_decoded"] < 600 // 2
+        assert info["decode_fraction"] == round(info["frames_decoded"] / 600, 4)
+        assert info["frame_indices"] == [0, 120, 240, 360, 480]
+        assert [frame.frame_index for frame in frames] == [0, 120, 240, 360, 480]
+
+    @patch('utils_new.time.sleep')
+    @patch('utils_new.detect_faces_in_image')
+    def test_scene_frames_keep_their_real_timestamps(self, mock_detect, mock_sleep, tmp_path):
+        mock_detect.return_value = {"success": True, "face_count": 1, "faces": [{"faceAttributes": {"smile": 0.5}}]}
+        scenes = [gradient_frame(1)] * 15 + [gradient_frame(2)] * 50 + [gradient_frame(3)] * 5
+        video_path = write_test_video(str(tmp_path / "cuts.mp4"), scenes)
+
+        result = utils_new.analyze_video_with_face_detection(video_file=video_path, prefilter_faces=False,
+                                                             frame_selection="scene")
+
+        analyses = result["frame_analyses"]
+        assert {1, 16, 66} <= {analysis["frame_number"] for analysis in analyses}
+        for analysis in analyses:
+            assert analysis["timestamp"] == f"{(analysis['frame_number'] - 1) / 10:.1f}s"
+        # The time-ordered timeline is built on the same real times
+        assert [point["timestamp"] for point in result["insights"]["timeline"]] == sorted(
+            (analysis["frame_number"] - 1) / 10 for analysis in analyses
+        )
+
+if __name__ == "__main__":
+    pytest.main([__file__])
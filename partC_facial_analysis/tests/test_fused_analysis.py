@@ -0,0 +1,115 @@
+import pytest
+import json
+import os
+import sys
+import time
+import subprocess
+from unittest.mock import patch
+
+import azure.functions as func
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import function_app
+import fused_analysis
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARTB_UTILS = os.path.join(os.path.dirname(APP_DIR), "partB_func_coach", "utils.py")
+
+TRANSCRIPT = (
+    "WEBVTT\n\n"
+    "00:00:00.000 --> 00:00:04.000\nWelcome everyone, today we will analyze our strategy.\n\n"
+    "00:00:05.000 --> 00:00:09.000\nUm, this is a great outcome for the team.\n\n"
+    "00:00:10.000 --> 00:00:14.000\nI think we should evaluate the next approach together.\n"
+)
+
+def video_insights():
+    return {
+        "presentation_quality": {"visual_engagement": 72},
+        "visual_sentiment": {"overall_tone": "positive"},
+        "facial_analysis": {"facial_expressions": {"smile_percentage": 40}},
+        "content_analysis": {"transcript": TRANSCRIPT}
+    }
+
+def slow_video_analysis(video_url, video_file):
+    time.sleep(0.4)
+    return video_insights(), "MISS"
+
+def slow_sentiment(coach, plain_text):
+    time.sleep(0.4)
+    return {"overall": "positive", "positive_pct": 0.8, "negative_pct": 0.1}
+
+class TestFusedAnalysis:
+
+    def call(self, body):
+        handler = function_app.analyze_audio_visual.build().get_user_function()
+        return handler(func.HttpRequest(method="POST", url="/api/analyze_audio_visual", body=json.dumps(body).encode()))
+
+    @patch('fused_analysis.transcript_sentiment', side_effect=slow_sentiment)
+    @patch('function_app.run_video_analysis', side_effect=slow_video_analysis)
+    def test_supplied_transcript_runs_alongside_video(self, mock_video, mock_sentiment):
+        response = self.call({"video_url": "https://example.com/talk.mp4", "transcript": TRANSCRIPT})
+
+        assert response.status_code == 200
+        report = json.loads(response.get_body())
+        assert report["transcript"]["source"] == "request"
+        assert report["timings"]["concurrent"] is True
+        # Both halves take 0.4s; run back to back they would need 0.8s
+        assert report["timings"]["wall_sec"] < 0.7
+        assert report["summary"]["speech_sentiment"] == "positive"
+        assert report["summary"]["visual_engagement"] == 72
+
+    @patch.dict(os.environ, {}, clear=True)
+    @patch('function_app.run_video_analysis', return_value=(video_insights(), "HIT"))
+    def test_extracted_transcript_is_reused(self, mock_video):
+        response = self.call({"video_url": "https://example.com/talk.mp4"})
+
+        report = json.loads(response.get_body())
+        assert response.headers["X-Cache"] == "HIT"
+        assert report["transcript"]["source"] == "content_understanding"
+        assert report["transcript"]["speech_metrics"]["basic_metrics"]["word_count"] == 26
+        assert report["transcript"]["sentiment_analysis"] == {"status": "not_configured"}
+        assert report["summary"]["speech_grade"]
+
+    @patch('fused_analysis.analyze_transcript', side_effect=RuntimeError("bad transcript"))
+    @patch('function_app.run_video_analysis', return_value=(video_insights(), "MISS"))
+    def test_transcript_failure_keeps_video_insights(self, mock_video, mock_transcript):
+        response = self.call({"video_url": "https://example.com/talk.mp4"})
+
+        report = json.loads(response.get_body())
+        assert response.status_code == 200
+        assert report["transcript"] == {"available": False, "error": "bad transcript"}
+        assert report["video"]["presentation_quality"]["visual_engagement"] == 72
+
+    def test_plain_text_transcript_gets_estimated_duration(self):
+        result = fused_analysis.analyze_transcript("We will evaluate the strategy together. " * 15, "request")
+        assert result["speech_metrics"]["basic_metrics"]["wpm"] == fused_analysis.PLAIN_TEXT_WPM
+        assert fused_analysis.analyze_transcript("WEBVTT\n\n", "content_understanding")["available"] is False
+
+    def test_video_is_required(self):
+        assert self.call({"transcript": TRANSCRIPT}).status_code == 400
+
+class TestTranscriptCoachPackaging:
+
+    def test_imports_from_the_app_root_alone(self):
+        """The deployed app has no repo root: the transcript half must work without it"""
+        code = (
+            "import json, sys; import fused_analysis; "
+            "result = fused_analysis.analyze_transcript(sys.argv[1], 'request'); "
+            "print(json.dumps([result['available'], 'partB_func_coach' in sys.modules]))"
+        )
+        env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+        output = subprocess.run([sys.executable, "-c", code, TRANSCRIPT], capture_output=True, text=True,
+                                cwd=APP_DIR, env=env, check=True)
+        assert json.loads(output.stdout.strip().splitlines()[-1]) == [True, False]
+
+    @pytest.mark.skipif(not os.path.exists(PARTB_UTILS), reason="partB is not checked out next to this app")
+    def test_copy_matches_partb(self):
+        with open(os.path.join(APP_DIR, "transcript_coach.py")) as f:
+            copy = f.read().split("\n\n", 1)[1]
+        with open(PARTB_UTILS) as f:
+            assert copy == f.read(), "partB_func_coach/utils.py changed: copy it to transcript_coach.py"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
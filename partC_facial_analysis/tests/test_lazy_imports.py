@@ -0,0 +1,66 @@
+import pytest
+import sys
+import os
+import json
+import subprocess
+import threading
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lazy_imports
+from lazy_imports import lazy_import
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def loaded_after_import(module: str):
+    """Heavy modules actually executed after importing module in a fresh interpreter"""
+    code = (
+        f"import json, sys, lazy_imports; import {module}; "
+        "print(json.dumps([m for m in ('numpy', 'cv2') if m in sys.modules "
+        "and not isinstance(sys.modules[m], lazy_imports._LazyModule)]))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=APP_DIR, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+class TestLazyImports:
+
+    def test_function_app_and_utils_new_defer_heavy_modules(self):
+        assert loaded_after_import("function_app") == []
+        assert loaded_after_import("utils_new") == []
+
+    def test_lazy_module_loads_on_first_use(self):
+        sys.modules.pop("colorsys", None)
+        colorsys = lazy_import("colorsys")
+        assert isinstance(colorsys, lazy_imports._LazyModule)
+        assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert not isinstance(colorsys, lazy_imports._LazyModule)
+
+    def test_concurrent_first_use_waits_for_the_load(self, tmp_path, monkeypatch):
+        """Threads touching a module while another thread is loading it see the loaded module"""
+        (tmp_path / "slow_module.py").write_text("import time\ntime.sleep(0.2)\nVALUE = 42\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "slow_module", raising=False)
+        slow_module = lazy_import("slow_module")
+        start = threading.Barrier(8)
+        results, errors = [], []
+
+        def use():
+            start.wait()
+            try:
+                results.append(slow_module.VALUE)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert results == [42] * 8
+
+    def test_missing_module_raises(self):
+        with pytest.raises(ModuleNotFoundError):
+            lazy_import("definitely_not_a_module_name")
@@ -0,0 +1,86 @@
+import pytest
+import json
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import azure.functions as func
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import function_app
+import result_cache
+
+class TestVideoResultCache:
+
+    def test_put_get_and_ttl(self, tmp_path):
+        cache = result_cache.VideoResultCache(str(tmp_path), ttl_seconds=60)
+        cache.put("abc", {"score": 1})
+
+        assert cache.get("abc")["value"] == {"score": 1}
+        assert cache.get("missing") is None
+
+        with patch('result_cache.time.time', return_value=cache.get("abc")["stored_at"] + 61):
+            assert cache.get("abc") is None
+        assert not os.path.exists(tmp_path / "abc.json")
+
+    def test_size_bound_evicts_least_recently_used(self, tmp_path):
+        payload = {"blob": "x" * 1000}
+        cache = result_cache.VideoResultCache(str(tmp_path), max_bytes=2500)
+        cache.put("old", payload)
+        cache.put("mid", payload)
+        os.utime(tmp_path / "old.json", (1, 1))
+        os.utime(tmp_path / "mid.json", (2, 2))
+        # Touching "old" makes "mid" the least recently used entry
+        cache.get("old")
+        cache.put("new", payload)
+
+        assert cache.get("mid") is None
+        assert cache.get("old") is not None
+        assert cache.get("new") is not None
+
+    @patch('result_cache.requests.head')
+    def test_key_uses_validators_and_analyzer_config(self, mock_head):
+        mock_head.return_value = Mock(status_code=200, headers={"ETag": '"v1"'})
+        key_a = result_cache.video_cache_key("https://x/video.mp4", None, {"fields": 1})
+        key_b = result_cache.video_cache_key("https://x/video.mp4", None, {"fields": 2})
+
+        mock_head.return_value = Mock(status_code=200, headers={"ETag": '"v2"'})
+        key_c = result_cache.video_cache_key("https://x/video.mp4", None, {"fields": 1})
+
+        mock_head.return_value = Mock(status_code=200, headers={})
+        assert result_cache.video_cache_key("https://x/video.mp4", None, {"fields": 1}) is None
+        assert len({key_a, key_b, key_c}) == 3
+
+    def test_local_file_keyed_by_content(self, tmp_path):
+        first = tmp_path / "a.mp4"
+        second = tmp_path / "b.mp4"
+        first.write_bytes(b"same bytes")
+        second.write_bytes(b"same bytes")
+
+        assert result_cache.video_cache_key(None, str(first), {}) == result_cache.video_cache_key(None, str(second), {})
+
+    @patch('function_app.utils.generate_presentation_insights')
+    @patch('function_app.utils.analyze_video_with_content_understanding')
+    @patch('function_app.result_cache.video_cache_key', return_value="key123")
+    def test_repeat_request_served_from_cache(self, mock_key, mock_analyze, mock_generate, tmp_path):
+        mock_generate.return_value = {"recommendations": []}
+        cache = result_cache.VideoResultCache(str(tmp_path))
+        request = func.HttpRequest(
+            method="POST",
+            url="/api/analyze_video",
+            body=json.dumps({"video_url": "https://x/video.mp4"}).encode()
+        )
+
+        with patch('function_app.result_cache.get_result_cache', return_value=cache):
+            first = function_app.analyze_video_content.build().get_user_function()(request)
+            second = function_app.analyze_video_content.build().get_user_function()(request)
+
+        assert mock_analyze.call_count == 1
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert json.loads(second.get_body())["cache"]["cached"] is True
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,133 @@
+import pytest
+import json
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import azure.functions as func
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import function_app
+import utils
+from single_flight import SingleFlight, normalize_url
+
+def run_concurrently(fn, count: int) -> list:
+    results = [None] * count
+    def worker(i):
+        results[i] = fn(i)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"value": 42}
+
+        results = run_concurrently(lambda i: flights.do("key", slow), 5)
+
+        assert len(calls) == 1
+        assert all(result == {"value": 42} for result, _ in results)
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+        assert flights.in_flight() == 0
+        # Completed calls are not remembered
+        assert flights.do("key", lambda: "again") == ("again", False)
+
+    def test_followers_get_their_own_copy(self):
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return {"insights": {"recommendations": ["smile more"]}}
+
+        def call(i):
+            if i:
+                # Followers join while the leader's call is still running
+                while not flights.in_flight():
+                    time.sleep(0.01)
+            result, shared = flights.do("key", slow)
+            result["insights"]["recommendations"].append(f"caller {i}")
+            return result, shared
+
+        threading.Timer(0.2, release.set).start()
+        results = run_concurrently(call, 4)
+
+        assert sorted(shared for _, shared in results) == [False, True, True, True]
+        assert [result["insights"]["recommendations"] for result, _ in results] == [
+            ["smile more", f"caller {i}"] for i in range(4)
+        ]
+
+    def test_error_propagates_to_every_waiter(self):
+        flights = SingleFlight()
+
+        def failing():
+            time.sleep(0.1)
+            raise RuntimeError("boom")
+
+        def call(i):
+            try:
+                flights.do("key", failing)
+            except RuntimeError as e:
+                return str(e)
+
+        assert run_concurrently(call, 3) == ["boom"] * 3
+
+    def test_normalize_url(self):
+        assert normalize_url("HTTPS://Blob.Example.com:443/v.mp4?b=2&a=1") == "https://blob.example.com/v.mp4?a=1&b=2"
+        assert normalize_url("http://host:8080/v.mp4#t=0,600") == "http://host:8080/v.mp4"
+
+class TestCoalescedRoutes:
+
+    @patch('function_app.result_cache.video_cache_key', return_value=None)
+    @patch('function_app.utils.generate_presentation_insights', return_value={"recommendations": []})
+    def test_identical_analyses_share_one_job(self, mock_generate, mock_key):
+        def slow_analysis(video_url, video_file):
+            time.sleep(0.3)
+            return {}
+
+        requests_by_url = [
+            "https://Example.com/talk.mp4?sig=1&se=2",
+            "https://example.com/talk.mp4?se=2&sig=1"
+        ]
+        with patch('function_app.utils.analyze_video_with_content_understanding', side_effect=slow_analysis) as mock_analyze:
+            handler = function_app.analyze_video_content.build().get_user_function()
+            responses = run_concurrently(lambda i: handler(func.HttpRequest(
+                method="POST", url="/api/analyze_video",
+                body=json.dumps({"video_url": requests_by_url[i % 2]}).encode()
+            )), 4)
+
+        assert mock_analyze.call_count == 1
+        assert all(response.status_code == 200 for response in responses)
+        assert sum(response.headers.get("X-Coalesced") == "true" for response in responses) == 3
+
+    @patch.dict(os.environ, {"CONTENT_UNDERSTANDING_ENDPOINT": "https://cu.example.com", "CONTENT_UNDERSTANDING_KEY": "k"})
+    def test_terminal_status_is_fetched_once(self):
+        statuses = iter([{"status": "running"}, {"status": "succeeded", "analyzeResult": {}}])
+        session = Mock()
+        session.get.side_effect = lambda *args, **kwargs: Mock(status_code=200, json=Mock(return_value=next(statuses)))
+
+        utils._terminal_statuses.clear()
+        with patch('utils.get_http_session', return_value=session):
+            assert utils.check_analysis_status("job-1")["status"] == "running"
+            assert utils.check_analysis_status("job-1")["status"] == "succeeded"
+            for _ in range(3):
+                assert utils.check_analysis_status("job-1")["status"] == "succeeded"
+
+        assert session.get.call_count == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -122,5 +122,46 @@ class TestVideoAnalysis:
         # Should have fewer, lower-priority recommendations
         assert all(rec["priority"] in ["low", "medium"] for rec in recommendations)
 
+    def test_emotion_timeline_summary(self):
+        """Segment scores, stress, peaks and run-length transitions from one pass"""
+        timeline = [
+            {"timestamp": "0s", "emotion": "confidence", "confidence": 0.9},
+            {"timestamp": "1s", "emotion": "confidence", "confidence": 0.7},
+            {"timestamp": "2s", "emotion": "fear", "confidence": 0.8},
+            {"timestamp": "3s", "emotion": "joy", "confidence": 0.85},
+            {"timestamp": "4s", "emotion": "joy", "confidence": 0.6}
+        ]
+        
+        summary = utils.summarize_emotion_timeline(timeline)
+        
+        assert summary["opening_confidence"] == pytest.approx(0.9)
+        assert summary["mid_presentation_energy"] == pytest.approx((0.7 + 0.85) / 2)
+        assert summary["closing_impact"] == pytest.approx(0.6)
+        assert summary["stress_count"] == 1
+        assert [peak["timestamp"] for peak in summary["engagement_peaks"]] == ["0s", "3s"]
+        assert summary["dominant_emotion"] == "confidence"
+        assert [(t["from"], t["to"], t["timestamp"], t["run_length"]) for t in summary["emotion_transitions"]] == [
+            ("confidence", "fear", "2s", 2),
+            ("fear", "joy", "3s", 1)
+        ]
+        assert summary["variability_score"] == 0.5
+        
+        insights = {
+            "facial_analysis": {"emotion_timeline": timeline},
+            "visual_sentiment": {"confidence_indicators": []},
+            "presentation_quality": {"visual_engagement": 75}
+        }
+        patterns = utils.analyze_emotional_patterns(insights, summary)
+        assert patterns["stress_indicators"] == ["Stress detected at 1 moments"]
+        assert patterns["emotional_arc"] == "inconsistent"
+        assert utils.determine_speaker_archetype(insights, summary) == "confident_professional"
+    
+    def test_empty_emotion_timeline(self):
+        summary = utils.summarize_emotion_timeline([])
+        
+        assert summary["emotion_transitions"] == []
+        assert summary["dominant_emotion"] == "neutral"
+        assert summary["most_stable_emotion"] == ""
+
 if __name__ == "__main__":
     pytest.main([__file__])
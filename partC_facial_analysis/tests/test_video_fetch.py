@@ -0,0 +1,235 @@
+import pytest
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mp4_index
+import utils_new
+from video_fetch import PartialVideoFetch, RangeFetchUnsupported, StreamingVideoDownload
+
+def make_avi(path: str, frame_total: int = 120) -> bytes:
+    """MJPEG AVI - decodable from a partially written file"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (160, 120))
+    for i in range(frame_total):
+        frame = np.full((120, 160, 3), (i * 2) % 255, dtype=np.uint8)
+        cv2.putText(frame, str(i), (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        writer.write(frame)
+    writer.release()
+    with open(path, 'rb') as f:
+        return f.read()
+
+class ThrottledVideoServer:
+    """Local stand-in for blob storage that trickles the body out in slices"""
+
+    def __init__(self, body: bytes, slice_size: int = 16 * 1024, delay: float = 0.01):
+        payload = body
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/video.avi':
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                try:
+                    for offset in range(0, len(payload), slice_size):
+                        self.wfile.write(payload[offset:offset + slice_size])
+                        time.sleep(delay)
+                except ConnectionError:
+                    # Client stopped early once it had every frame it needed
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def make_mp4(path: str, frame_total: int = 400) -> bytes:
+    """mp4v MP4 as written by OpenCV (moov at the end of the file)"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 25, (320, 240))
+    rng = np.random.default_rng(7)
+    for i in range(frame_total):
+        frame = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+        cv2.putText(frame, str(i), (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+    with open(path, 'rb') as f:
+        return f.read()
+
+class RangeVideoServer:
+    """Local stand-in for blob storage with optional HTTP Range support"""
+
+    def __init__(self, body: bytes, supports_range: bool = True, range_error: int = None):
+        payload = body
+        self.bytes_sent = 0
+        server_state = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                range_header = self.headers.get('Range')
+                if range_error and range_header:
+                    self.send_error(range_error)
+                    return
+                if supports_range and range_header:
+                    start, end = range_header.split('=')[1].split('-')
+                    start, end = int(start), min(int(end), len(payload) - 1)
+                    chunk = payload[start:end + 1]
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{len(payload)}')
+                else:
+                    chunk = payload
+                    self.send_response(200)
+                self.send_header('Content-Length', str(len(chunk)))
+                self.end_headers()
+                try:
+                    self.wfile.write(chunk)
+                    server_state.bytes_sent += len(chunk)
+                except ConnectionError:
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/video.mp4"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def video_server(tmp_path):
+    body = make_avi(str(tmp_path / "source.avi"))
+    server = ThrottledVideoServer(body)
+    yield server, str(tmp_path / "source.avi")
+    server.close()
+
+class TestStreamingDownload:
+
+    def test_streaming_extract_matches_local_file(self, video_server):
+        """Decoding the growing file yields the same frames as the finished file"""
+        server, local_path = video_server
+        expected = utils_new.extract_frames_from_video(local_path, max_frames=8, dedup_threshold=None)
+
+        with StreamingVideoDownload(f"{server.url}/video.avi", chunk_size=8 * 1024) as download:
+            frames = utils_new.extract_frames_from_video(
+                download.path, max_frames=8, dedup_threshold=None, download=download
+            )
+            temp_path = download.path
+
+        assert len(frames) == len(expected) == 8
+        assert not os.path.exists(temp_path)
+
+    def test_temp_file_removed_when_download_fails(self, video_server):
+        server, _ = video_server
+
+        with pytest.raises(Exception):
+            with StreamingVideoDownload(f"{server.url}/missing.avi") as download:
+                temp_path = download.path
+                download.wait_until_complete()
+
+        assert not os.path.exists(temp_path)
+
+class TestRangeFetch:
+
+    def test_sample_table_matches_file_layout(self, tmp_path):
+        body = make_mp4(str(tmp_path / "source.mp4"), frame_total=50)
+        moov_start, moov_end = mp4_index.locate_top_level_box(
+            lambda start, length: body[start:start + length], len(body)
+        )
+        table = mp4_index.parse_video_sample_table(body[moov_start + 8:moov_end])
+
+        assert table["sample_count"] == 50
+        assert table["keyframes"][0] == 0
+        assert np.all(table["offsets"][1:] >= table["offsets"][:-1] + table["sizes"][:-1])
+        assert table["offsets"][-1] + table["sizes"][-1] <= moov_start
+
+    def test_seek_decode_count_starts_at_preceding_keyframe(self, tmp_path):
+        table = {"keyframes": np.array([0, 12, 24])}
+        # Frame 30 seeks from 14, so decoding starts at keyframe 12
+        assert mp4_index.seek_decode_count(table, [0, 30]) == 1 + 19
+        assert mp4_index.read_local_sample_table(str(tmp_path / "missing.mp4")) is None
+        make_avi(str(tmp_path / "clip.avi"), frame_total=5)
+        assert mp4_index.read_local_sample_table(str(tmp_path / "clip.avi")) is None
+
+    def test_range_fetch_downloads_fraction_and_matches_full_decode(self, tmp_path):
+        local_path = str(tmp_path / "source.mp4")
+        body = make_mp4(local_path)
+        expected = utils_new.extract_frames_from_video(local_path, max_frames=4, dedup_threshold=None)
+        server = RangeVideoServer(body)
+        try:
+            frames, fetch_info = utils_new.extract_frames_via_range_requests(
+                server.url, max_frames=4, dedup_threshold=None
+            )
+        finally:
+            server.close()
+
+        assert fetch_info["mode"] == "range"
+        assert fetch_info["bytes_downloaded"] < len(body) // 2
+        assert frames == expected
+
+    def test_falls_back_to_full_download_without_range_support(self, tmp_path):
+        local_path = str(tmp_path / "source.mp4")
+        body = make_mp4(local_path, frame_total=60)
+        server = RangeVideoServer(body, supports_range=False)
+        try:
+            with pytest.raises(RangeFetchUnsupported):
+                with PartialVideoFetch(server.url, max_candidates=4):
+                    pass
+            frames, fetch_info = utils_new.extract_frames_via_range_requests(
+                server.url, max_frames=4, dedup_threshold=None
+            )
+        finally:
+            server.close()
+
+        assert fetch_info["mode"] == "full"
+        assert len(frames) == 4
+
+    def test_rejected_range_falls_back_to_full_download(self, tmp_path):
+        body = make_mp4(str(tmp_path / "source.mp4"), frame_total=60)
+        server = RangeVideoServer(body, range_error=416)
+        try:
+            with pytest.raises(RangeFetchUnsupported):
+                with PartialVideoFetch(server.url, max_candidates=4):
+                    pass
+            frames, fetch_info = utils_new.extract_frames_via_range_requests(
+                server.url, max_frames=4, dedup_threshold=None
+            )
+        finally:
+            server.close()
+
+        assert fetch_info["mode"] == "full"
+        assert len(frames) == 4
+
+    @pytest.mark.parametrize("box, replacement", [(b'vide', b'soun'), (b'stsz', b'free'), (b'mdhd', b'free')])
+    def test_unindexable_moov_is_range_unsupported(self, tmp_path, box, replacement):
+        body = make_mp4(str(tmp_path / "source.mp4"), frame_total=30)
+        moov_start = body.rindex(b'moov')
+        # Same-length rename inside the moov: drops the video track or one of its tables
+        body = body[:moov_start] + body[moov_start:].replace(box, replacement, 1)
+        server = RangeVideoServer(body)
+        try:
+            with pytest.raises(RangeFetchUnsupported):
+                with PartialVideoFetch(server.url, max_candidates=4):
+                    pass
+        finally:
+            server.close()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
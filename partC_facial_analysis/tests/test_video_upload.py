@@ -0,0 +1,73 @@
+import pytest
+import os
+import sys
+import tempfile
+from unittest.mock import Mock, patch
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils
+from video_upload import FileUploadStream
+
+@pytest.fixture
+def video_file():
+    handle, path = tempfile.mkstemp(suffix='.mp4')
+    with os.fdopen(handle, 'wb') as f:
+        f.write(bytes(range(256)) * 40)
+    yield path
+    os.remove(path)
+
+class TestFileUploadStream:
+
+    def test_reads_whole_file_in_bounded_chunks(self, video_file):
+        with open(video_file, 'rb') as f:
+            expected = f.read()
+        with FileUploadStream(video_file, chunk_size=4096) as upload:
+            assert upload.memory_mapped
+            assert len(upload) == len(expected)
+            chunks = list(upload)
+            assert upload.read() == b""
+
+        assert b"".join(chunks) == expected
+        assert [len(chunk) for chunk in chunks] == [4096, 4096, 2048]
+
+    def test_read_never_exceeds_chunk_size(self, video_file):
+        with FileUploadStream(video_file, chunk_size=1000) as upload:
+            assert len(upload.read(1 << 30)) == 1000
+            assert len(upload.read(16)) == 16
+            assert len(upload) == 10240 - 1016
+
+    def test_empty_file_falls_back_to_plain_reads(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            with FileUploadStream(path) as upload:
+                assert not upload.memory_mapped
+                assert list(upload) == []
+        finally:
+            os.remove(path)
+
+class TestLocalFileAnalysis:
+
+    @patch.dict(os.environ, {"CONTENT_UNDERSTANDING_ENDPOINT": "https://cu.example.com", "CONTENT_UNDERSTANDING_KEY": "k"})
+    @patch('utils.ensure_video_analyzer', return_value="presentation-video-test")
+    def test_file_is_posted_as_streamed_octet_stream(self, mock_analyzer, video_file):
+        session = Mock()
+        session.post.return_value = Mock(status_code=200, headers={}, json=Mock(return_value={"documents": []}))
+
+        with patch('utils.get_http_session', return_value=session):
+            assert utils.analyze_video_with_content_understanding(video_file=video_file) == {"documents": []}
+
+        kwargs = session.post.call_args.kwargs
+        assert kwargs["headers"]["Content-Type"] == "application/octet-stream"
+        assert isinstance(kwargs["data"], FileUploadStream)
+        assert "json" not in kwargs
+
+    @patch.dict(os.environ, {"CONTENT_UNDERSTANDING_ENDPOINT": "https://cu.example.com", "CONTENT_UNDERSTANDING_KEY": "k"})
+    def test_missing_file_is_rejected(self):
+        with pytest.raises(ValueError):
+            utils.analyze_video_with_content_understanding(video_file="/no/such/video.mp4")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -2,9 +2,77 @@ import os
 import json
 import logging
 import time
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 import requests
-from azure.core.credentials import AzureKeyCredential
+from result_cache import config_fingerprint
+from single_flight import SingleFlight, normalize_url
+from video_upload import FileUploadStream
+
+# Analyzer configuration for facial analysis
+VIDEO_ANALYZER_CONFIG = {
+    "kind": "CustomDocumentAnalyzer",
+    "apiVersion": "2024-07-31-preview",
+    "enableFace": True,  # Enable face grouping and identification
+    "disableFaceBlurring": True,  # Enable face description
+    "segmentationMode": "auto",  # Automatic segmentation
+    "fieldSchema": {
+        "description": "Extract facial expressions and emotional cues for presentation feedback",
+        "fields": {
+            "emotionDescription": {
+                "type": "string",
+                "method": "generate",
+                "description": "Description of the emotional state and facial expressions of the presenter"
+            },
+            "confidenceLevel": {
+                "type": "string", 
+                "method": "classify",
+                "description": "Overall confidence level of the presenter",
+                "enum": ["Low", "Medium", "High"]
+            },
+            "engagementScore": {
+                "type": "string",
+                "method": "generate", 
+                "description": "Assessment of visual engagement through facial expressions and body language"
+            },
+            "presentationQuality": {
+                "type": "string",
+                "method": "generate",
+                "description": "Overall assessment of presentation delivery based on visual cues"
+            }
+        }
+    },
+    "returnDetails": True
+}
+
+CONTENT_UNDERSTANDING_API_VERSION = "2024-07-31-preview"
+
+# Registered analyzers are named after a hash of their schema, so a changed schema gets a new
+# analyzer and an existing one with the same name is known to match
+VIDEO_ANALYZER_PREFIX = "presentation-video"
+ANALYZER_READY_TIMEOUT = 60
+ANALYZER_POLL_INTERVAL = 1
+
+_registered_analyzers = set()
+_analyzer_lock = threading.Lock()
+
+# Finished jobs never change, so their statuses are served from memory (least recently used evicted first)
+TERMINAL_JOB_STATUSES = ('succeeded', 'failed', 'canceled')
+TERMINAL_STATUS_CACHE_SIZE = 64
+
+_terminal_statuses = OrderedDict()
+_status_lock = threading.Lock()
+_status_flights = SingleFlight()
+
+_http_session: Optional[requests.Session] = None
+
+def get_http_session() -> requests.Session:
+    """Process-wide session so Content Understanding calls reuse pooled keep-alive connections"""
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    return _http_session
 
 def get_content_understanding_client():
     """Initialize Azure Content Understanding client"""
@@ -13,74 +81,107 @@ def get_content_understanding_client():
     return {
         "endpoint": endpoint,
         "key": key,
+        "session": get_http_session(),
         "headers": {
             "Ocp-Apim-Subscription-Key": key,
             "Content-Type": "application/json"
         }
     }
 
+def video_analyzer_id(analyzer_config: Dict[str, Any] = VIDEO_ANALYZER_CONFIG) -> str:
+    """Analyzer id derived from the schema hash"""
+    return f"{VIDEO_ANALYZER_PREFIX}-{config_fingerprint(analyzer_config)[:16]}"
+
+def _wait_for_analyzer(client_config: Dict[str, Any], operation_location: str):
+    """Poll an analyzer creation operation until the analyzer is ready"""
+    deadline = time.time() + ANALYZER_READY_TIMEOUT
+    while time.time() < deadline:
+        response = client_config['session'].get(
+            operation_location,
+            headers={"Ocp-Apim-Subscription-Key": client_config['key']}
+        )
+        if response.status_code != 200:
+            raise Exception(f"Failed to check analyzer creation: {response.status_code} - {response.text}")
+        status = response.json().get('status', '').lower()
+        if status in ('succeeded', 'ready'):
+            return
+        if status == 'failed':
+            raise Exception(f"Analyzer creation failed: {response.text}")
+        time.sleep(ANALYZER_POLL_INTERVAL)
+    raise Exception(f"Analyzer was not ready after {ANALYZER_READY_TIMEOUT} seconds")
+
+def ensure_video_analyzer(client_config: Dict[str, Any]) -> str:
+    """
+    Register VIDEO_ANALYZER_CONFIG once and return its analyzer id
+    Looks the analyzer up first and only creates it when missing; a 409 means another
+    instance created it concurrently. The id is cached per endpoint for the process.
+    """
+    analyzer_id = video_analyzer_id()
+    registration = (client_config['endpoint'], analyzer_id)
+    if registration in _registered_analyzers:
+        return analyzer_id
+
+    with _analyzer_lock:
+        if registration in _registered_analyzers:
+            return analyzer_id
+
+        analyzer_url = f"{client_config['endpoint']}/documentintelligence/documentAnalyzers/{analyzer_id}"
+        params = {"api-version": CONTENT_UNDERSTANDING_API_VERSION}
+        response = client_config['session'].get(
+            analyzer_url,
+            headers={"Ocp-Apim-Subscription-Key": client_config['key']},
+            params=params
+        )
+        if response.status_code == 404:
+            logging.info(f"Registering Content Understanding analyzer {analyzer_id}")
+            response = client_config['session'].put(
+                analyzer_url,
+                headers=client_config['headers'],
+                json=VIDEO_ANALYZER_CONFIG,
+                params=params
+            )
+            if response.status_code not in (200, 201, 202, 409):
+                raise Exception(f"Failed to register analyzer: {response.status_code} - {response.text}")
+            operation_location = response.headers.get('Operation-Location')
+            if response.status_code != 409 and operation_location:
+                _wait_for_analyzer(client_config, operation_location)
+        elif response.status_code != 200:
+            raise Exception(f"Failed to look up analyzer: {response.status_code} - {response.text}")
+
+        _registered_analyzers.add(registration)
+    return analyzer_id
+
 def analyze_video_with_content_understanding(video_url: Optional[str] = None, video_file: Optional[str] = None) -> Dict[str, Any]:
     """
     Analyze video using Azure Content Understanding API
     Returns insights about facial expressions, emotions, and visual content
     """
     client_config = get_content_understanding_client()
+    if not video_url and not (video_file and os.path.isfile(video_file)):
+        raise ValueError(f"Video file not found: {video_file}")
     
-    # Create analyzer configuration for facial analysis
-    analyzer_config = {
-        "kind": "CustomDocumentAnalyzer",
-        "apiVersion": "2024-07-31-preview",
-        "enableFace": True,  # Enable face grouping and identification
-        "disableFaceBlurring": True,  # Enable face description
-        "segmentationMode": "auto",  # Automatic segmentation
-        "fieldSchema": {
-            "description": "Extract facial expressions and emotional cues for presentation feedback",
-            "fields": {
-                "emotionDescription": {
-                    "type": "string",
-                    "method": "generate",
-                    "description": "Description of the emotional state and facial expressions of the presenter"
-                },
-                "confidenceLevel": {
-                    "type": "string", 
-                    "method": "classify",
-                    "description": "Overall confidence level of the presenter",
-                    "enum": ["Low", "Medium", "High"]
-                },
-                "engagementScore": {
-                    "type": "string",
-                    "method": "generate", 
-                    "description": "Assessment of visual engagement through facial expressions and body language"
-                },
-                "presentationQuality": {
-                    "type": "string",
-                    "method": "generate",
-                    "description": "Overall assessment of presentation delivery based on visual cues"
-                }
-            }
-        },
-        "returnDetails": True
-    }
+    # Submit by reference to the registered analyzer instead of sending the schema each time
+    analyzer_id = ensure_video_analyzer(client_config)
+    submit_url = f"{client_config['endpoint']}/documentintelligence/documentAnalyzers/{analyzer_id}:analyze"
+    params = {"api-version": CONTENT_UNDERSTANDING_API_VERSION}
     
-    # Prepare the request payload
     if video_url:
-        payload = {
-            "urlSource": video_url,
-            "base64Source": None,
-            "analyzer": analyzer_config
-        }
+        response = client_config['session'].post(
+            submit_url,
+            headers=client_config['headers'],
+            json={"urlSource": video_url},
+            params=params
+        )
     else:
-        raise NotImplementedError("File upload not implemented yet - use video URL")
-    
-    # Submit analysis job to Content Understanding
-    submit_url = f"{client_config['endpoint']}/documentintelligence/documentAnalyzers/prebuilt-videoAnalyzer:analyze"
-    
-    response = requests.post(
-        submit_url,
-        headers=client_config['headers'],
-        json=payload,
-        params={"api-version": "2024-07-31-preview"}
-    )
+        # Local files go up as a raw body streamed in fixed-size chunks, never read whole into memory
+        # (base64Source would hold the entire video plus a third again)
+        with FileUploadStream(video_file) as upload:
+            response = client_config['session'].post(
+                submit_url,
+                headers={**client_config['headers'], "Content-Type": "application/octet-stream"},
+                data=upload,
+                params=params
+            )
     
     if response.status_code not in [200, 202]:
         raise Exception(f"Failed to submit analysis: {response.status_code} - {response.text}")
@@ -100,7 +201,7 @@ def analyze_video_with_content_understanding(video_url: Optional[str] = None, vi
     start_time = time.time()
     
     while time.time() - start_time < max_wait_time:
-        status_response = requests.get(
+        status_response = client_config['session'].get(
             operation_location,
             headers={"Ocp-Apim-Subscription-Key": client_config['key']}
         )
@@ -131,18 +232,51 @@ def check_analysis_status(job_id: str) -> Dict[str, Any]:
     if job_id.startswith('http'):
         status_url = job_id
     else:
-        status_url = f"{client_config['endpoint']}/documentintelligence/documentAnalyzers/prebuilt-videoAnalyzer/analyzeResults/{job_id}"
-    
-    response = requests.get(
-        status_url,
-        headers={"Ocp-Apim-Subscription-Key": client_config['key']},
-        params={"api-version": "2024-07-31-preview"}
-    )
-    
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise Exception(f"Failed to get status: {response.status_code} - {response.text}")
+        status_url = f"{client_config['endpoint']}/documentintelligence/documentAnalyzers/{video_analyzer_id()}/analyzeResults/{job_id}"
+    
+    # Terminal statuses come from memory; concurrent polls of a running job share one request
+    status_key = normalize_url(status_url)
+    with _status_lock:
+        if status_key in _terminal_statuses:
+            _terminal_statuses.move_to_end(status_key)
+            return _terminal_statuses[status_key]
+    
+    def fetch_status() -> Dict[str, Any]:
+        response = client_config['session'].get(
+            status_url,
+            headers={"Ocp-Apim-Subscription-Key": client_config['key']},
+            params={"api-version": CONTENT_UNDERSTANDING_API_VERSION}
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get status: {response.status_code} - {response.text}")
+        status = response.json()
+        if str(status.get('status', '')).lower() in TERMINAL_JOB_STATUSES:
+            with _status_lock:
+                _terminal_statuses[status_key] = status
+                while len(_terminal_statuses) > TERMINAL_STATUS_CACHE_SIZE:
+                    _terminal_statuses.popitem(last=False)
+        return status
+    
+    status, _ = _status_flights.do(status_key, fetch_status)
+    return status
+
+def warmup() -> Dict[str, Any]:
+    """
+    Pay one-off costs before the first request: NumPy import, the HTTP session and,
+    when configured, the connection to Content Understanding and analyzer registration
+    """
+    import numpy  # loaded now so the first insights request does not pay for it
+
+    get_http_session()
+    if not (os.environ.get("CONTENT_UNDERSTANDING_ENDPOINT") and os.environ.get("CONTENT_UNDERSTANDING_KEY")):
+        return {"content_understanding": "not_configured"}
+    try:
+        analyzer_id = ensure_video_analyzer(get_content_understanding_client())
+    except Exception as e:
+        logging.warning(f"Warmup could not register the Content Understanding analyzer: {e}")
+        return {"content_understanding": "unreachable"}
+    return {"content_understanding": "ready", "analyzer_id": analyzer_id}
 
 def generate_presentation_insights(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -252,7 +386,7 @@ def generate_presentation_insights(analysis_result: Dict[str, Any]) -> Dict[str,
     # Face data processing
     if 'faceGroupings' in content_extraction:
         face_data = content_extraction['faceGroupings']
-        insights['facial_analysis'] = process_face_groupings(face_data)
+        insights['facial_analysis'].update(process_face_groupings(face_data))
     
     # Transcript processing
     if 'transcript' in content_extraction:
@@ -262,14 +396,32 @@ def generate_presentation_insights(analysis_result: Dict[str, Any]) -> Dict[str,
     if 'keyFrames' in content_extraction:
         insights['content_analysis']['key_moments'] = process_key_frames(content_extraction['keyFrames'])
     
+    if 'emotionTimeline' in content_extraction:
+        insights['facial_analysis']['emotion_timeline'] = content_extraction['emotionTimeline']
+    
+    # Time-join emotions and key frames to what was being said
+    insights['content_analysis']['emotional_content_mapping'] = map_emotions_to_transcript(
+        insights['content_analysis']['transcript'],
+        insights['facial_analysis']['emotion_timeline'],
+        insights['content_analysis']['key_moments']
+    )
+    
     # Generate overall sentiment
     insights['visual_sentiment']['overall_tone'] = determine_overall_sentiment(insights)
     
+    # Summarize the emotion timeline once; patterns, archetype and coaching all read from it
+    timeline_summary = summarize_emotion_timeline(insights['facial_analysis']['emotion_timeline'])
+    insights['facial_analysis']['emotion_consistency'].update({
+        "variability_score": timeline_summary['variability_score'],
+        "most_stable_emotion": timeline_summary['most_stable_emotion'],
+        "emotion_transitions": timeline_summary['emotion_transitions']
+    })
+    
     # ENHANCED: Analyze emotional patterns for deeper insights
-    insights['visual_sentiment']['emotional_patterns'] = analyze_emotional_patterns(insights)
+    insights['visual_sentiment']['emotional_patterns'] = analyze_emotional_patterns(insights, timeline_summary)
     
     # ENHANCED: Determine speaker archetype for personalized coaching
-    insights['coaching_insights']['speaker_archetype'] = determine_speaker_archetype(insights)
+    insights['coaching_insights']['speaker_archetype'] = determine_speaker_archetype(insights, timeline_summary)
     
     # ENHANCED: Generate comprehensive coaching insights
     comprehensive_coaching = generate_comprehensive_coaching_insights(insights)
@@ -612,11 +764,185 @@ def generate_comprehensive_coaching_insights(insights: Dict[str, Any]) -> Dict[s
     
     return coaching_data
 
-def analyze_emotional_patterns(insights: Dict[str, Any]) -> Dict[str, Any]:
+# Emotion groups used for timeline segment scores
+OPENING_EMOTIONS = ('confidence', 'joy', 'neutral')
+ENERGY_EMOTIONS = ('joy', 'confidence', 'surprise')
+IMPACT_EMOTIONS = ('confidence', 'joy')
+STRESS_EMOTIONS = ('fear', 'sadness', 'anger')
+PEAK_EMOTIONS = ('joy', 'confidence')
+
+# Emotion-to-transcript join: a cue is a high energy topic when at least half its samples show an
+# energy emotion with this mean confidence; a cue with samples but none of them energetic is low engagement
+HIGH_ENERGY_CONFIDENCE = 0.7
+MAPPING_MAX_ITEMS = 10
+SECTION_TEXT_CHARS = 200
+
+def map_emotions_to_transcript(transcript: str, emotion_timeline: list, key_moments: Optional[list] = None) -> Dict[str, Any]:
+    """
+    Join emotion samples and key frames to the transcript cue being spoken at the time
+    Every sample is matched with one vectorized binary search over a sorted cue index, then
+    per-cue counts are aggregated with bincount, so thousands of cues and samples stay cheap.
+    Key moments gain a "spoken_text" field. Each list keeps the MAPPING_MAX_ITEMS strongest
+    entries in time order.
+    """
+    mapping = {"high_energy_topics": [], "low_engagement_sections": [], "emotional_relevance": []}
+    if not transcript:
+        return mapping
+    
+    # Imported here so status polls and cached responses never load NumPy
+    import numpy as np
+    from cue_index import CueIndex, timestamp_seconds
+    
+    index = CueIndex.from_vtt(transcript)
+    if not len(index):
+        return mapping
+    
+    if key_moments:
+        positions = index.lookup_many([timestamp_seconds(moment.get('timestamp', '')) for moment in key_moments])
+        for moment, position in zip(key_moments, positions):
+            if position >= 0:
+                moment['spoken_text'] = index.cues[position]['text']
+    
+    total = len(emotion_timeline)
+    if not total:
+        return mapping
+    
+    labels = {}
+    codes = np.fromiter((labels.setdefault(moment.get('emotion') or 'neutral', len(labels)) for moment in emotion_timeline),
+                        dtype=np.int64, count=total)
+    confidence = np.fromiter((moment.get('confidence', 0) or 0 for moment in emotion_timeline), dtype=np.float64, count=total)
+    times = np.fromiter((timestamp_seconds(moment.get('timestamp', '')) for moment in emotion_timeline), dtype=np.float64, count=total)
+    
+    positions = index.lookup_many(times)
+    matched = positions >= 0
+    positions, codes, confidence = positions[matched], codes[matched], confidence[matched]
+    names = list(labels)
+    cue_count = len(index)
+    
+    counts = np.bincount(positions * len(names) + codes, minlength=cue_count * len(names)).reshape(cue_count, len(names))
+    samples = counts.sum(axis=1)
+    energetic = np.isin(codes, [labels[e] for e in ENERGY_EMOTIONS if e in labels])
+    energy_samples = np.bincount(positions[energetic], minlength=cue_count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        intensity = np.bincount(positions, weights=confidence, minlength=cue_count) / samples
+        energy_intensity = np.bincount(positions[energetic], weights=confidence[energetic], minlength=cue_count) / energy_samples
+    dominant = counts.argmax(axis=1)
+    
+    def cue_entry(position: int) -> Dict[str, Any]:
+        cue = index.cues[position]
+        return {
+            "start_sec": round(cue['start'], 3),
+            "end_sec": round(cue['end'], 3),
+            "text": cue['text'],
+            "dominant_emotion": names[dominant[position]],
+            "intensity": round(float(intensity[position]), 3),
+            "samples": int(samples[position])
+        }
+    
+    def strongest(candidates: np.ndarray, score: np.ndarray) -> np.ndarray:
+        top = candidates[np.argsort(-score[candidates], kind='stable')[:MAPPING_MAX_ITEMS]]
+        return np.sort(top)
+    
+    spoken = np.flatnonzero(samples)
+    mapping['emotional_relevance'] = [cue_entry(i) for i in strongest(spoken, intensity)]
+    
+    lively = spoken[(energy_samples[spoken] * 2 >= samples[spoken]) & (energy_intensity[spoken] >= HIGH_ENERGY_CONFIDENCE)]
+    mapping['high_energy_topics'] = [
+        {**cue_entry(i), "energy_intensity": round(float(energy_intensity[i]), 3)} for i in strongest(lively, energy_intensity)
+    ]
+    
+    # Neighbouring flat cues form one section
+    flat = spoken[energy_samples[spoken] == 0]
+    runs = np.split(flat, np.flatnonzero(np.diff(flat) != 1) + 1) if flat.size else []
+    sections = [
+        {
+            "start_sec": round(index.cues[run[0]]['start'], 3),
+            "end_sec": round(index.cues[run[-1]]['end'], 3),
+            "text": " ".join(index.cues[i]['text'] for i in run)[:SECTION_TEXT_CHARS],
+            "cues": int(run.size),
+            "dominant_emotion": names[int(counts[run].sum(axis=0).argmax())]
+        }
+        for run in runs
+    ]
+    sections.sort(key=lambda section: section['start_sec'] - section['end_sec'])
+    mapping['low_engagement_sections'] = sorted(sections[:MAPPING_MAX_ITEMS], key=lambda section: section['start_sec'])
+    return mapping
+
+def summarize_emotion_timeline(emotion_timeline: list) -> Dict[str, Any]:
+    """
+    Convert the emotion timeline once into code/confidence arrays and derive every figure from them
+    Segment averages, stress counts, engagement peaks, emotion counts and run-length-encoded
+    transitions all come from this single pass.
+    """
+    # Imported here so status polls and cached responses never load NumPy
+    import numpy as np
+
+    total = len(emotion_timeline)
+    labels = {}
+    codes = np.fromiter(
+        (labels.setdefault(moment.get('emotion'), len(labels)) for moment in emotion_timeline),
+        dtype=np.int64, count=total
+    )
+    confidence = np.fromiter((moment.get('confidence', 0) or 0 for moment in emotion_timeline),
+                             dtype=np.float64, count=total)
+    names = list(labels)
+    
+    def in_group(group) -> np.ndarray:
+        return np.isin(codes, [labels[e] for e in group if e in labels])
+    
+    def segment_mean(mask: np.ndarray, start: int, end: int) -> float:
+        selected = confidence[start:end][mask[start:end]]
+        return float(selected.mean()) if selected.size else 0
+    
+    opening_end = max(1, total // 5)
+    closing_start = total * 4 // 5
+    stress_mask = in_group(STRESS_EMOTIONS) & (confidence > 0.6)
+    peak_positions = np.flatnonzero(in_group(PEAK_EMOTIONS) & (confidence > 0.8))
+    
+    # Missing emotions count as neutral when picking the dominant one (first seen wins ties)
+    emotion_counts = {}
+    for name, count in zip(names, np.bincount(codes, minlength=len(names))):
+        key = name if name is not None else 'neutral'
+        emotion_counts[key] = emotion_counts.get(key, 0) + int(count)
+    
+    # Run-length encoding: a run starts wherever the emotion code changes
+    run_starts = np.flatnonzero(np.diff(codes, prepend=-1)) if total else np.empty(0, dtype=np.int64)
+    run_lengths = np.diff(np.append(run_starts, total))
+    transitions = [
+        {
+            "from": names[codes[previous]],
+            "to": names[codes[start]],
+            "timestamp": emotion_timeline[start].get('timestamp', f"moment_{start}"),
+            "run_length": int(length)
+        }
+        for previous, start, length in zip(run_starts[:-1], run_starts[1:], run_lengths[:-1])
+    ]
+    
+    return {
+        "total": total,
+        "opening_confidence": segment_mean(in_group(OPENING_EMOTIONS), 0, opening_end),
+        "mid_presentation_energy": segment_mean(in_group(ENERGY_EMOTIONS), total // 5, closing_start),
+        "closing_impact": segment_mean(in_group(IMPACT_EMOTIONS), closing_start, total),
+        "stress_count": int(stress_mask.sum()),
+        "engagement_peaks": [
+            {
+                "timestamp": emotion_timeline[i].get('timestamp', f"moment_{i}"),
+                "emotion": names[codes[i]],
+                "confidence": emotion_timeline[i].get('confidence')
+            }
+            for i in peak_positions[:5]
+        ],
+        "emotion_counts": emotion_counts,
+        "dominant_emotion": max(emotion_counts, key=emotion_counts.get) if emotion_counts else 'neutral',
+        "emotion_transitions": transitions,
+        "variability_score": round(len(transitions) / (total - 1), 3) if total > 1 else 0,
+        "most_stable_emotion": (names[codes[run_starts[np.argmax(run_lengths)]]] or "") if total else ""
+    }
+
+def analyze_emotional_patterns(insights: Dict[str, Any], timeline_summary: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Analyze emotional patterns throughout the presentation for deeper insights"""
     
     emotion_timeline = insights['facial_analysis']['emotion_timeline']
-    segments = insights['visual_sentiment']['segments']
     
     patterns = {
         "opening_confidence": 0,
@@ -630,69 +956,19 @@ def analyze_emotional_patterns(insights: Dict[str, Any]) -> Dict[str, Any]:
     if not emotion_timeline:
         return patterns
     
-    # Analyze opening (first 20% of presentation)
-    total_duration = len(emotion_timeline)
-    opening_segment = emotion_timeline[:max(1, total_duration // 5)]
-    
-    if opening_segment:
-        confidence_emotions = ['confidence', 'joy', 'neutral']
-        opening_confidence_scores = []
-        
-        for moment in opening_segment:
-            if moment.get('emotion') in confidence_emotions:
-                opening_confidence_scores.append(moment.get('confidence', 0))
-        
-        patterns['opening_confidence'] = sum(opening_confidence_scores) / len(opening_confidence_scores) if opening_confidence_scores else 0
-    
-    # Analyze middle section (middle 60%)
-    start_mid = total_duration // 5
-    end_mid = total_duration * 4 // 5
-    mid_segment = emotion_timeline[start_mid:end_mid]
-    
-    if mid_segment:
-        energy_emotions = ['joy', 'confidence', 'surprise']
-        energy_scores = []
-        
-        for moment in mid_segment:
-            if moment.get('emotion') in energy_emotions:
-                energy_scores.append(moment.get('confidence', 0))
-        
-        patterns['mid_presentation_energy'] = sum(energy_scores) / len(energy_scores) if energy_scores else 0
-    
-    # Analyze closing (last 20%)
-    closing_segment = emotion_timeline[max(0, total_duration * 4 // 5):]
-    
-    if closing_segment:
-        impact_emotions = ['confidence', 'joy']
-        closing_scores = []
-        
-        for moment in closing_segment:
-            if moment.get('emotion') in impact_emotions:
-                closing_scores.append(moment.get('confidence', 0))
-        
-        patterns['closing_impact'] = sum(closing_scores) / len(closing_scores) if closing_scores else 0
+    summary = timeline_summary or summarize_emotion_timeline(emotion_timeline)
+    patterns['opening_confidence'] = summary['opening_confidence']
+    patterns['mid_presentation_energy'] = summary['mid_presentation_energy']
+    patterns['closing_impact'] = summary['closing_impact']
+    patterns['engagement_peaks'] = summary['engagement_peaks']
     
     # Detect stress indicators
-    stress_emotions = ['fear', 'sadness', 'anger']
-    stress_moments = [moment for moment in emotion_timeline if moment.get('emotion') in stress_emotions and moment.get('confidence', 0) > 0.6]
-    
-    if len(stress_moments) > total_duration * 0.2:  # More than 20% stress moments
+    stress_count = summary['stress_count']
+    if stress_count > summary['total'] * 0.2:  # More than 20% stress moments
         patterns['stress_indicators'].append("High stress levels detected")
     
-    if len(stress_moments) > 0:
-        patterns['stress_indicators'].append(f"Stress detected at {len(stress_moments)} moments")
-    
-    # Find engagement peaks (high confidence + positive emotions)
-    engagement_peaks = []
-    for i, moment in enumerate(emotion_timeline):
-        if moment.get('emotion') in ['joy', 'confidence'] and moment.get('confidence', 0) > 0.8:
-            engagement_peaks.append({
-                "timestamp": moment.get('timestamp', f"moment_{i}"),
-                "emotion": moment.get('emotion"),
-                "confidence": moment.get('confidence')
-            })
-    
-    patterns['engagement_peaks'] = engagement_peaks[:5]  # Top 5 peaks
+    if stress_count > 0:
+        patterns['stress_indicators'].append(f"Stress detected at {stress_count} moments")
     
     # Determine emotional arc
     opening_score = patterns['opening_confidence']
@@ -712,7 +988,7 @@ def analyze_emotional_patterns(insights: Dict[str, Any]) -> Dict[str, Any]:
     
     return patterns
 
-def determine_speaker_archetype(insights: Dict[str, Any]) -> str:
+def determine_speaker_archetype(insights: Dict[str, Any], timeline_summary: Optional[Dict[str, Any]] = None) -> str:
     """Determine the speaker's presentation archetype for personalized coaching"""
     
     engagement_score = insights['presentation_quality']['visual_engagement']
@@ -720,12 +996,8 @@ def determine_speaker_archetype(insights: Dict[str, Any]) -> str:
     confidence_indicators = insights['visual_sentiment']['confidence_indicators']
     
     # Analyze dominant emotions
-    emotion_counts = {}
-    for moment in emotion_timeline:
-        emotion = moment.get('emotion', 'neutral')
-        emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-    
-    dominant_emotion = max(emotion_counts, key=emotion_counts.get) if emotion_counts else 'neutral'
+    summary = timeline_summary or summarize_emotion_timeline(emotion_timeline)
+    dominant_emotion = summary['dominant_emotion']
     
     # Determine archetype based on patterns
     if dominant_emotion in ['joy', 'confidence'] and engagement_score > 80:
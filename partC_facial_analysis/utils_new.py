@@ -1,13 +1,58 @@
+from __future__ import annotations
+
 import os
 import json
 import logging
 import time
-import cv2
 import tempfile
 import requests
-from typing import Dict, Any, Optional, List
-import numpy as np
+from contextlib import closing, nullcontext
+from typing import Dict, Any, Callable, Iterator, Optional, List, Sequence, Tuple
 from urllib.parse import urlparse
+from lazy_imports import lazy_import
+from frame_processing import (
+    DEFAULT_DEDUP_THRESHOLD,
+    KEYFRAME_SCAN_BUDGET,
+    MOSAIC_JPEG_QUALITY,
+    build_mosaic,
+    compute_dhash,
+    UPLOAD_SIZING_MAX_WIDTH,
+    decode_frame,
+    encode_frame_for_upload,
+    has_face_candidates,
+    local_face_boxes,
+    map_mosaic_faces,
+    scene_change_scores,
+    select_distinctive_frames,
+    select_keyframes,
+    thumbnail,
+    upload_scale_for_frame
+)
+from face_columns import FaceAttributeAccumulator, FaceAttributeColumns
+from face_tracking import (
+    TRACK_FPS,
+    TRACK_KEYFRAME_INTERVAL,
+    TRACK_MAX_DETECTIONS,
+    TRACK_WINDOW_SEC,
+    TRACK_WINDOWS,
+    FaceTracker,
+    tracking_windows
+)
+from frame_pipeline import PIPELINE_QUEUE_SIZE, SKIP, run_pipeline
+from mp4_index import read_local_sample_table, seek_decode_count
+from video_fetch import (
+    DOWNLOAD_CHUNK_SIZE,
+    MIN_DECODE_BYTES,
+    PartialVideoFetch,
+    RangeFetchUnsupported,
+    StreamingVideoDownload
+)
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# Receives partial insights (see partial_video_insights) while frames are still being analyzed
+ProgressCallback = Callable[[Dict[str, Any]], None]
 
 def get_azure_ai_client():
     """Initialize Azure AI Services client"""
@@ -71,8 +116,70 @@ def detect_faces_in_image(image_data: bytes) -> Dict[str, Any]:
             "face_count": 0
         }
 
+def detect_faces_in_mosaic(frame_datas: List[bytes], grid: Tuple[int, int]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Detect faces in several frames with a single Face API call
+    Frames are tiled into one mosaic image and detections are mapped back to each frame.
+    Returns per-frame results shaped like detect_faces_in_image and the bytes uploaded.
+    """
+    images = [decode_frame(frame_data) for frame_data in frame_datas]
+    mosaic, layout = build_mosaic(images, grid)
+    success, buffer = cv2.imencode('.jpg', mosaic, [cv2.IMWRITE_JPEG_QUALITY, MOSAIC_JPEG_QUALITY])
+    if not success:
+        raise Exception("Failed to encode mosaic image")
+    mosaic_bytes = buffer.tobytes()
+    
+    result = detect_faces_in_image(mosaic_bytes)
+    if not result["success"]:
+        return [dict(result) for _ in frame_datas], len(mosaic_bytes)
+    
+    return [
+        {"success": True, "faces": faces, "face_count": len(faces)}
+        for faces in map_mosaic_faces(result["faces"], layout)
+    ], len(mosaic_bytes)
+
+def detect_faces_in_frame(frame: np.ndarray) -> Dict[str, Any]:
+    """Face API detection on a decoded frame, with rectangles and landmarks in the frame's own pixels"""
+    scale = upload_scale_for_frame(frame)
+    result = detect_faces_in_image(encode_frame_for_upload(frame, scale=scale))
+    if result["success"] and scale < 1.0:
+        height, width = frame.shape[:2]
+        # The upload is a single mosaic tile at the origin
+        result["faces"] = map_mosaic_faces(result["faces"], [{"x": 0, "y": 0, "scale": scale, "width": width, "height": height}])[0]
+        result["face_count"] = len(result["faces"])
+    return result
+
+class EncodedFrame(bytes):
+    """
+    JPEG bytes of a sampled frame, with its frame index and presentation time (seconds)
+    face_candidates is the number of local face boxes found while sizing the upload, or None
+    when the frame was encoded without that pass.
+    """
+
+    def __new__(cls, data: bytes, frame_index: int, timestamp: float, face_candidates: Optional[int] = None):
+        frame = super().__new__(cls, data)
+        frame.frame_index = frame_index
+        frame.timestamp = timestamp
+        frame.face_candidates = face_candidates
+        return frame
+
+def frame_has_face_candidates(frame_data: bytes) -> bool:
+    """Prefilter decision, reusing the boxes of the upload sizing pass when the frame has them"""
+    face_candidates = getattr(frame_data, "face_candidates", None)
+    if face_candidates is None:
+        return has_face_candidates(frame_data)
+    return face_candidates > 0
+
+def frame_timestamp(cap: cv2.VideoCapture, frame_index: int, fps: float) -> float:
+    """Presentation time (seconds) of the frame just read; frame_index / fps when the container has none"""
+    msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if msec > 0 or frame_index == 0:
+        return msec / 1000
+    return frame_index / fps if fps > 0 else 0.0
+
 def download_video(video_url: str) -> str:
-    """Download video to temporary file"""
+    """Download video to temporary file (caller is responsible for deleting it)"""
+    temp_file = None
     try:
         response = requests.get(video_url, stream=True, timeout=60)
         response.raise_for_status()
@@ -80,85 +187,360 @@ def download_video(video_url: str) -> str:
         # Create temporary file
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
         
-        for chunk in response.iter_content(chunk_size=8192):
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
             temp_file.write(chunk)
         
         temp_file.close()
         return temp_file.name
         
     except Exception as e:
+        # Never leak a partial download
+        if temp_file is not None:
+            temp_file.close()
+            try:
+                os.unlink(temp_file.name)
+            except OSError:
+                pass
         raise Exception(f"Failed to download video: {str(e)}")
 
-def extract_frames_from_video(video_path: str, max_frames: int = 10) -> List[bytes]:
-    """Extract frames from video for analysis"""
+def open_video_capture(video_path: str, download: Optional[StreamingVideoDownload] = None) -> cv2.VideoCapture:
+    """
+    Open a video for decoding
+    For an in-progress download, retry as more bytes arrive until the container header is readable
+    """
+    if download is None:
+        return cv2.VideoCapture(video_path)
+    
+    download.wait_for_bytes(MIN_DECODE_BYTES)
+    while True:
+        download.raise_for_error()
+        cap = cv2.VideoCapture(video_path)
+        if cap.isOpened() and cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0:
+            return cap
+        cap.release()
+        
+        if download.done:
+            # Last attempt on the complete file
+            return cv2.VideoCapture(video_path)
+        
+        # Index not readable yet (e.g. MP4 with moov at the end) - back off geometrically
+        download.wait_for_bytes(download.bytes_written * 2)
+
+def extract_frames_from_video(video_path: str, max_frames: int = 10,
+                              dedup_threshold: Optional[int] = DEFAULT_DEDUP_THRESHOLD,
+                              oversample: int = 3,
+                              download: Optional[StreamingVideoDownload] = None,
+                              optimize_upload: bool = True) -> List[EncodedFrame]:
+    """
+    Extract frames from video for analysis
+    With dedup_threshold set, oversample candidates and drop near-duplicate frames (dHash)
+    so each selected frame carries new information.
+    When a StreamingVideoDownload is passed, decoding starts on the partial file and
+    waits for more data whenever it catches up with the download.
+    With optimize_upload, frames are resized to a face-resolution budget and JPEG quality
+    is chosen to fit the per-frame byte budget.
+    """
     frames = []
+    frame_hashes = []
     
     try:
-        cap = cv2.VideoCapture(video_path)
+        # Sample extra candidates so duplicates can be replaced by distinctive neighbours
+        dedup = dedup_threshold is not None
+        max_candidates = max_frames * max(1, oversample) if dedup else max_frames
         
+        for frame_index, timestamp, frame in iter_sampled_frames(video_path, max_candidates, download):
+            # Convert frame to JPEG bytes
+            frame_data = encode_sampled_frame(frame, frame_index, timestamp, optimize_upload)
+            if frame_data:
+                frames.append(frame_data)
+                if dedup:
+                    frame_hashes.append(compute_dhash(frame))
+        
+        if dedup:
+            frames = keep_distinctive_frames(frames, frame_hashes, max_frames, dedup_threshold)
+        
+        return frames
+        
+    except Exception as e:
+        raise Exception(f"Failed to extract frames: {str(e)}")
+
+def iter_sampled_frames(video_path: str, max_candidates: int,
+                        download: Optional[StreamingVideoDownload] = None) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """
+    Yield (frame_index, timestamp_sec, frame) for up to max_candidates evenly spaced frames
+    Only the current frame is held in memory. With a StreamingVideoDownload, decoding
+    waits and resumes whenever it catches up with the download.
+    """
+    cap = open_video_capture(video_path, download)
+    
+    try:
         if not cap.isOpened():
             raise Exception("Failed to open video file")
         
         # Get total frame count and fps
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         fps = cap.get(cv2.CAP_PROP_FPS)
-        duration = total_frames / fps if fps > 0 else 0
         
         # Calculate frame intervals
-        if total_frames <= max_frames:
+        if total_frames <= max_candidates:
             frame_interval = 1
         else:
-            frame_interval = total_frames // max_frames
+            frame_interval = total_frames // max_candidates
         
         frame_count = 0
         extracted_count = 0
+        # Conservative: a capture opened mid-download gets one reopen after completion
+        download_complete_on_open = download is None
         
-        while cap.isOpened() and extracted_count < max_frames:
+        while cap.isOpened() and extracted_count < max_candidates:
             ret, frame = cap.read()
             
             if not ret:
-                break
+                if download is None or (download.done and download_complete_on_open):
+                    break
+                # Decoder caught up with the download - wait for more data and resume
+                download.wait_for_more()
+                download.raise_for_error()
+                download_complete_on_open = download.done
+                cap.release()
+                cap = cv2.VideoCapture(video_path)
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count)
+                continue
             
             # Extract frame at intervals
             if frame_count % frame_interval == 0:
-                # Convert frame to JPEG bytes
-                success, buffer = cv2.imencode('.jpg', frame)
-                if success:
-                    frame_bytes = buffer.tobytes()
-                    frames.append(frame_bytes)
-                    extracted_count += 1
+                yield frame_count, frame_timestamp(cap, frame_count, fps), frame
+                extracted_count += 1
             
             frame_count += 1
+    finally:
+        cap.release()
+
+def encode_frame(frame: np.ndarray, optimize_upload: bool = True,
+                 face_boxes: Optional[np.ndarray] = None) -> bytes:
+    """
+    JPEG-encode a frame, optionally downscaled and compressed for upload
+    Pass the frame's local face boxes to size the upload without another cascade pass.
+    """
+    if optimize_upload:
+        return encode_frame_for_upload(frame, scale=upload_scale_for_frame(frame, face_boxes))
+    success, buffer = cv2.imencode('.jpg', frame)
+    return buffer.tobytes() if success else b''
+
+def encode_sampled_frame(frame: np.ndarray, frame_index: int, timestamp: float,
+                         optimize_upload: bool = True) -> EncodedFrame:
+    """
+    Encode a sampled frame for upload, keeping its position and local face count
+    The face boxes that size the upload also decide the prefilter, so each frame runs the
+    Haar cascades once, at UPLOAD_SIZING_MAX_WIDTH.
+    """
+    if not optimize_upload:
+        return EncodedFrame(encode_frame(frame, False), frame_index, timestamp)
+    face_boxes = local_face_boxes(frame, UPLOAD_SIZING_MAX_WIDTH)
+    return EncodedFrame(encode_frame(frame, face_boxes=face_boxes), frame_index, timestamp,
+                        face_candidates=len(face_boxes))
+
+def keep_distinctive_frames(frames: List[EncodedFrame], frame_hashes: List[int], max_frames: int,
+                            dedup_threshold: int) -> List[EncodedFrame]:
+    """Reduce oversampled candidate frames to at most max_frames distinctive ones"""
+    selected = select_distinctive_frames(frame_hashes, max_frames, dedup_threshold)
+    logging.info(f"Frame dedup kept {len(selected)} of {len(frames)} candidate frames")
+    return [frames[i] for i in selected]
+
+def extract_frames_at_indices(video_path: str, frame_indices: Sequence[int], max_frames: int = 10,
+                              dedup_threshold: Optional[int] = DEFAULT_DEDUP_THRESHOLD,
+                              optimize_upload: bool = True) -> List[EncodedFrame]:
+    """Extract specific frames by seeking, e.g. from a sparse partially fetched file"""
+    frames = []
+    frame_hashes = []
+    
+    try:
+        cap = cv2.VideoCapture(video_path)
+        
+        if not cap.isOpened():
+            raise Exception("Failed to open video file")
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        for frame_index in frame_indices:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            
+            frame_data = encode_sampled_frame(frame, frame_index, frame_timestamp(cap, frame_index, fps),
+                                              optimize_upload)
+            if frame_data:
+                frames.append(frame_data)
+                if dedup_threshold is not None:
+                    frame_hashes.append(compute_dhash(frame))
         
         cap.release()
         
-        return frames
+        if dedup_threshold is not None:
+            frames = keep_distinctive_frames(frames, frame_hashes, max_frames, dedup_threshold)
+        
+        return frames[:max_frames]
         
     except Exception as e:
         raise Exception(f"Failed to extract frames: {str(e)}")
 
-def analyze_video_with_face_detection(video_url: Optional[str] = None, video_file: Optional[str] = None) -> Dict[str, Any]:
+def extract_keyframes_from_video(video_path: str, max_frames: int = 10,
+                                 scan_budget: int = KEYFRAME_SCAN_BUDGET,
+                                 optimize_upload: bool = True) -> Tuple[List[EncodedFrame], Dict[str, Any]]:
+    """
+    Extract frames at scene changes instead of fixed intervals
+    Scores at most scan_budget low-resolution thumbnails by histogram and pixel difference,
+    then seeks to the top max_frames positions for full-resolution extraction.
+    When the MP4 index shows that seeking to each scan point decodes fewer frames than reading
+    straight through, the scan seeks; otherwise every frame is decoded and only the scan points
+    are converted. Returns the frames and a summary with the frames scored and decoded
+    (decode_fraction; estimated from the keyframe index when seeking).
+    """
+    try:
+        cap = cv2.VideoCapture(video_path)
+        
+        if not cap.isOpened():
+            raise Exception("Failed to open video file")
+        
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        scan_stride = max(1, -(-total_frames // scan_budget)) if total_frames > 0 else 1
+        scan_plan = list(range(0, total_frames, scan_stride))
+        sample_table = read_local_sample_table(video_path) if scan_stride > 1 else None
+        seek_cost = seek_decode_count(sample_table, scan_plan) if sample_table is not None else None
+        
+        thumbnails = []
+        scanned_indices = []
+        if seek_cost is not None and seek_cost < total_frames:
+            # Scan points are further apart than the keyframes: skip the gaps instead of decoding them
+            scan_mode = "seek"
+            for frame_index in scan_plan:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+                ret, frame = cap.read()
+                if ret:
+                    thumbnails.append(thumbnail(frame))
+                    scanned_indices.append(frame_index)
+            frames_decoded = seek_cost
+        else:
+            # grab() still decodes every frame but skips the colour conversion; only every
+            # scan_stride-th frame is retrieved and scored
+            scan_mode = "sequential"
+            frame_count = 0
+            while cap.grab():
+                if frame_count % scan_stride == 0:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        thumbnails.append(thumbnail(frame))
+                        scanned_indices.append(frame_count)
+                frame_count += 1
+            frames_decoded = frame_count
+            total_frames = max(total_frames, frame_count)
+        cap.release()
+        
+        scan_info = {
+            "total_frames": total_frames,
+            "scan_mode": scan_mode,
+            "frames_scanned": len(thumbnails),
+            "frames_decoded": frames_decoded,
+            "decode_fraction": round(min(frames_decoded, total_frames) / total_frames, 4) if total_frames else 0.0
+        }
+        if not thumbnails:
+            return [], scan_info
+        
+        scores = scene_change_scores(np.stack(thumbnails))
+        frame_indices = [scanned_indices[position] for position in select_keyframes(scores, max_frames)]
+        frames = extract_frames_at_indices(video_path, frame_indices, max_frames,
+                                           dedup_threshold=None, optimize_upload=optimize_upload)
+        return frames, {**scan_info, "frame_indices": frame_indices}
+        
+    except Exception as e:
+        raise Exception(f"Failed to extract keyframes: {str(e)}")
+
+def extract_frames_via_range_requests(video_url: str, max_frames: int = 10,
+                                      dedup_threshold: Optional[int] = DEFAULT_DEDUP_THRESHOLD,
+                                      oversample: int = 3) -> Tuple[List[EncodedFrame], Dict[str, Any]]:
+    """
+    Extract frames downloading only the byte ranges they need (MP4 over HTTP Range)
+    Falls back to a full streaming download when the server or container does not allow it.
+    Returns the frames and a summary of what was fetched.
+    """
+    max_candidates = max_frames * max(1, oversample) if dedup_threshold is not None else max_frames
+    
+    try:
+        with PartialVideoFetch(video_url, max_candidates) as fetch:
+            frames = extract_frames_at_indices(fetch.path, fetch.frame_indices, max_frames, dedup_threshold)
+            if frames:
+                return frames, {
+                    "mode": "range",
+                    "bytes_downloaded": fetch.bytes_fetched,
+                    "content_length": fetch.content_length,
+                    "range_requests": fetch.range_requests
+                }
+            logging.warning("No frames decoded from partial fetch, downloading full video")
+    except RangeFetchUnsupported as e:
+        logging.info(f"Range fetch unavailable ({str(e)}), downloading full video")
+    
+    with StreamingVideoDownload(video_url) as download:
+        frames = extract_frames_from_video(download.path, max_frames, dedup_threshold, oversample, download=download)
+        return frames, {
+            "mode": "full",
+            "bytes_downloaded": download.bytes_written,
+            "content_length": download.content_length
+        }
+
+def analyze_video_with_face_detection(video_url: Optional[str] = None, video_file: Optional[str] = None,
+                                      prefilter_faces: bool = True, fetch_mode: str = "stream",
+                                      mosaic_grid: Optional[Tuple[int, int]] = None,
+                                      frame_selection: str = "uniform",
+                                      on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
     """
     Analyze video using Azure Face API
     Downloads video, extracts frames, and analyzes faces in each frame
+    When prefilter_faces is set, frames without a local face candidate never reach the Face API.
+    fetch_mode "range" downloads only the byte ranges of sampled frames (MP4 with Range support).
+    mosaic_grid=(rows, cols) packs that many frames into one image per Face API call.
+    frame_selection "scene" picks frames at scene changes (needs the complete file, so no range fetch).
+    on_progress receives partial insights after the prefilter and after every Face API call.
     """
     
     try:
-        # Download video if URL provided
-        if video_url:
-            print(f"📥 Downloading video from: {video_url}")
-            video_path = download_video(video_url)
-        elif video_file:
-            video_path = video_file
-        else:
+        if not video_url and not video_file:
             return {
                 "success": False,
                 "error": "No video URL or file provided"
             }
         
-        # Extract frames
         print("🎬 Extracting frames from video...")
-        frames = extract_frames_from_video(video_path, max_frames=10)
+        extraction_start = time.time()
+        selection_info = {"mode": "uniform"}
+        if video_url and fetch_mode == "range" and frame_selection != "scene":
+            print(f"📥 Fetching sampled frames from: {video_url}")
+            frames, fetch_info = extract_frames_via_range_requests(video_url, max_frames=10)
+            download_time = time.time() - extraction_start
+        else:
+            # Stream the download if URL provided - decoding overlaps with it
+            if video_url:
+                print(f"📥 Downloading video from: {video_url}")
+                video_source = StreamingVideoDownload(video_url)
+            else:
+                video_source = nullcontext()
+            
+            # The temporary download is removed as soon as this block exits
+            with video_source as download:
+                video_path = download.path if download else video_file
+                if frame_selection == "scene":
+                    if download:
+                        download.wait_until_complete()
+                    frames, scan_info = extract_keyframes_from_video(video_path, max_frames=10)
+                    selection_info = {"mode": "scene", **scan_info}
+                else:
+                    frames = extract_frames_from_video(video_path, max_frames=10, download=download)
+                download_time = download.elapsed if download else 0.0
+                fetch_info = {
+                    "mode": "stream" if download else "file",
+                    "bytes_downloaded": download.bytes_written if download else 0,
+                    "content_length": download.content_length if download else None
+                }
+        extraction_time = time.time() - extraction_start
         
         if not frames:
             return {
@@ -168,27 +550,59 @@ def analyze_video_with_face_detection(video_url: Optional[str] = None, video_fil
         
         print(f"📸 Extracted {len(frames)} frames for analysis")
         
-        # Analyze each frame
+        # Local prefilter decides which frames reach the Face API
+        frames_skipped = 0
+        pending = []
+        for i, frame_data in enumerate(frames):
+            if prefilter_faces and not frame_has_face_candidates(frame_data):
+                print(f"⏭️  Skipping frame {i+1}/{len(frames)} (no local face candidates)")
+                frames_skipped += 1
+                continue
+            pending.append((i, frame_data))
+        
+        # Running aggregates behind the partial insights, updated frame by frame
+        aggregates = FaceAttributeAccumulator() if on_progress else None
+        if aggregates is not None:
+            report_progress(on_progress, partial_video_insights(aggregates, frames_skipped, len(frames)))
+        
+        # Analyze each frame, or each batch of frames as one mosaic image
         all_faces = []
         frame_analyses = []
+        bytes_uploaded = 0
+        api_calls = 0
+        batch_size = mosaic_grid[0] * mosaic_grid[1] if mosaic_grid else 1
         
-        for i, frame_data in enumerate(frames):
-            print(f"🔍 Analyzing frame {i+1}/{len(frames)}...")
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
             
-            result = detect_faces_in_image(frame_data)
-            
-            frame_analysis = {
-                "frame_number": i + 1,
-                "timestamp": f"{i * 2:.1f}s",  # Approximate timestamp
-                "face_detection_success": result["success"],
-                "face_count": result["face_count"],
-                "faces": result.get("faces", [])
-            }
+            if mosaic_grid:
+                print(f"🧩 Analyzing frames {batch[0][0]+1}-{batch[-1][0]+1}/{len(frames)} as one mosaic...")
+                results, upload_size = detect_faces_in_mosaic([frame_data for _, frame_data in batch], mosaic_grid)
+            else:
+                print(f"🔍 Analyzing frame {batch[0][0]+1}/{len(frames)}...")
+                results = [detect_faces_in_image(batch[0][1])]
+                upload_size = len(batch[0][1])
+            bytes_uploaded += upload_size
+            api_calls += 1
             
-            if result["success"]:
-                all_faces.extend(result["faces"])
+            for (i, frame_data), result in zip(batch, results):
+                frame_analysis = {
+                    "frame_number": frame_data.frame_index + 1,
+                    "timestamp": f"{frame_data.timestamp:.1f}s",
+                    "face_detection_success": result["success"],
+                    "face_count": result["face_count"],
+                    "faces": result.get("faces", [])
+                }
+                
+                if result["success"]:
+                    all_faces.extend(result["faces"])
+                
+                frame_analyses.append(frame_analysis)
+                if aggregates is not None:
+                    aggregates.add_frame(frame_analysis)
             
-            frame_analyses.append(frame_analysis)
+            if aggregates is not None:
+                report_progress(on_progress, partial_video_insights(aggregates, frames_skipped + len(frame_analyses), len(frames)))
             
             # Small delay to avoid rate limiting
             time.sleep(0.5)
@@ -196,19 +610,29 @@ def analyze_video_with_face_detection(video_url: Optional[str] = None, video_fil
         # Generate insights
         insights = generate_video_insights(frame_analyses, all_faces)
         
-        # Clean up temporary file
-        if video_url:
-            try:
-                os.unlink(video_path)
-            except:
-                pass
-        
         return {
             "success": True,
             "insights": insights,
             "frame_analyses": frame_analyses,
             "total_faces_detected": len(all_faces),
-            "frames_analyzed": len(frames)
+            "frames_analyzed": len(frames),
+            "api_calls_made": api_calls,
+            "mosaic_grid": list(mosaic_grid) if mosaic_grid else None,
+            "prefilter": {
+                "enabled": prefilter_faces,
+                "frames_skipped": frames_skipped,
+                "api_calls_avoided": frames_skipped
+            },
+            "fetch": fetch_info,
+            "frame_selection": selection_info,
+            "upload": {
+                "bytes_uploaded": bytes_uploaded,
+                "avg_bytes_per_call": round(bytes_uploaded / api_calls) if api_calls else 0
+            },
+            "timings": {
+                "download_sec": round(download_time, 2),
+                "download_and_extraction_sec": round(extraction_time, 2)
+            }
         }
         
     except Exception as e:
@@ -217,10 +641,338 @@ def analyze_video_with_face_detection(video_url: Optional[str] = None, video_fil
             "error": str(e)
         }
 
+def analyze_video_streaming(video_url: Optional[str] = None, video_file: Optional[str] = None,
+                            max_frames: int = 10, prefilter_faces: bool = True,
+                            queue_size: int = PIPELINE_QUEUE_SIZE,
+                            on_progress: Optional[ProgressCallback] = None,
+                            rate_limiter: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Analyze video with a bounded-memory pipeline: decode -> preprocess -> detect -> aggregate
+    Stages run concurrently and hand frames over through queues of queue_size items, so
+    memory stays flat however many frames are sampled. Face results are folded into running
+    aggregates and discarded; only a compact per-frame timeline is kept.
+    on_progress receives partial insights after each analyzed frame (progress against max_frames).
+    rate_limiter (e.g. batch_scheduler.TokenBucket) is acquired before every Face API call.
+    """
+    
+    try:
+        if not video_url and not video_file:
+            return {
+                "success": False,
+                "error": "No video URL or file provided"
+            }
+        
+        counters = {"frames_skipped": 0, "api_calls": 0, "bytes_uploaded": 0}
+        
+        def preprocess(item):
+            frame_index, timestamp, frame = item
+            # One cascade pass both sizes the upload and decides the prefilter
+            face_boxes = local_face_boxes(frame, UPLOAD_SIZING_MAX_WIDTH)
+            if prefilter_faces and len(face_boxes) == 0:
+                counters["frames_skipped"] += 1
+                return SKIP
+            return frame_index, timestamp, encode_frame(frame, face_boxes=face_boxes)
+        
+        def detect(item):
+            frame_index, timestamp, frame_data = item
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            result = detect_faces_in_image(frame_data)
+            counters["api_calls"] += 1
+            counters["bytes_uploaded"] += len(frame_data)
+            # Small delay to avoid rate limiting
+            time.sleep(0.5)
+            return {
+                "frame_number": frame_index + 1,
+                "timestamp": f"{timestamp:.1f}s",
+                "face_detection_success": result["success"],
+                "face_count": result["face_count"],
+                "faces": result.get("faces", []) if result["success"] else []
+            }
+        
+        aggregates = FaceAttributeAccumulator()
+        start = time.time()
+        
+        if video_url:
+            print(f"📥 Downloading video from: {video_url}")
+            video_source = StreamingVideoDownload(video_url)
+        else:
+            video_source = nullcontext()
+        
+        with video_source as download:
+            video_path = download.path if download else video_file
+            frames = iter_sampled_frames(video_path, max_frames, download)
+            # closing() stops the stage threads even if aggregation raises
+            with closing(run_pipeline(frames, [preprocess, detect], queue_size)) as results:
+                for frame_analysis in results:
+                    aggregates.add_frame(frame_analysis)
+                    if on_progress:
+                        frames_done = aggregates.frame_count + counters["frames_skipped"]
+                        report_progress(on_progress, partial_video_insights(aggregates, frames_done, max_frames))
+            bytes_downloaded = download.bytes_written if download else 0
+        
+        stats = aggregates.stats()
+        if not stats["frames"] and not counters["frames_skipped"]:
+            return {
+                "success": False,
+                "error": "No frames could be extracted from video"
+            }
+        
+        return {
+            "success": True,
+            "insights": video_insights_from_stats(stats),
+            "total_faces_detected": stats["faces"],
+            "frames_analyzed": stats["frames"] + counters["frames_skipped"],
+            "api_calls_made": counters["api_calls"],
+            "prefilter": {
+                "enabled": prefilter_faces,
+                "frames_skipped": counters["frames_skipped"],
+                "api_calls_avoided": counters["frames_skipped"]
+            },
+            "fetch": {
+                "mode": "stream" if video_url else "file",
+                "bytes_downloaded": bytes_downloaded
+            },
+            "upload": {
+                "bytes_uploaded": counters["bytes_uploaded"],
+                "avg_bytes_per_call": round(counters["bytes_uploaded"] / counters["api_calls"]) if counters["api_calls"] else 0
+            },
+            "pipeline": {
+                "queue_size": queue_size
+            },
+            "timings": {
+                "total_sec": round(time.time() - start, 2)
+            }
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+def iter_tracking_frames(video_path: str, windows: int = TRACK_WINDOWS, window_sec: float = TRACK_WINDOW_SEC,
+                         track_fps: float = TRACK_FPS,
+                         download: Optional[StreamingVideoDownload] = None) -> Iterator[Tuple[int, int, float, np.ndarray]]:
+    """
+    Yield (window, frame_index, timestamp_sec, frame) for consecutive frames at about track_fps
+    inside evenly spread windows (see tracking_windows). The capture seeks to each window start;
+    frames between the sampled ones inside a window are only grabbed, not converted. A
+    StreamingVideoDownload is followed as in iter_sampled_frames.
+    """
+    cap = open_video_capture(video_path, download)
+    
+    try:
+        if not cap.isOpened():
+            raise Exception("Failed to open video file")
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        plan = tracking_windows(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), fps, windows, window_sec, track_fps)
+        
+        frame_count = 0
+        window = 0
+        download_complete_on_open = download is None
+        
+        while cap.isOpened():
+            while window < len(plan) and frame_count >= plan[window][1]:
+                window += 1
+            if window == len(plan):
+                break
+            
+            first, _, step = plan[window]
+            if frame_count < first and cap.set(cv2.CAP_PROP_POS_FRAMES, first):
+                # Jump over the gap between windows instead of decoding it
+                frame_count = first
+            
+            if not cap.grab():
+                if download is None or (download.done and download_complete_on_open):
+                    break
+                # Decoder caught up with the download - wait for more data and resume
+                download.wait_for_more()
+                download.raise_for_error()
+                download_complete_on_open = download.done
+                cap.release()
+                cap = cv2.VideoCapture(video_path)
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count)
+                continue
+            
+            if frame_count >= first and (frame_count - first) % step == 0:
+                ret, frame = cap.retrieve()
+                if ret:
+                    yield window, frame_count, frame_timestamp(cap, frame_count, fps), frame
+            
+            frame_count += 1
+    finally:
+        cap.release()
+
+def analyze_video_with_tracking(video_url: Optional[str] = None, video_file: Optional[str] = None,
+                                windows: int = TRACK_WINDOWS, window_sec: float = TRACK_WINDOW_SEC,
+                                track_fps: float = TRACK_FPS, keyframe_interval: int = TRACK_KEYFRAME_INTERVAL,
+                                max_detections: int = TRACK_MAX_DETECTIONS,
+                                on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Analyze video densely with the Face API called only on keyframes and track losses
+    Short windows spread over the video are decoded at track_fps, so consecutive frames are close
+    enough in time for optical flow. Within a window, faces found by a detection are followed
+    locally (FaceTracker), which gives per-frame presence and head-roll timelines at a fraction of
+    the calls. Smile, age and the other attributes only come from detected frames.
+    At most max_detections Face API calls are made, one of them kept back for the start of
+    each later window; frames that would need more are left out of the results.
+    Suited to single-presenter videos.
+    """
+
+    try:
+        if not video_url and not video_file:
+            return {
+                "success": False,
+                "error": "No video URL or file provided"
+            }
+
+        counters = {"api_calls": 0}
+
+        def detect(frame):
+            result = detect_faces_in_frame(frame)
+            counters["api_calls"] += 1
+            # Small delay to avoid rate limiting
+            time.sleep(0.5)
+            return result
+
+        tracker = FaceTracker(detect, keyframe_interval, max_detections)
+        aggregates = FaceAttributeAccumulator()
+        pose_timeline = []
+        frames_planned = windows * max(1, int(round(window_sec * track_fps)))
+        current_window = None
+        start = time.time()
+
+        if video_url:
+            print(f"📥 Downloading video from: {video_url}")
+            video_source = StreamingVideoDownload(video_url)
+        else:
+            video_source = nullcontext()
+
+        with video_source as download:
+            video_path = download.path if download else video_file
+            for window, frame_index, timestamp, frame in iter_tracking_frames(
+                    video_path, windows, window_sec, track_fps, download):
+                if window != current_window:
+                    # Tracks never carry over the jump to the next window
+                    tracker.reset()
+                    current_window = window
+                    tracker.max_detections = max_detections - max(0, windows - window - 1)
+                result = tracker.process(frame)
+                if result["source"] == "skipped":
+                    continue
+                faces = result.get("faces", []) if result["success"] else []
+                aggregates.add_frame({
+                    "frame_number": frame_index + 1,
+                    "timestamp": f"{timestamp:.2f}s",
+                    "face_detection_success": result["success"],
+                    "face_count": result["face_count"],
+                    "faces": faces
+                })
+                head_pose = faces[0].get("faceAttributes", {}).get("headPose") if faces else None
+                pose_timeline.append({
+                    "frame_number": frame_index + 1,
+                    "timestamp": round(timestamp, 2),
+                    "window": window,
+                    "face_present": bool(faces),
+                    "source": result["source"],
+                    "head_pose": head_pose
+                })
+                if on_progress:
+                    report_progress(on_progress, partial_video_insights(aggregates, aggregates.frame_count, frames_planned))
+            bytes_downloaded = download.bytes_written if download else 0
+
+        stats = aggregates.stats()
+        if not stats["frames"]:
+            return {
+                "success": False,
+                "error": "No frames could be extracted from video"
+            }
+
+        return {
+            "success": True,
+            "insights": video_insights_from_stats(stats),
+            "total_faces_detected": stats["faces"],
+            "frames_analyzed": stats["frames"],
+            "api_calls_made": counters["api_calls"],
+            "tracking": {
+                **tracker.stats,
+                "windows": (current_window or 0) + 1,
+                "track_fps": track_fps,
+                "keyframe_interval": keyframe_interval,
+                "max_detections": max_detections,
+                "api_calls_avoided": stats["frames"] - counters["api_calls"],
+                "timeline": pose_timeline
+            },
+            "fetch": {
+                "mode": "stream" if video_url else "file",
+                "bytes_downloaded": bytes_downloaded
+            },
+            "timings": {
+                "total_sec": round(time.time() - start, 2)
+            }
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 def generate_video_insights(frame_analyses: List[Dict], all_faces: List[Dict]) -> Dict[str, Any]:
     """Generate insights from face detection results"""
     
     if not all_faces:
+        return video_insights_from_stats(None)
+    
+    # Decode attributes once into columns; all aggregates are vectorized
+    return video_insights_from_stats(FaceAttributeColumns(frame_analyses).stats())
+
+def engagement_level(avg_smile: float) -> str:
+    if avg_smile > 0.7:
+        return "High"
+    if avg_smile > 0.3:
+        return "Medium"
+    return "Low"
+
+def quality_label(avg_quality: float) -> str:
+    return "High" if avg_quality >= 2.5 else "Medium" if avg_quality >= 1.5 else "Low"
+
+def partial_video_insights(aggregates: FaceAttributeAccumulator, frames_done: int, frames_total: int) -> Dict[str, Any]:
+    """
+    Early feedback from the frames analyzed so far
+    progress is the fraction of sampled frames processed; frames the prefilter skipped count
+    as processed frames without a face.
+    """
+    snapshot = aggregates.snapshot()
+    partial = {
+        "progress": round(min(1.0, frames_done / frames_total), 3) if frames_total else 1.0,
+        "frames_done": frames_done,
+        "frames_total": frames_total,
+        "faces_detected": snapshot["faces"],
+        "face_coverage": round(snapshot["frames_with_faces"] / frames_done, 3) if frames_done else 0.0
+    }
+    if snapshot["faces"]:
+        partial.update({
+            "average_smile_score": round(snapshot["avg_smile"], 2),
+            "engagement_level": engagement_level(snapshot["avg_smile"]),
+            "average_quality": round(snapshot["avg_quality"], 2),
+            "video_quality": quality_label(snapshot["avg_quality"])
+        })
+    return partial
+
+def report_progress(on_progress: ProgressCallback, partial: Dict[str, Any]):
+    """Hand partial insights to the caller; a failing listener never stops the analysis"""
+    try:
+        on_progress(partial)
+    except Exception as e:
+        print(f"⚠️  Progress callback failed: {str(e)}")
+
+def video_insights_from_stats(stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the insights report from aggregated face statistics (columnar or streamed)"""
+    
+    if not stats or not stats["faces"]:
         return {
             "summary": "No faces detected in video",
             "engagement_level": "Unable to determine",
@@ -228,49 +980,13 @@ def generate_video_insights(frame_analyses: List[Dict], all_faces: List[Dict]) -
             "recommendations": ["Ensure presenter is clearly visible in frame", "Check video quality and lighting"]
         }
     
-    # Analyze face attributes
-    smiles = []
-    ages = []
-    head_poses = []
-    quality_scores = []
-    
-    for face in all_faces:
-        attrs = face.get("faceAttributes", {})
-        
-        # Collect smile scores
-        if "smile" in attrs:
-            smiles.append(attrs["smile"])
-        
-        # Collect ages
-        if "age" in attrs:
-            ages.append(attrs["age"])
-        
-        # Collect head pose data
-        if "headPose" in attrs:
-            head_poses.append(attrs["headPose"])
-        
-        # Collect quality scores
-        if "qualityForRecognition" in attrs:
-            quality = attrs["qualityForRecognition"]
-            if quality == "high":
-                quality_scores.append(3)
-            elif quality == "medium":
-                quality_scores.append(2)
-            else:
-                quality_scores.append(1)
-    
-    # Calculate metrics
-    avg_smile = sum(smiles) / len(smiles) if smiles else 0
-    avg_age = sum(ages) / len(ages) if ages else 0
-    avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
+    avg_smile = stats["avg_smile"]
+    avg_age = stats["avg_age"]
+    avg_quality = stats["avg_quality"]
+    head_pose = stats["head_pose_stability"]
     
     # Determine engagement level
-    if avg_smile > 0.7:
-        engagement = "High"
-    elif avg_smile > 0.3:
-        engagement = "Medium"
-    else:
-        engagement = "Low"
+    engagement = engagement_level(avg_smile)
     
     # Generate recommendations
     recommendations = []
@@ -278,20 +994,24 @@ def generate_video_insights(frame_analyses: List[Dict], all_faces: List[Dict]) -
         recommendations.append("Consider incorporating more engaging content or humor")
     if avg_quality < 2:
         recommendations.append("Improve video quality and lighting")
-    if len(head_poses) > 0:
-        # Check for consistent head positioning
+    if not head_pose["stable"]:
+        # Head moves a lot between sampled frames
         recommendations.append("Maintain consistent eye contact with camera")
     
     return {
-        "summary": f"Detected {len(all_faces)} faces across {len(frame_analyses)} frames",
+        "summary": f"Detected {stats['faces']} faces across {stats['frames']} frames",
         "engagement_level": engagement,
         "average_smile_score": round(avg_smile, 2),
+        "smile_variance": round(stats["smile_variance"], 4),
         "presenter_age_estimate": round(avg_age) if avg_age > 0 else "Not available",
-        "video_quality": "High" if avg_quality >= 2.5 else "Medium" if avg_quality >= 1.5 else "Low",
+        "video_quality": quality_label(avg_quality),
+        "quality_distribution": stats["quality_distribution"],
+        "head_pose_stability": head_pose,
+        "timeline": stats["timeline"],
         "confidence_indicators": [
             f"Smile detection confidence: {avg_smile:.1%}",
             f"Face quality: {avg_quality:.1f}/3.0",
-            f"Frames with faces: {len([f for f in frame_analyses if f['face_count'] > 0])}/{len(frame_analyses)}"
+            f"Frames with faces: {stats['frames_with_faces']}/{stats['frames']}"
         ],
         "recommendations": recommendations if recommendations else ["Great presentation! Keep up the good work."]
     }
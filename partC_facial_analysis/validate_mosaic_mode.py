@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Validation harness for mosaic mode
+Runs the same sampled frames through one-call-per-frame detection and through tiled mosaics,
+then compares face counts, face rectangle overlap (IoU) and smile scores per frame.
+"""
+import sys
+import json
+from typing import Callable, Dict, List, Tuple
+from dotenv import load_dotenv
+
+from utils_new import detect_faces_in_image, detect_faces_in_mosaic, extract_frames_from_video
+
+# Load environment variables
+load_dotenv()
+
+def rectangle_iou(a: Dict, b: Dict) -> float:
+    left, top = max(a["left"], b["left"]), max(a["top"], b["top"])
+    right = min(a["left"] + a["width"], b["left"] + b["width"])
+    bottom = min(a["top"] + a["height"], b["top"] + b["height"])
+    intersection = max(0, right - left) * max(0, bottom - top)
+    union = a["width"] * a["height"] + b["width"] * b["height"] - intersection
+    return intersection / union if union else 0.0
+
+def best_matches(reference: List[Dict], candidates: List[Dict]) -> List[Tuple[Dict, Dict, float]]:
+    """Greedy one-to-one matching of faces by rectangle IoU"""
+    pairs = []
+    remaining = list(candidates)
+    for face in reference:
+        if not remaining:
+            break
+        scored = [(rectangle_iou(face["faceRectangle"], other["faceRectangle"]), other) for other in remaining]
+        iou, match = max(scored, key=lambda item: item[0])
+        pairs.append((face, match, iou))
+        remaining.remove(match)
+    return pairs
+
+def compare_mosaic_with_per_frame(frames: List[bytes], grid: Tuple[int, int],
+                                  detect: Callable[[bytes], Dict] = detect_faces_in_image) -> Dict:
+    """Compare per-frame and mosaic detection results for the same frames"""
+    per_frame = [detect(frame) for frame in frames]
+
+    batch_size = grid[0] * grid[1]
+    mosaic_results = []
+    for start in range(0, len(frames), batch_size):
+        results, _ = detect_faces_in_mosaic(frames[start:start + batch_size], grid)
+        mosaic_results.extend(results)
+
+    rows = []
+    for i, (single, tiled) in enumerate(zip(per_frame, mosaic_results)):
+        pairs = best_matches(single.get("faces", []), tiled.get("faces", []))
+        smile_deltas = [
+            abs(a.get("faceAttributes", {}).get("smile", 0) - b.get("faceAttributes", {}).get("smile", 0))
+            for a, b, _ in pairs
+        ]
+        rows.append({
+            "frame": i + 1,
+            "faces_per_frame_call": single["face_count"],
+            "faces_mosaic": tiled["face_count"],
+            "mean_iou": round(sum(iou for _, _, iou in pairs) / len(pairs), 3) if pairs else None,
+            "max_smile_delta": round(max(smile_deltas), 3) if smile_deltas else None
+        })
+
+    return {
+        "grid": list(grid),
+        "api_calls_per_frame_mode": len(frames),
+        "api_calls_mosaic_mode": -(-len(frames) // batch_size),
+        "face_count_agreement": sum(1 for r in rows if r["faces_per_frame_call"] == r["faces_mosaic"]) / max(len(rows), 1),
+        "frames": rows
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python validate_mosaic_mode.py <video_path> [rows] [cols]")
+        sys.exit(1)
+
+    grid = (int(sys.argv[2]) if len(sys.argv) > 2 else 2, int(sys.argv[3]) if len(sys.argv) > 3 else 2)
+    frames = extract_frames_from_video(sys.argv[1], max_frames=10)
+    report = compare_mosaic_with_per_frame(frames, grid)
+
+    print("🧩 Mosaic Mode Validation")
+    print("=" * 50)
+    print(f"📞 API calls: {report['api_calls_per_frame_mode']} per-frame vs {report['api_calls_mosaic_mode']} mosaic")
+    print(f"👤 Face count agreement: {report['face_count_agreement']:.0%}")
+    print(json.dumps(report["frames"], indent=2))
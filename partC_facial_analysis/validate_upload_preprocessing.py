@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Accuracy check for upload preprocessing (downscale + adaptive JPEG quality)
+Sends the same sampled frames to the Face API at full resolution and preprocessed,
+then compares bytes uploaded, face counts and smile scores.
+Without Face API credentials only the local detector is compared.
+"""
+import os
+import sys
+import json
+from dotenv import load_dotenv
+
+from frame_processing import count_local_face_candidates, decode_frame
+from utils_new import detect_faces_in_image, extract_frames_from_video
+
+# Load environment variables
+load_dotenv()
+
+def summarize_detection(frame_bytes: bytes, use_face_api: bool) -> dict:
+    if not use_face_api:
+        return {"face_count": count_local_face_candidates(decode_frame(frame_bytes)), "smiles": []}
+    result = detect_faces_in_image(frame_bytes)
+    faces = result.get("faces", [])
+    return {
+        "face_count": result["face_count"],
+        "smiles": sorted(face.get("faceAttributes", {}).get("smile", 0) for face in faces)
+    }
+
+def compare(video_path: str, max_frames: int = 10) -> dict:
+    use_face_api = bool(os.getenv('CONTENT_UNDERSTANDING_ENDPOINT') and os.getenv('CONTENT_UNDERSTANDING_KEY'))
+    original = extract_frames_from_video(video_path, max_frames=max_frames, dedup_threshold=None, optimize_upload=False)
+    optimized = extract_frames_from_video(video_path, max_frames=max_frames, dedup_threshold=None, optimize_upload=True)
+
+    rows = []
+    for i, (full_frame, small_frame) in enumerate(zip(original, optimized)):
+        full = summarize_detection(full_frame, use_face_api)
+        small = summarize_detection(small_frame, use_face_api)
+        smile_delta = max(
+            (abs(a - b) for a, b in zip(full["smiles"], small["smiles"])),
+            default=0.0
+        )
+        rows.append({
+            "frame": i + 1,
+            "bytes_original": len(full_frame),
+            "bytes_optimized": len(small_frame),
+            "faces_original": full["face_count"],
+            "faces_optimized": small["face_count"],
+            "max_smile_delta": round(smile_delta, 3)
+        })
+
+    return {
+        "detector": "face_api" if use_face_api else "local_haar",
+        "bytes_original": sum(r["bytes_original"] for r in rows),
+        "bytes_optimized": sum(r["bytes_optimized"] for r in rows),
+        "face_count_mismatches": sum(1 for r in rows if r["faces_original"] != r["faces_optimized"]),
+        "max_smile_delta": max((r["max_smile_delta"] for r in rows), default=0.0),
+        "frames": rows
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python validate_upload_preprocessing.py <video_path> [max_frames]")
+        sys.exit(1)
+
+    report = compare(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 10)
+
+    print("🔬 Upload Preprocessing Accuracy Check")
+    print("=" * 50)
+    print(f"🧪 Detector: {report['detector']}")
+    print(f"📦 Bytes uploaded: {report['bytes_original']:,} -> {report['bytes_optimized']:,} "
+          f"({(1 - report['bytes_optimized'] / max(report['bytes_original'], 1)) * 100:.0f}% smaller)")
+    print(f"👤 Frames with face count changes: {report['face_count_mismatches']}/{len(report['frames'])}")
+    print(f"😊 Max smile score delta: {report['max_smile_delta']}")
+    print(json.dumps(report["frames"], indent=2))
@@ -0,0 +1,244 @@
+import os
+import logging
+import struct
+import tempfile
+import threading
+import time
+import requests
+from typing import List, Optional
+
+from mp4_index import byte_ranges_for_samples, locate_top_level_box, parse_box_header, parse_video_sample_table
+
+# Large chunks keep Python overhead per byte low on multi-GB downloads
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bytes that must be on disk before the decoder first tries to open a partial file
+MIN_DECODE_BYTES = 256 * 1024
+
+# Leading bytes fetched when probing Range support (usually covers ftyp and a faststart moov)
+RANGE_PROBE_BYTES = 64 * 1024
+
+class RangeFetchUnsupported(Exception):
+    """The server or container does not allow partial fetching - download the whole file instead"""
+
+class StreamingVideoDownload:
+    """
+    Download a video into a temporary file on a background thread
+    Frames can be decoded from the partially written file while the download continues.
+    Use as a context manager - the temporary file is always removed on exit.
+    """
+
+    def __init__(self, video_url: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE, timeout: int = 60, suffix: str = '.mp4'):
+        self.video_url = video_url
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.suffix = suffix
+        self.path = None
+        self.bytes_written = 0
+        self.content_length = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._cancelled = threading.Event()
+        self._progress = threading.Condition()
+        self._thread = None
+
+    def __enter__(self) -> "StreamingVideoDownload":
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=self.suffix)
+        temp_file.close()
+        self.path = temp_file.name
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="video-download", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._cancelled.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        return False
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent downloading so far (or in total once finished)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def _run(self):
+        try:
+            with requests.get(self.video_url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                if response.headers.get('Content-Length'):
+                    self.content_length = int(response.headers['Content-Length'])
+
+                with open(self.path, 'wb') as video_file:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if self._cancelled.is_set():
+                            return
+                        video_file.write(chunk)
+                        video_file.flush()
+                        with self._progress:
+                            self.bytes_written += len(chunk)
+                            self._progress.notify_all()
+        except Exception as e:
+            self.error = e
+            logging.error(f"Video download failed: {str(e)}")
+        finally:
+            self.finished_at = time.time()
+            with self._progress:
+                self._done.set()
+                self._progress.notify_all()
+
+    def wait_for_bytes(self, min_bytes: int, timeout: Optional[float] = None) -> bool:
+        """Block until min_bytes are on disk or the download ends; True if the bytes are available"""
+        deadline = time.time() + (timeout if timeout is not None else self.timeout)
+        with self._progress:
+            while self.bytes_written < min_bytes and not self._done.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._progress.wait(remaining)
+            return self.bytes_written >= min_bytes
+
+    def wait_for_more(self, timeout: Optional[float] = None) -> bool:
+        """Block until at least one more chunk lands; False once nothing more will arrive"""
+        if self._done.is_set():
+            return False
+        self.wait_for_bytes(self.bytes_written + 1, timeout)
+        return True
+
+    def wait_until_complete(self, timeout: Optional[float] = None):
+        """Block until the download finishes, raising if it failed"""
+        if not self._done.wait(timeout if timeout is not None else self.timeout):
+            raise Exception("Timed out waiting for video download")
+        self.raise_for_error()
+
+    def raise_for_error(self):
+        if self.error is not None:
+            raise Exception(f"Failed to download video: {str(self.error)}")
+
+
+class PartialVideoFetch:
+    """
+    Fetch only the parts of an MP4 needed to decode selected frames
+    Reads the moov index with HTTP Range requests, then downloads the byte ranges covering
+    each target frame and its preceding keyframe into a sparse local file of the original size.
+    Raises RangeFetchUnsupported on enter when the server ignores or rejects Range (including
+    4xx such as 416) or the file is not an MP4 this parser can index (no video track, missing
+    or truncated sample tables).
+    """
+
+    def __init__(self, video_url: str, max_candidates: int, timeout: int = 60, suffix: str = '.mp4'):
+        self.video_url = video_url
+        self.max_candidates = max_candidates
+        self.timeout = timeout
+        self.suffix = suffix
+        self.path = None
+        self.content_length = None
+        self.bytes_fetched = 0
+        self.range_requests = 0
+        self.frame_indices = []
+        self._session = None
+
+    def __enter__(self) -> "PartialVideoFetch":
+        self._session = requests.Session()
+        try:
+            prefix = self._probe()
+            moov = locate_top_level_box(self._read_range, self.content_length, b'moov', prefix)
+            if moov is None:
+                raise RangeFetchUnsupported("No MP4 moov box found")
+            moov_start, moov_end = moov
+            moov_bytes = self._read_range(moov_start, moov_end - moov_start)
+
+            header_length = parse_box_header(moov_bytes)[2]
+            sample_table = parse_video_sample_table(moov_bytes[header_length:])
+            self.frame_indices = uniform_sample_indices(sample_table["sample_count"], self.max_candidates)
+            ranges = byte_ranges_for_samples(sample_table, self.frame_indices)
+
+            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=self.suffix)
+            self.path = temp_file.name
+            with temp_file:
+                # Sparse file of the original size: unfetched samples read back as zeros
+                temp_file.truncate(self.content_length)
+                temp_file.seek(0)
+                temp_file.write(prefix)
+                temp_file.seek(moov_start)
+                temp_file.write(moov_bytes)
+                for start, end in ranges:
+                    temp_file.seek(start)
+                    temp_file.write(self._read_range(start, end - start))
+            return self
+        except requests.HTTPError as e:
+            self.__exit__(None, None, None)
+            raise RangeFetchUnsupported(f"Range request failed: {str(e)}") from e
+        except (ValueError, TypeError, KeyError, IndexError, struct.error) as e:
+            # Missing or malformed boxes in the moov index
+            self.__exit__(None, None, None)
+            raise RangeFetchUnsupported(f"Cannot index MP4: {type(e).__name__}: {str(e)}") from e
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        return False
+
+    def _probe(self) -> bytes:
+        """Fetch the leading bytes with a Range request, confirming the server honours it"""
+        response = self._session.get(
+            self.video_url,
+            headers={"Range": f"bytes=0-{RANGE_PROBE_BYTES - 1}"},
+            timeout=self.timeout,
+            stream=True
+        )
+        with response:
+            response.raise_for_status()
+            content_range = response.headers.get('Content-Range', '')
+            if response.status_code != 206 or '/' not in content_range or content_range.endswith('/*'):
+                raise RangeFetchUnsupported(f"Server ignored Range request (status {response.status_code})")
+            self.content_length = int(content_range.rsplit('/', 1)[1])
+            prefix = response.content
+        self.range_requests += 1
+        self.bytes_fetched += len(prefix)
+        return prefix
+
+    def _read_range(self, start: int, length: int) -> bytes:
+        end = start + length - 1
+        response = self._session.get(
+            self.video_url,
+            headers={"Range": f"bytes={start}-{end}"},
+            timeout=self.timeout,
+            stream=True
+        )
+        with response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RangeFetchUnsupported(f"Server ignored Range request (status {response.status_code})")
+            data = response.content
+        self.range_requests += 1
+        self.bytes_fetched += len(data)
+        return data
+
+def uniform_sample_indices(total_frames: int, max_candidates: int) -> List[int]:
+    """Frame indices picked the same way as sequential interval sampling"""
+    if total_frames <= 0:
+        return []
+    frame_interval = 1 if total_frames <= max_candidates else total_frames // max_candidates
+    return list(range(0, total_frames, frame_interval))[:max_candidates]
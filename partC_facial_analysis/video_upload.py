@@ -0,0 +1,80 @@
+import os
+import mmap
+from typing import Iterator, Optional
+
+# Bytes handed to the HTTP connection per read; memory use does not grow with file size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class FileUploadStream:
+    """
+    Read-only, fixed-size-chunk view of a local file for use as a streaming request body
+    The file is memory-mapped where possible and pages already sent are released again,
+    so neither the Python heap nor the resident set grows with the file. Files that cannot
+    be mapped (empty files, some network filesystems) fall back to buffered reads.
+    requests sends it with a Content-Length taken from len(). Use as a context manager.
+    """
+
+    def __init__(self, path: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.size = os.path.getsize(path)
+        self.position = 0
+        self._file = open(path, 'rb')
+        self._map: Optional[mmap.mmap] = None
+        if self.size:
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    self._map.madvise(mmap.MADV_SEQUENTIAL)
+            except (OSError, ValueError):
+                self._map = None
+
+    @property
+    def memory_mapped(self) -> bool:
+        return self._map is not None
+
+    def __len__(self) -> int:
+        return self.size - self.position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.chunk_size
+        size = min(size, self.chunk_size, self.size - self.position)
+        if size <= 0:
+            return b""
+        if self._map is None:
+            data = self._file.read(size)
+        else:
+            data = self._map[self.position:self.position + size]
+            self._release(self.position + size)
+        self.position += len(data)
+        return data
+
+    def _release(self, end: int):
+        """Drop mapped pages that have been fully sent (file-backed, so this only frees memory)"""
+        if not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        released = self.position - self.position % mmap.PAGESIZE
+        upto = end - end % mmap.PAGESIZE
+        if upto > released:
+            self._map.madvise(mmap.MADV_DONTNEED, released, upto - released)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "FileUploadStream":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False